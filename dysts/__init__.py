@@ -0,0 +1,84 @@
+"""Dynamical systems in Python
+
+Submodules and systems are imported lazily on first access, so that `import dysts`
+is cheap. For example, `dysts.Lorenz` imports only what is needed to construct the
+Lorenz system. Set the environment variable DYSTS_PROFILE_IMPORTS=1 to print the
+time taken by each lazy import.
+"""
+
+import importlib
+import os
+import sys
+import time
+
+_SUBMODULES = (
+    "analysis",
+    "base",
+    "flows",
+    "maps",
+    "metrics",
+    "sampling",
+    "systems",
+    "utils",
+)
+
+# seconds spent importing each submodule that was loaded lazily
+IMPORT_TIMES: dict[str, float] = {}
+
+
+def _import_submodule(name: str):
+    """Import a submodule of dysts, recording how long the import takes"""
+    qualname = f"{__name__}.{name}"
+    if qualname in sys.modules:
+        return sys.modules[qualname]
+
+    start = time.perf_counter()
+    module = importlib.import_module(qualname)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+
+    if os.environ.get("DYSTS_PROFILE_IMPORTS"):
+        print(
+            f"dysts: imported {qualname} in {IMPORT_TIMES[name]:.3f} s", file=sys.stderr
+        )
+
+    return module
+
+
+def get_system(name: str) -> type:
+    """Get a continuous system or discrete map class by name
+
+    Args:
+        name: The name of the system, e.g. "Lorenz" or "Henon"
+
+    Returns:
+        The class implementing the system
+    """
+    for module_name in ("flows", "maps"):
+        module = _import_submodule(module_name)
+        system = getattr(module, name, None)
+        if isinstance(system, type) and system.__module__ == module.__name__:
+            return system
+    raise ValueError(f"No system named {name}")
+
+
+def precompile(*args, **kwargs) -> list[str]:
+    """Compile every system ahead of time, populating numba's on-disk cache
+
+    See dysts.systems.precompile() for the arguments.
+    """
+    return _import_submodule("systems").precompile(*args, **kwargs)
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return _import_submodule(name)
+    if not name.startswith("_"):
+        try:
+            return get_system(name)
+        except ValueError:
+            pass
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
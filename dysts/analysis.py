@@ -4,31 +4,29 @@ Functions that act on DynSys or DynMap objects
 
 """
 
+import contextlib
+import functools
 import warnings
 
 import numpy as np
+from scipy.spatial import cKDTree
 from scipy.spatial.distance import cdist
 from scipy.stats import linregress
 from tqdm import tqdm
 
 from .base import DynSys
 from .utils import (
-    ComputationHolder,
+    LazyJit,
     find_characteristic_timescale,
     find_significant_frequencies,
     has_module,
-    jac_fd,
+    lease_worker_pool,
+    min_data_points_rosenstein,
+    time_limit,
     # logarithmic_n,
     # rowwise_euclidean,
 )
 
-if has_module("sklearn"):
-    from sklearn.linear_model import RidgeCV
-else:
-    warnings.warn(
-        "Sklearn not installed. Will not be able to use ridge regression for gpdistance and corr_gpdim."
-    )
-
 
 def logarithmic_n(min_n, max_n, factor):
     """
@@ -62,7 +60,12 @@ def rowwise_euclidean(x, y):
 
 
 def sample_initial_conditions(
-    model, points_to_sample, traj_length=1000, pts_per_period=30
+    model,
+    points_to_sample,
+    traj_length=1000,
+    pts_per_period=30,
+    random_state=None,
+    **kwargs,
 ):
     """
     Generate a random sample of initial conditions from a dynamical system
@@ -72,15 +75,28 @@ def sample_initial_conditions(
         points_to_sample (int): the number of random initial conditions to sample
         traj_length (int): the total length of the reference trajectory from which points are drawn
         pts_per_period (int): the sampling density of the trajectory
+        random_state (int): the seed used to choose the points. If None, numpy's
+            global random state is used.
+        kwargs: additional keyword arguments passed to the model's make_trajectory
+            method
 
     Returns:
         sample_points (ndarray): The points with shape (points_to_sample, d)
 
     """
     initial_sol = model.make_trajectory(
-        traj_length, resample=True, pts_per_period=pts_per_period, postprocess=False
+        traj_length,
+        resample=True,
+        pts_per_period=pts_per_period,
+        postprocess=False,
+        **kwargs,
+    )
+    choice = (
+        np.random.choice
+        if random_state is None
+        else np.random.default_rng(random_state).choice
     )
-    sample_inds = np.random.choice(
+    sample_inds = choice(
         np.arange(initial_sol.shape[0]), points_to_sample, replace=False
     )
     sample_pts = initial_sol[sample_inds]
@@ -176,46 +192,181 @@ def estimate_powerlaw(data0):
     return ahat
 
 
-def gp_dim(data, y_data=None, rvals=None, nmax=100):
+def _truncated_powerlaw(dists):
+    """Estimate the power law exponent of the distances between the 5th and 50th
+    percentiles of the remaining distances, which approximates the linear scaling
+    range of the correlation integral"""
+    dists = dists[dists > 0]
+    if len(dists) == 0:
+        raise ValueError("All pair distances are zero, so no exponent can be fit")
+    dists = dists[dists > np.percentile(dists, 5)]
+    dists = dists[dists < np.percentile(dists, 50)]
+    return estimate_powerlaw(dists)
+
+
+def _binned_truncated_powerlaw(log_edges, counts, log_sums=None):
+    """
+    The estimate of _truncated_powerlaw from a histogram of distances in logarithmic
+    bins. Distances are assumed to be spread uniformly in log within each bin.
+
+    Args:
+        log_edges (np.ndarray): The logarithms of the K + 1 bin edges
+        counts (np.ndarray): The number of distances in each of the K bins
+        log_sums (np.ndarray, optional): The sum of the log distances in each bin,
+            which defaults to the count times the log midpoint of the bin
+
+    Returns:
+        float: The estimated power law exponent
+    """
+    counts = np.asarray(counts, dtype=float)
+    widths = np.diff(log_edges)
+    if log_sums is None:
+        log_sums = counts * (log_edges[:-1] + widths / 2)
+
+    # the 5th percentile, and the median of the distances above it
+    cum = np.concatenate([[0], np.cumsum(counts)])
+
+    def quantile(q):
+        target = q * cum[-1]
+        k = np.clip(np.searchsorted(cum, target) - 1, 0, len(counts) - 1)
+        frac = (target - cum[k]) / max(counts[k], 1)
+        return log_edges[k] + frac * widths[k]
+
+    lo, hi = quantile(0.05), quantile(0.05 + 0.95 * 0.5)
+
+    lower = np.maximum(log_edges[:-1], lo)
+    upper = np.minimum(log_edges[1:], hi)
+    frac = np.clip((upper - lower) / widths, 0, 1)
+    n = np.sum(frac * counts)
+    partial = frac * counts * (lower + upper) / 2
+    total_log = np.sum(np.where(frac == 1, log_sums, partial))
+    return 1 + n / (total_log - n * lo)
+
+
+def _pairwise_distance_blocks(data, y_data, block_size):
+    """Yield the distances between all pairs of rows of data and y_data in blocks of
+    about block_size distances. If y_data is None, each unordered pair of distinct
+    rows of data is visited once."""
+    symmetric = y_data is None
+    y_data = data if symmetric else y_data
+    rows = max(1, block_size // len(y_data))
+    for i in range(0, len(data), rows):
+        block = data[i : i + rows]
+        if symmetric:
+            # pairs (i, j) with j > i, taking the upper triangle of the diagonal block
+            dists = cdist(block, y_data[i:])
+            yield dists[np.triu_indices(len(block), k=1, m=dists.shape[1])]
+        else:
+            yield cdist(block, y_data).ravel()
+
+
+def gp_dim(
+    data,
+    y_data=None,
+    rvals=None,
+    nmax=100,
+    method="histogram",
+    n_pairs=None,
+    block_size=2**22,
+    random_state=None,
+):
     """
     Estimate the Grassberger-Procaccia dimension for a numpy array using the
     empirical correlation integral.
 
+    The exponent is fit to the pair distances between their 5th and 50th percentiles.
+    Small inputs use the exact distances. Larger inputs stream the pair distances in
+    blocks into a logarithmic histogram, so that memory does not grow with the
+    number of pairs.
+
     Args:
         data (np.array): T x D, where T is the number of datapoints/timepoints, and D
             is the number of features/dimensions
         y_data (np.array, Optional): A second dataset of shape T2 x D, for
             computing cross-correlation.
-        rvals (np.array): A list of radii
+        rvals (np.array): A list of radii, used as the bin edges of the histogram or
+            the radii at which the KD-tree counts pairs. Distances outside of the
+            radii are ignored. Defaults to nmax logarithmically spaced radii that
+            span all pair distances.
         nmax (int): The number of points at which to evaluate the correlation integral
+        method (str): "histogram" to stream the pair distances, or "kdtree" to count
+            the pairs within each radius with a KD-tree
+        n_pairs (int, Optional): If given, the exponent is estimated from this many
+            randomly sampled pairs instead of all pairs
+        block_size (int): The number of distances computed at once
+        random_state (int, Optional): The seed used to sample pairs
 
     Returns:
-        rvals (np.array): The discrete bins at which the correlation integral is
-            estimated
-        corr_sum (np.array): The estimates of the correlation integral at each bin
+        float: The estimated exponent of the correlation integral
 
     """
+    if method not in ("histogram", "kdtree"):
+        raise ValueError(f"Unknown method {method}, expected 'histogram' or 'kdtree'")
 
     data = np.asarray(data)
+    symmetric = y_data is None
+    y_data = data if symmetric else np.asarray(y_data)
+
+    if method == "kdtree":
+        tree = cKDTree(data)
+        y_tree = tree if symmetric else cKDTree(y_data)
+        if rvals is None:
+            # the closest pair with a positive distance, and the diameter of the data
+            nn_dists = y_tree.query(data, k=2 if symmetric else 1)[0].reshape(
+                len(data), -1
+            )[:, -1]
+            if not np.any(nn_dists > 0):
+                raise ValueError(
+                    "All pair distances are zero, so no exponent can be fit"
+                )
+            extent = np.ptp(np.concatenate([data, y_data]), axis=0)
+            rvals = np.geomspace(
+                np.min(nn_dists[nn_dists > 0]), np.linalg.norm(extent), nmax
+            )
+        counts = tree.count_neighbors(y_tree, rvals).astype(float)
+        if symmetric:
+            counts = (counts - len(data)) / 2  # drop self pairs and double counting
+        return _binned_truncated_powerlaw(np.log(rvals), np.diff(counts))
+
+    if n_pairs is not None and n_pairs < len(data) * len(y_data):
+        rng = np.random.default_rng(random_state)
+        idx = rng.integers(len(data), size=n_pairs)
+        jdx = rng.integers(len(y_data), size=n_pairs)
+        dists = np.concatenate(
+            [
+                rowwise_euclidean(
+                    data[idx[k : k + block_size]], y_data[jdx[k : k + block_size]]
+                )
+                for k in range(0, n_pairs, block_size)
+            ]
+        )
+        return _truncated_powerlaw(dists)
 
-    ## For self-correlation
-    if y_data is None:
-        y_data = data.copy()
+    if len(data) * len(y_data) <= block_size:
+        return _truncated_powerlaw(cdist(data, y_data).ravel())
 
+    y_blocks = None if symmetric else y_data
     if rvals is None:
-        std = np.std(data)
-        rvals = np.logspace(np.log10(0.1 * std), np.log10(0.5 * std), nmax)
-
-    dists = cdist(data, y_data)
-    rvals = dists.ravel()
-
-    ## Truncate the distance distribution to the linear scaling range
-    std = np.std(data)
-    rvals = rvals[rvals > 0]
-    rvals = rvals[rvals > np.percentile(rvals, 5)]
-    rvals = rvals[rvals < np.percentile(rvals, 50)]
-
-    return estimate_powerlaw(rvals)
+        # a first pass finds the range of the distances spanned by the bins
+        dmin, dmax = np.inf, 0.0
+        for dists in _pairwise_distance_blocks(data, y_blocks, block_size):
+            dists = dists[dists > 0]
+            if len(dists) > 0:
+                dmin, dmax = min(dmin, dists.min()), max(dmax, dists.max())
+        if dmax == 0:
+            raise ValueError("All pair distances are zero, so no exponent can be fit")
+        rvals = np.geomspace(dmin, dmax * (1 + 1e-9), nmax + 1)
+
+    log_edges = np.log(rvals)
+    counts = np.zeros(len(log_edges) - 1)
+    log_sums = np.zeros(len(log_edges) - 1)
+    for dists in _pairwise_distance_blocks(data, y_blocks, block_size):
+        log_dists = np.log(dists[dists > 0])
+        bins = np.searchsorted(log_edges, log_dists, side="right") - 1
+        keep = (bins >= 0) & (bins < len(counts))
+        counts += np.bincount(bins[keep], minlength=len(counts))
+        log_sums += np.bincount(bins[keep], log_dists[keep], minlength=len(counts))
+    return _binned_truncated_powerlaw(log_edges, counts, log_sums)
 
 
 def corr_gpdim(traj1, traj2, register=False, standardize=False, **kwargs):
@@ -223,9 +374,9 @@ def corr_gpdim(traj1, traj2, register=False, standardize=False, **kwargs):
     Given two multivariate time series, estimate their similarity using the cross
     Grassberger-Procaccia dimension
 
-    This quantity is defined as the cross-correlation between the two time series
-    normalized by the product of the Grassberger-Procaccia dimension of each time series.
-    np.sqrt(<ox oy> / ox oy)
+    This quantity is defined as the cross-correlation dimension of the two time series
+    normalized by the geometric mean of the Grassberger-Procaccia dimension of each
+    time series, gp_dim(x, y) / np.sqrt(gp_dim(x) * gp_dim(y))
 
     Args:
         traj1 (np.array): T x D, where T is the number of timepoints, and D
@@ -236,13 +387,18 @@ def corr_gpdim(traj1, traj2, register=False, standardize=False, **kwargs):
             cross-correlation
         standardize (bool): Whether to standardize the time series before computing the
             cross-correlation
+        kwargs: Additional keyword arguments passed to gp_dim, such as method or
+            n_pairs
 
     Returns:
-        float: The cross-correlation between the two time series
+        float: The normalized cross-correlation dimension, which is close to one when
+            the two time series sample the same attractor
     """
     if register:
         if not has_module("sklearn"):
             raise ImportError("Sklearn is required for registration")
+        from sklearn.linear_model import RidgeCV
+
         model = RidgeCV()
         model.fit(traj1, traj2)
         traj1 = model.predict(traj1)
@@ -275,6 +431,8 @@ def gpdistance(traj1, traj2, standardize=True, register=False, **kwargs):
     if register:
         if not has_module("sklearn"):
             raise ImportError("Sklearn is required for registration")
+        from sklearn.linear_model import RidgeCV
+
         model = RidgeCV()
         model.fit(traj1, traj2)
         traj1 = model.predict(traj1)
@@ -286,17 +444,54 @@ def gpdistance(traj1, traj2, standardize=True, register=False, **kwargs):
     return np.abs(np.log(corr_gpdim(traj1, traj2, **kwargs)))
 
 
+@functools.partial(LazyJit, cache=True)
+def _lyapunov_qr_kernel(jacs, dt, tol, min_tpts):
+    """
+    Backward Euler steps of the tangent space along a trajectory, with QR
+    reorthonormalization after every step
+
+    Returns the summed log stretching factors and the number of steps taken
+    """
+    d = jacs.shape[-1]
+    eye = np.eye(d)
+    u = np.eye(d)
+    total = np.zeros(d)
+    n_steps = 0
+    for i in range(1, jacs.shape[0]):
+        u_n = np.linalg.solve(eye - jacs[i] * dt, u)
+        q, r = np.linalg.qr(u_n)
+        lyap_estimate = np.log(np.abs(np.diag(r)))
+        total += lyap_estimate
+        n_steps += 1
+        u = q  # post-iteration update axes
+
+        ## early stopping if middle exponents are close to zero, a requirement for
+        ## continuous-time dynamical systems
+        if (np.min(np.abs(lyap_estimate)) < tol) and (i > min_tpts):
+            break
+    return total, n_steps
+
+
 def find_lyapunov_exponents(
     model, traj_length, pts_per_period=500, tol=1e-8, min_tpts=10, **kwargs
 ):
     """
     Given a dynamical system, compute its spectrum of Lyapunov exponents.
+
+    The Jacobians along the trajectory are evaluated in one batch, and the tangent
+    space is then propagated with a compiled QR recursion. Because the exponents do
+    not depend on the choice of coordinates, they are computed from the trajectory
+    before any postprocessing.
+
     Args:
         model (callable): the right hand side of a differential equation, in format
             func(X, t)
         traj_length (int): the length of each trajectory used to calulate Lyapunov
             exponents
         pts_per_period (int): the sampling density of the trajectory
+        tol (float): the recursion stops early once the smallest exponent magnitude
+            of a step falls below this value
+        min_tpts (int): the minimum number of steps before stopping early
         kwargs: additional keyword arguments to pass to the model's make_trajectory
             method
 
@@ -314,58 +509,26 @@ def find_lyapunov_exponents(
         >>> print(lyap)
 
     """
-    d = np.asarray(model.ic).shape[-1]
     tpts, traj = model.make_trajectory(
         traj_length,
         pts_per_period=pts_per_period,
         resample=True,
         return_times=True,
-        postprocessing=False,
+        postprocess=False,
         **kwargs,
     )
     dt = np.median(np.diff(tpts))
     # traj has shape (traj_length, d), where d is the dimension of the system
     # tpts has shape (traj_length,)
-    # dt is the dimension of the system
-
-    u = np.identity(d)
-    all_lyap = list()
-    for i, (t, X) in enumerate(zip(tpts, traj)):
-        X = traj[i]
-
-        if model.jac(model.ic, 0) is None:
-            rhsy = lambda x: np.array(model.rhs(x, t))
-            jacval = jac_fd(rhsy, X)
-        else:
-            jacval = np.array(model.jac(X, t))
-
-        # If postprocessing is applied to a trajectory, transform the jacobian into the
-        # new coordinates.
-        if hasattr(model, "_postprocessing"):
-            X0 = np.copy(X)
-            y2h = lambda y: model._postprocessing(*y)
-            dhdy = jac_fd(y2h, X0)
-            dydh = np.linalg.inv(dhdy)  # dy/dh
-            ## Alternate version if good second-order fd is ever available
-            jacval = dhdy @ jacval @ dydh
-
-        ## Backward Euler update
-        if i < 1:
-            continue
-        u_n = np.matmul(np.linalg.inv(np.eye(d) - jacval * dt), u)
+    # dt is the timestep of the trajectory
 
-        q, r = np.linalg.qr(u_n)
-        lyap_estimate = np.log(abs(r.diagonal()))
-        all_lyap.append(lyap_estimate)
-        u = q  # post-iteration update axes
-
-        ## early stopping if middle exponents are close to zero, a requirement for
-        ## continuous-time dynamical systems
-        if (np.min(np.abs(lyap_estimate)) < tol) and (i > min_tpts):
-            traj_length = i
+    if model.has_jacobian():
+        jacs = model.jac_batch(traj, tpts)
+    else:
+        jacs = model._jac_central_difference(traj, tpts)
 
-    all_lyap = np.array(all_lyap)
-    final_lyap = np.sum(all_lyap, axis=0) / (dt * traj_length)
+    total, n_steps = _lyapunov_qr_kernel(jacs, dt, tol, min_tpts)
+    final_lyap = total / (dt * n_steps)
     return np.sort(final_lyap)[::-1]
 
 
@@ -391,6 +554,50 @@ def calculate_lyapunov_exponent(traj1, traj2, dt=1.0):
     return lyap
 
 
+def _max_lyapunov_task(args):
+    """
+    Worker entry point, which integrates a reference and a perturbed trajectory from
+    one initial condition in a single batched call, and returns the exponent of their
+    separation and the index at which it was truncated, or None on failure
+    """
+    eq, ic, seed, eps, eps_max, traj_length, timeout, kwargs = args
+    rng = np.random.default_rng(seed)
+    perturbed = ic * (1 + eps * (rng.random(ic.shape) - 0.5))
+    kwargs = {"batched": True, "random_seed": seed, **kwargs}
+    try:
+        with time_limit(timeout):
+            out = eq.make_trajectory(
+                traj_length,
+                init_cond=np.stack([ic, perturbed]),
+                resample=True,
+                return_times=True,
+                **kwargs,
+            )
+    except TimeoutError:
+        return None
+
+    if out is None:
+        return None
+    tvals, trajs = out
+    if trajs.ndim != 3 or len(trajs) != 2 or np.any(np.isnan(trajs)):
+        return None
+    traj1, traj2 = trajs
+
+    ## Truncate traj1 and traj2 to when their scaled separation is less than eps_max
+    separation = np.linalg.norm(traj1 - traj2, axis=1) / np.linalg.norm(traj1, axis=1)
+    within = np.where(separation < eps_max)[0]
+    # the sample is skipped if too few points remain to fit the exponent
+    if len(within) == 0 or within[-1] < 2:
+        return None
+    cutoff_index = within[-1]
+    lyap = calculate_lyapunov_exponent(
+        traj1[:cutoff_index],
+        traj2[:cutoff_index],
+        dt=float(np.median(np.diff(tvals))),
+    )
+    return lyap, cutoff_index
+
+
 def max_lyapunov_exponent(
     eq: DynSys,
     max_walltime: float,
@@ -398,12 +605,21 @@ def max_lyapunov_exponent(
     atol: float = 1e-10,
     n_samples: int = 1000,
     traj_length: int = 5000,
+    use_multiprocessing: bool = False,
+    max_workers: int | None = None,
+    random_state: int | None = None,
     **kwargs,
 ):
     """
     Calculate the lyapunov spectrum of the system using a naive method based on the
     log-transformed separation of the trajectories over time.
 
+    Each sampled initial condition is integrated together with a perturbed copy in a
+    single batched call. Integrations that exceed max_walltime are interrupted. With
+    use_multiprocessing, the samples are distributed over the shared pool of worker
+    processes, and give the same result as a serial run with the same random_state.
+    The system itself is not modified.
+
     Args:
         eq (dysts.DynSys): equation to calculate the lyapunov spectrum of
         rtol (float): relative tolerance for the separation of the trajectories
@@ -413,7 +629,14 @@ def max_lyapunov_exponent(
             enough to ensure that most trajectories explore the attractor.
         max_walltime (float): maximum walltime in seconds to spend on the calculation
             of a given trajectory. If the calculation takes longer than this, the
-            trajectory is discarded and a new one is sampled.
+            trajectory is discarded.
+        use_multiprocessing (bool): whether to integrate the samples in parallel on
+            a persistent pool of worker processes, which can be released with
+            dysts.utils.native_utils.shutdown_worker_pool
+        max_workers (int): the number of worker processes. Defaults to the number of
+            CPUs.
+        random_state (int): seed for the choice of initial conditions and the
+            perturbations, from which each sample draws its own seed
         **kwargs: keyword arguments to pass to the sample / make_trajectory method of
              the dynamical equation
 
@@ -426,64 +649,36 @@ def max_lyapunov_exponent(
         >>> max_lyap = dysts.lyapunov_exponent_naive(eq)
 
     """
+    seeds = np.random.SeedSequence(random_state).generate_state(n_samples + 1)
     all_ic = sample_initial_conditions(
         eq,
         n_samples,
         traj_length=max(traj_length, n_samples),
         pts_per_period=15,
+        random_state=seeds[-1],
+        **{
+            key: val
+            for key, val in kwargs.items()
+            if key not in ("resample", "postprocess", "pts_per_period")
+        },
     )
     pts_per_period = 100
     eps = atol
     eps_max = rtol
-    all_lyap = []
-    all_cutoffs = []
-    for ind, ic in enumerate(all_ic):
-        np.random.seed(ind)
-        eq.ic = ic
-        out = ComputationHolder(
-            eq.make_trajectory,
-            traj_length,
-            timeout=max_walltime,
-            resample=True,
-            return_times=True,
-            **kwargs,
-        ).run()
-        if out is None or np.sum(np.isnan(out[1])) > 0:
-            continue
+
+    tasks = [
+        (eq, ic, seed, eps, eps_max, traj_length, max_walltime, kwargs)
+        for ic, seed in zip(all_ic, seeds)
+    ]
+    with contextlib.ExitStack() as stack:
+        if use_multiprocessing:
+            pool = stack.enter_context(lease_worker_pool(max_workers))
+            results = pool.imap(_max_lyapunov_task, tasks)
         else:
-            # Ensure out is a tuple with at least two elements
-            if isinstance(out, tuple) and len(out) >= 2:
-                tvals, traj1, *_ = out  # Unpack only the first two elements
-            else:
-                continue  # Skip if out is not valid
-
-        np.random.seed(ind)
-        eq.ic = ic
-        eq.ic *= 1 + eps * (np.random.random(eq.ic.shape) - 0.5)
-        traj2 = ComputationHolder(
-            eq.make_trajectory,
-            traj_length,
-            timeout=max_walltime,
-            resample=True,
-            **kwargs,
-        ).run()
-        if traj2 is None:
-            continue
-        if np.sum(np.isnan(traj2)) > 0:
-            continue
-
-        ## Truncate traj1 and traj2 to when their scaled separation is less than eps_max
-        separation = np.linalg.norm(traj1 - traj2, axis=1) / np.linalg.norm(
-            traj1, axis=1
-        )
-        cutoff_index = np.where(separation < eps_max)[0][-1]
-        all_cutoffs.append(cutoff_index)
-        traj1 = traj1[:cutoff_index]
-        traj2 = traj2[:cutoff_index]
-        lyap = calculate_lyapunov_exponent(
-            traj1, traj2, dt=float(np.median(np.diff(tvals)))
-        )  # Convert to float
-        all_lyap.append(lyap)
+            results = map(_max_lyapunov_task, tasks)
+        results = [result for result in results if result is not None]
+    all_lyap = [lyap for lyap, _ in results]
+    all_cutoffs = [cutoff for _, cutoff in results]
 
     ## Return None if no trajectories were successful
     if len(all_lyap) == 0:
@@ -523,14 +718,51 @@ def kaplan_yorke_dimension(spectrum0):
     return dky
 
 
+def _temporally_separated_neighbors(tree, ntraj, min_tsep, k_init=16):
+    """
+    Find the nearest neighbor of each of the first ntraj points of an orbit among the
+    first ntraj points more than min_tsep steps away from it in time
+
+    The k nearest neighbors of every point are queried from a KD-tree of the orbit,
+    and k is doubled for the points whose k nearest neighbors are all excluded.
+    Querying every point in the tree always finds a valid neighbor, and at most
+    2 * min_tsep + 2 + (m - ntraj) points are ever needed.
+
+    Args:
+        tree (cKDTree): A KD-tree of the m points of the orbit
+        ntraj (int): The number of points for which to find neighbors
+        min_tsep (int): The minimal temporal separation between neighbors
+        k_init (int): The number of neighbors queried in the first pass
+
+    Returns:
+        nb_idx (np.ndarray): The index of the nearest valid neighbor of each point
+    """
+    m = tree.n
+    nb_idx = np.zeros(ntraj, dtype=int)
+    todo = np.arange(ntraj)
+    k = min(k_init, m)
+    while len(todo) > 0:
+        k = min(k, 2 * min_tsep + 2 + m - ntraj, m)
+        _, nbs = tree.query(tree.data[todo], k=max(k, 2))
+        valid = (np.abs(nbs - todo[:, None]) > min_tsep) & (nbs < ntraj)
+        found = np.any(valid, axis=1)
+        # the neighbors are sorted by distance, so the first valid one is the closest
+        nb_idx[todo[found]] = nbs[found, np.argmax(valid[found], axis=1)]
+        todo = todo[~found]
+        k *= 2
+    return nb_idx
+
+
 def max_lyapunov_exponent_rosenstein(
     data,
     lag=None,
     min_tsep=None,
     tau=1,
     trajectory_len=20,
-    fit="RANSAC",
+    fit="poly",
     fit_offset=0,
+    emb_dim=1,
+    min_neighbors=20,
 ):
     """
     Adapted from the nolds Python library:
@@ -583,6 +815,12 @@ def max_lyapunov_exponent_rosenstein(
         autocorrelation function drops below 1 - 1/e times its original (maximal)
         value. This procedure is used by default if the user sets lag = None.
 
+    Memory:
+        The delay embedding is a strided view into the data, but the KD-tree used
+        for the neighbor search stores one contiguous float64 copy of the m
+        embedded vectors. Memory therefore grows as m * d * emb_dim, rather than
+        as m^2 for a dense distance matrix.
+
     References:
         .. [lr_1] M. T. Rosenstein, J. J. Collins, and C. J. De Luca,
              "A practical method for calculating largest Lyapunov exponents from
@@ -597,12 +835,15 @@ def max_lyapunov_exponent_rosenstein(
 
     Args:
         data (iterable of float):
-            (one-dimensional) time series
+            time series of shape (n,) or (n, d). Each dimension of a multivariate
+            series is delay embedded, giving orbit vectors of size d * emb_dim
     Kwargs:
         emb_dim (int):
-            embedding dimension for delay embedding
-        lag (float):
-            lag for delay embedding
+            embedding dimension for delay embedding (default: 1, which uses the
+            data as the orbit)
+        lag (int):
+            lag for delay embedding (default: find a suitable value from the
+            autocorrelation of the data)
         min_tsep (float):
             minimal temporal separation between two "neighbors" (default:
             find a suitable value by calculating the mean period of the data)
@@ -617,8 +858,8 @@ def max_lyapunov_exponent_rosenstein(
             trajectories between two neighboring points
         fit (str):
             the fitting method to use for the line fit, either 'poly' for normal
-            least squares polynomial fitting or 'RANSAC' for RANSAC-fitting which
-            is more robust to outliers
+            least squares polynomial fitting (default) or 'RANSAC' for
+            RANSAC-fitting which is more robust to outliers, and requires sklearn
        fit_offset (int):
             neglect the first fit_offset steps when fitting
 
@@ -627,27 +868,54 @@ def max_lyapunov_exponent_rosenstein(
             an estimate of the largest Lyapunov exponent (a positive exponent is
             a strong indicator for chaos)
     """
+    if fit not in ("poly", "RANSAC"):
+        raise ValueError(f"Unknown fit method {fit}, expected 'poly' or 'RANSAC'")
+    if fit == "RANSAC" and not has_module("sklearn"):
+        warnings.warn("RANSAC fitting requires sklearn, using 'poly' instead")
+        fit = "poly"
+
     data = np.asarray(data, dtype="float32")
     n = len(data)
+    data = data.reshape(n, -1)
     max_tsep_factor = 0.25
 
     if lag is None or min_tsep is None:
-        f = np.fft.rfft(data, n * 2 - 1)
+        # spectral magnitudes along time for each dimension of the data
+        f = np.abs(np.fft.rfft(data, n * 2 - 1, axis=0))
 
     if min_tsep is None:
-        mf = np.fft.rfftfreq(n * 2 - 1) * np.abs(f)
-        mf = np.mean(mf[1:]) / np.sum(np.abs(f[1:]))
+        mf = np.fft.rfftfreq(n * 2 - 1) * np.sum(f, axis=1)
+        mf = np.mean(mf[1:]) / np.sum(f[1:])
         min_tsep = int(np.ceil(1.0 / mf))
         if min_tsep > max_tsep_factor * n:
             min_tsep = int(max_tsep_factor * n)
 
-    orbit = data
+    if lag is None:
+        # the autocorrelation is the inverse transform of the power spectrum
+        acorr = np.fft.irfft(np.sum(f**2, axis=1), n * 2 - 1)[:n]
+        eps = acorr[0] * (1 - 1.0 / np.e)
+        lags = np.arange(1, max(n // 10, 2))
+        n_neighbors = n - min_data_points_rosenstein(
+            emb_dim, lags, trajectory_len, min_tsep
+        )
+        decorrelated = acorr[lags] < eps
+        too_few = n_neighbors < min_neighbors
+        stop = np.argmax(decorrelated | too_few)
+        lag = int(lags[stop])
+        if too_few[stop] and not decorrelated[stop]:
+            warnings.warn(
+                f"autocorrelation declined too slowly to find suitable lag, setting lag to {lag}",
+                RuntimeWarning,
+            )
+
+    # delay embedding as a strided view of shape (m, d, emb_dim) into the data
+    span = (emb_dim - 1) * lag + 1
+    if span > n:
+        raise ValueError(
+            f"Not enough data points to embed with emb_dim={emb_dim} and lag={lag}."
+        )
+    orbit = np.lib.stride_tricks.sliding_window_view(data, span, axis=0)[..., ::lag]
     m = len(orbit)
-    dists = np.array([rowwise_euclidean(orbit, orbit[i]) for i in range(m)])
-
-    for i in range(m):
-        dists[i, max(0, i - min_tsep) : i + min_tsep + 1] = float("inf")
-
     ntraj = m - trajectory_len + 1
     min_traj = min_tsep * 2 + 2
 
@@ -660,12 +928,16 @@ def max_lyapunov_exponent_rosenstein(
             f"Not enough data points. At least {min_traj} trajectories are required to find a valid neighbor for each orbit vector with min_tsep={min_tsep} but only {ntraj} could be created."
         )
 
-    nb_idx = np.argmin(dists[:ntraj, :ntraj], axis=1)
+    # the KD-tree needs the orbit vectors as one contiguous array of m x (d * emb_dim)
+    # doubles. This is the only copy of the embedding, and is reused below.
+    tree = cKDTree(np.ascontiguousarray(orbit, dtype=np.float64).reshape(m, -1))
+    nb_idx = _temporally_separated_neighbors(tree, ntraj, min_tsep)
 
+    # follow each pair of neighbors forward, one offset at a time over all pairs
     div_traj = np.zeros(trajectory_len, dtype=float)
+    idx = np.arange(ntraj)
     for k in range(trajectory_len):
-        indices = (np.arange(ntraj) + k, nb_idx + k)
-        div_traj_k = dists[indices]
+        div_traj_k = rowwise_euclidean(tree.data[idx + k], tree.data[nb_idx + k])
         nonzero = np.where(div_traj_k != 0)
         div_traj[k] = (
             -np.inf if len(nonzero[0]) == 0 else np.mean(np.log(div_traj_k[nonzero]))
@@ -679,9 +951,16 @@ def max_lyapunov_exponent_rosenstein(
     if len(ks) < 1:
         return -np.inf
 
-    poly = np.polyfit(ks[fit_offset:], div_traj[fit_offset:], 1)
+    if fit == "RANSAC":
+        from sklearn.linear_model import RANSACRegressor
 
-    le = poly[0] / tau
+        model = RANSACRegressor(random_state=0)
+        model.fit(ks[fit_offset:, None], div_traj[fit_offset:])
+        slope = model.estimator_.coef_[0]
+    else:
+        slope = np.polyfit(ks[fit_offset:], div_traj[fit_offset:], 1)[0]
+
+    le = slope / tau
     return le
 
 
@@ -763,7 +1042,7 @@ def dfa(
 
     Args:
         data (array-like of float):
-            time series
+            time series, or an array of shape (N, T) of N time series of length T
     Kwargs:
         nvals (iterable of int):
             subseries sizes at which to calculate fluctuation
@@ -779,10 +1058,11 @@ def dfa(
             the estimate alpha for the Hurst parameter (alpha < 1: stationary
             process similar to fractional Gaussian noise with H = alpha,
             alpha > 1: non-stationary process similar to fractional Brownian
-            motion with H = alpha - 1)
+            motion with H = alpha - 1). For a batch of time series, an array of
+            N estimates.
     """
-    data = np.asarray(data)
-    total_N = len(data)
+    data = np.asarray(data, dtype=float)
+    total_N = data.shape[-1]
     if nvals is None:
         nvals = logarithmic_n(4, 0.1 * total_N, 1.2)
     if len(nvals) < 2:
@@ -792,22 +1072,31 @@ def dfa(
     if np.max(nvals) >= total_N:
         raise ValueError("nvals cannot be larger than the input size")
 
-    walk = np.cumsum(data - np.mean(data))
+    walk = np.cumsum(data - np.mean(data, axis=-1, keepdims=True), axis=-1)
     fluctuations = []
     for n in nvals:
         if overlap:
-            d = np.array([walk[i : i + n] for i in range(0, len(walk) - n, n // 2)])
+            # windows starting every n // 2 steps, as views into the walk
+            d = np.lib.stride_tricks.sliding_window_view(walk, n, axis=-1)
+            d = d[..., : total_N - n : n // 2, :]
         else:
-            d = walk[: total_N - (total_N % n)]
-            d = d.reshape((total_N // n, n))
-        x = np.arange(n)
-        tpoly = [np.polyfit(x, d[i], order) for i in range(len(d))]
-        tpoly = np.array(tpoly)
-        trend = np.array([np.polyval(tpoly[i], x) for i in range(len(d))])
-        flucs = np.sqrt(np.sum((d - trend) ** 2, axis=1) / n)
-        f_n = np.sum(flucs) / len(flucs)
-        fluctuations.append(f_n)
+            d = walk[..., : total_N - (total_N % n)]
+            d = d.reshape(walk.shape[:-1] + (total_N // n, n))
+        # least squares fits of every window share the pseudoinverse of the
+        # Vandermonde matrix, evaluated on [-1, 1] for better conditioning
+        vander = np.vander(np.linspace(-1, 1, n), order + 1)
+        trend = (d @ np.linalg.pinv(vander).T) @ vander.T
+        flucs = np.sqrt(np.sum((d - trend) ** 2, axis=-1) / n)
+        fluctuations.append(np.mean(flucs, axis=-1))
     fluctuations = np.array(fluctuations)
+
+    if fluctuations.ndim > 1:
+        return np.array([_dfa_fit(nvals, f) for f in fluctuations.T])
+    return _dfa_fit(nvals, fluctuations)
+
+
+def _dfa_fit(nvals, fluctuations):
+    """The slope of the log fluctuations against the log window sizes"""
     nonzero = np.where(fluctuations != 0)
     nvals = np.array(nvals)[nonzero]
     fluctuations = fluctuations[nonzero]
@@ -1,38 +1,93 @@
 """Dynamical systems in Python"""
 
+import copy
 import gzip
 import json
+import os
 import warnings
 from functools import partial
 from importlib import resources
 from typing import Any, Callable, Sequence
 
 import numpy as np
+import scipy  # submodules are imported by scipy on first access
 from numpy.typing import ArrayLike
-from scipy.interpolate import interp1d
-
-from .utils import cast_to_numpy, ddeint, has_module, integrate_dyn, standardize_ts
-
-if has_module("numba"):
-    from numba import njit
-else:
-    warnings.warn("Numba not installed. Falling back to no JIT compilation.")
-
-    def njit(func):
-        return func
 
+from .utils import (
+    JIT_METHODS,
+    LazyJit,
+    cast_to_numpy,
+    ddeint,
+    integrate_delay_jit,
+    integrate_dyn,
+    integrate_jit,
+    integrate_sde_jit,
+    interp_delay_embedding,
+    iterate_map_jit,
+    make_jit_jac,
+    read_trajectory,
+    standardize_ts,
+)
 
 BASE_REQUIRED_METADATA = ("parameters", ("dimension", "embedding_dimension"))
 
+# stiffness ratio above which method="auto" integrates with an implicit method. On
+# ForcedVanDerPol with increasing mu, DOP853 was faster below a ratio of about 700 and
+# Radau above about 1000. No shipped system comes close (the stiffest probe, for
+# BelousovZhabotinsky, gives about 340), so "auto" currently chooses DOP853 for all of
+# them, as recorded in the integration_method field of the metadata.
+STIFFNESS_THRESHOLD = 1e3
+
 DATAPATH_CONTINUOUS = str(
     resources.files("dysts").joinpath("data/chaotic_attractors.json")
 )
 DATAPATH_DISCRETE = str(resources.files("dysts").joinpath("data/discrete_maps.json"))
 
+# parsed metadata files, keyed by absolute path and stored with their modification time
+_METADATA_REGISTRY: dict[str, tuple[float, dict[str, Any]]] = {}
+
+
+def get_metadata(data_path: str) -> dict[str, Any]:
+    """Get the parsed contents of a metadata JSON file
+
+    The file is parsed once per process and shared by every system that reads from
+    it. It is parsed again if it has been modified on disk, or after reload_metadata()
+    is called. The returned dictionary is shared, and should not be modified.
+
+    Args:
+        data_path: Path to the JSON file containing metadata
+
+    Returns:
+        The metadata for all systems in the file, keyed by system name
+    """
+    key = os.path.abspath(data_path)
+    mtime = os.path.getmtime(key)
+    if key not in _METADATA_REGISTRY or _METADATA_REGISTRY[key][0] != mtime:
+        with open(key, "r") as file:
+            _METADATA_REGISTRY[key] = (mtime, json.load(file))
+    return _METADATA_REGISTRY[key][1]
+
+
+def reload_metadata(data_path: str | None = None) -> None:
+    """Invalidate cached metadata, so that it is parsed again on the next access
+
+    Args:
+        data_path: Path to the metadata file to invalidate. Defaults to all files.
+    """
+    if data_path is None:
+        _METADATA_REGISTRY.clear()
+    else:
+        _METADATA_REGISTRY.pop(os.path.abspath(data_path), None)
+
 
 def staticjit(func: Callable) -> Callable:
-    """Decorator to apply numba's njit decorator to a static method"""
-    return staticmethod(njit(func))
+    """Decorator to apply numba's njit decorator to a static method
+
+    Compilation is deferred until the method is first accessed, and compiled code is
+    cached on disk so that new processes can reuse it. See set_jit_cache_dir() to
+    control the location of the cache.
+    """
+    return LazyJit(func, cache=True)
 
 
 class BaseDyn:
@@ -116,13 +171,13 @@ class BaseDyn:
         """
         Load data from a JSON file
 
-        Returns None if the system name is not found
+        Returns an empty dictionary if the system name is not found
         """
-        with open(data_path, "r") as file:
-            data = json.load(file)
+        data = get_metadata(data_path)
 
         if system_name in data:
-            return data[system_name]
+            # copy, since the system consumes some entries of its metadata
+            return copy.deepcopy(data[system_name])
         else:
             warnings.warn(f"No metadata available for {system_name}")
             return {}
@@ -135,7 +190,9 @@ class BaseDyn:
         Load a precomputed trajectory for the dynamical system
 
         Args:
-            data_path (str): Path to the data file, of format {name}.json.gz
+            data_path (str): Path to a trajectory store directory, or to a data file of
+                format {name}.json.gz. Trajectories in a store are returned as read-only
+                memory-mapped views, without copying.
             standardize (bool): Standardize the output time series.
             return_times (bool): Whether to return the timepoints at which the solution
                 was computed
@@ -145,13 +202,18 @@ class BaseDyn:
             tpts, sol (ndarray): T x 1 timepoint array, and T x D trajectory
 
         """
-        with gzip.open(data_path, "rt", encoding="utf-8") as file:
-            dataset = json.load(file)
+        if os.path.isdir(data_path):
+            tpts, sol = read_trajectory(data_path, system_name)
+            if return_times and tpts is None:
+                raise ValueError(f"No timepoints stored for {system_name}")
+        else:
+            with gzip.open(data_path, "rt", encoding="utf-8") as file:
+                dataset = json.load(file)
 
-        tpts, sol = (
-            np.array(dataset[system_name]["time"]),
-            np.array(dataset[system_name]["values"]),
-        )
+            tpts, sol = (
+                np.array(dataset[system_name]["time"]),
+                np.array(dataset[system_name]["values"]),
+            )
 
         if standardize:
             sol = standardize_ts(sol)
@@ -233,14 +295,162 @@ class DynSys(BaseDyn):
             maximum_lyapunov_estimated=maximum_lyapunov_estimated,
             **kwargs,
         )
+        # the integration_method in the metadata was chosen for the parameters in the
+        # metadata, and so does not apply to overridden parameters
+        self._integration_method_params = (
+            None if parameters is not None else self._copy_param_list()
+        )
+
+    def _copy_param_list(self) -> list[np.ndarray]:
+        return [np.array(param, copy=True) for param in self.param_list]
+
+    def _has_integration_method_params(self) -> bool:
+        """Check if integration_method was chosen for the current parameters"""
+        chosen_for = self._integration_method_params
+        return chosen_for is not None and (
+            len(chosen_for) == len(self.param_list)
+            and all(np.array_equal(a, b) for a, b in zip(chosen_for, self.param_list))
+        )
 
     def rhs(self, X, t):
         """The right hand side of a dynamical equation"""
         return self._rhs(*X.T, t, *self.param_list)  # type: ignore
 
+    def rhs_batch(self, X: np.ndarray, t: float) -> np.ndarray:
+        """
+        The right hand side evaluated at a batch of states. Systems with scalar
+        expressions for the right hand side are vectorized automatically, while
+        systems that cannot be evaluated elementwise override this method.
+
+        Args:
+            X: A B x D array of states
+            t: The time at which to evaluate the right hand side
+
+        Returns:
+            np.ndarray: A B x D array of derivatives
+        """
+        if type(self).rhs is DynSys.rhs:
+            out = self._rhs(*X.T, t, *self.param_list)  # type: ignore
+        else:  # hand-written right hand sides unpack the state along the first axis
+            out = self.rhs(X.T, t)
+        return np.stack([np.broadcast_to(item, X.shape[:1]) for item in out], axis=-1)
+
+    def has_jit_rhs(self) -> bool:
+        """Check if the right hand side is a numba-compiled _rhs"""
+        return type(self).rhs is DynSys.rhs and hasattr(self._rhs, "py_func")
+
     def jac(self, X, t):
-        """The Jacobian of the dynamical system"""
-        return self._jac(*X.T, t, *self.param_list)
+        """
+        The Jacobian of the dynamical system
+
+        Args:
+            X: A state of dimension D, or a B x D array of states
+            t: The time at which to evaluate the Jacobian
+
+        Returns:
+            np.ndarray: A D x D Jacobian, or a B x D x D array of Jacobians
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            return self.jac_batch(X[None], t)[0]
+        return self.jac_batch(X, t)
+
+    def jac_batch(self, X, t, out=None):
+        """
+        The Jacobians of the dynamical system at a batch of states. Compiled Jacobians
+        are evaluated at every state in a single call.
+
+        Args:
+            X: A B x D array of states
+            t: The time at which to evaluate the Jacobians, or an array of B times
+            out: An optional preallocated B x D x D array to write the Jacobians into
+
+        Returns:
+            np.ndarray: A B x D x D array of Jacobians
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n, dim = X.shape
+        tvals = np.broadcast_to(np.asarray(t, dtype=np.float64), (n,))
+        if out is None:
+            out = np.empty((n, dim, dim))
+
+        if hasattr(self._jac, "py_func"):
+            jit_jac = make_jit_jac(self._jac, dim)
+            return jit_jac(X, tvals, tuple(self.param_list), out)
+
+        for b in range(n):
+            out[b] = self._jac(*X[b], tvals[b], *self.param_list)
+        return out
+
+    def _jac_central_difference(self, X, t, rel_eps=1e-6):
+        """Central difference Jacobians at a B x D array of states, for systems without
+        an analytic Jacobian. The perturbed copies of each state form one batch."""
+        n, dim = X.shape
+        tvals = np.broadcast_to(np.asarray(t, dtype=np.float64), (n,))
+        jacs = np.empty((n, dim, dim))
+        for i, (ti, x) in enumerate(zip(tvals, X)):
+            eps = rel_eps * np.maximum(np.abs(x), 1.0)
+            perturbed = self.rhs_batch(
+                np.concatenate([x + np.diag(eps), x - np.diag(eps)]), ti
+            )
+            jacs[i] = ((perturbed[:dim] - perturbed[dim:]) / (2 * eps[:, None])).T
+        return jacs
+
+    def estimate_stiffness(self, n: int = 64, pts_per_period: int = 16) -> float:
+        """
+        Estimate the stiffness of the system with a cheap probe: the largest spectral
+        radius of the Jacobian along a short, loosely integrated trajectory, relative
+        to the dominant angular frequency 2 pi / period of the system.
+
+        Args:
+            n: The number of points at which the Jacobian is evaluated
+            pts_per_period: The number of points per period of the probe trajectory
+
+        Returns:
+            The stiffness ratio, or np.inf if the probe trajectory diverges
+        """
+        out = self.make_trajectory(
+            n,
+            method="RK45",
+            rtol=1e-6,
+            atol=1e-6,
+            resample=self.period is not None,
+            pts_per_period=pts_per_period,
+            return_times=True,
+            postprocess=False,
+        )
+        if out is None or not np.all(np.isfinite(out[1])):
+            return np.inf
+
+        tpts, traj = out
+        if self.has_jacobian():
+            jacs = self.jac_batch(traj, tpts)
+        else:
+            jacs = self._jac_central_difference(traj, tpts)
+        radius = np.max(np.abs(np.linalg.eigvals(jacs)))
+
+        period = self.period if self.period is not None else (n - 1) * self.dt
+        return radius * period / (2 * np.pi)
+
+    def select_integration_method(
+        self, threshold: float = STIFFNESS_THRESHOLD, **kwargs
+    ) -> str:
+        """
+        Choose the implicit "Radau" method for stiff systems and the explicit "DOP853"
+        method otherwise, and store the choice in the integration_method attribute
+        used by make_trajectory(method="auto")
+
+        Args:
+            threshold: The stiffness ratio above which a system is treated as stiff
+            **kwargs: Arguments passed to estimate_stiffness()
+
+        Returns:
+            The name of the chosen solve_ivp method
+        """
+        stiffness = self.estimate_stiffness(**kwargs)
+        self.integration_method = "Radau" if stiffness > threshold else "DOP853"
+        self._integration_method_params = self._copy_param_list()
+        return self.integration_method
 
     def __call__(self, X, t):
         """Wrapper around right hand side"""
@@ -263,6 +473,7 @@ class DynSys(BaseDyn):
         rtol: float = 1e-12,
         atol: float = 1e-12,
         verbose: bool = False,
+        batched: bool = False,
         **kwargs,
     ) -> np.ndarray | tuple[np.ndarray, np.ndarray] | None:
         """
@@ -278,12 +489,26 @@ class DynSys(BaseDyn):
             standardize: If True, standardize the output time series.
             postprocess: If True, apply coordinate conversions and rescalings.
             noise: Stochasticity level in integrated dynamics (corresponds to Brownian motion).
+                Noisy trajectories are integrated with the Euler-Maruyama method with
+                step dt, which is compiled when the system has a jitted _rhs. The
+                method argument is then ignored.
             timescale: Timescale for resampling. "Fourier" (default) or "Lyapunov".
-            method: Integration method.
+            method: Integration method. Any solve_ivp method, or one of the compiled
+                methods "RK4" (fixed step dt) and "DOPRI5" (adaptive, starting from
+                step dt), which run entirely in numba and require a jitted _rhs.
+                "auto" uses the system's integration_method from the metadata, which
+                is recorded for the default parameters. If the parameters have been
+                overridden or transformed, or no method is recorded, it selects one
+                with a stiffness probe (select_integration_method).
             random_seed: Seed for random number generation.
             rtol: Relative tolerance for integration.
             atol: Absolute tolerance for integration.
             verbose: Whether to trigger warnings.
+            batched: If True, integrate all initial conditions at once as a single
+                stacked state vector of length B * D. The step size is then shared
+                across the batch. If the batch fails to integrate, each initial
+                condition is integrated separately so that diverging ones are dropped.
+                Ignored when solve_ivp events are passed.
             **kwargs: Additional arguments for integration routine.
 
         Returns:
@@ -298,6 +523,11 @@ class DynSys(BaseDyn):
         """
         np.random.seed(random_seed)
 
+        if method == "auto":
+            method = getattr(self, "integration_method", None)
+            if method is None or not self._has_integration_method_params():
+                method = self.select_integration_method()
+
         # set timescales and interpolation points for the solution
         dt = dt if self.dt is None else self.dt
 
@@ -328,14 +558,101 @@ class DynSys(BaseDyn):
         std = self.std if standardize else np.ones_like(ics[0])
 
         def standard_jac(t, X):
-            return self.jac(X * std + mu, t) / std
+            return self.jac(X * std + mu, t) * std / std[:, None]
 
         def standard_rhs(t, X):
             return self(X * std + mu, t) / std
 
-        # compute trajectories
+        def standard_jac_batch(t, X):
+            jacs = self.jac_batch(X.reshape(-1, ics.shape[-1]) * std + mu, t)
+            return scipy.sparse.block_diag(jacs * std / std[:, None], format="csc")
+
+        def standard_rhs_batch(t, X):
+            X = X.reshape(-1, ics.shape[-1])
+            return (self.rhs_batch(X * std + mu, t) / std).ravel()
+
+        # optionally integrate all initial conditions at once as a single stacked
+        # state vector, falling back to one at a time if the batch fails
         sol = list()
-        for ic in ics:
+        unsolved = ics
+        noisy = np.abs(noise).sum() > 0
+        rng = np.random.default_rng(random_seed)
+        if method in JIT_METHODS or (noisy and self.has_jit_rhs()):
+            if not self.has_jit_rhs():
+                raise ValueError(
+                    f"{self.name} does not have a compiled _rhs, which is required for method {method}"
+                )
+            # solve_ivp options do not apply to the compiled loops, and only the
+            # deterministic ones accept max_steps
+            accepted = set() if noisy else {"max_steps"}
+            unsupported = sorted(set(kwargs) - accepted)
+            if unsupported:
+                warnings.warn(
+                    f"{self.name}: Ignoring the options {unsupported}, which the "
+                    f"compiled {'Euler-Maruyama' if noisy else method} method does "
+                    "not accept."
+                )
+            if noisy:
+                # noise * diag(ic) is the diffusion of the standardized system
+                trajs = integrate_sde_jit(
+                    self._rhs,
+                    ics,
+                    tpts,
+                    noise * (ics - mu),
+                    params=tuple(self.param_list),
+                    dtval=dt,
+                    random_state=rng,
+                )
+            else:
+                trajs = integrate_jit(
+                    self._rhs,
+                    ics,
+                    tpts,
+                    params=tuple(self.param_list),
+                    method=method,
+                    dtval=dt,
+                    rtol=rtol,
+                    atol=atol,
+                    **{k: v for k, v in kwargs.items() if k == "max_steps"},
+                )
+            for ic, traj in zip(ics, trajs):
+                if traj.shape[-1] == len(tpts):
+                    sol.append((traj - mu[:, None]) / std[:, None])
+                elif verbose:
+                    warnings.warn(
+                        f"{self.name}: Integration did not complete for initial condition {ic}, only got {traj.shape[-1]} points. Skipping this initial condition."
+                    )
+            unsolved = ics[:0]
+        elif batched and len(ics) > 1 and kwargs.get("events") is None:
+            batch_kwargs = dict(kwargs)
+            if not self.has_jacobian() and method in ["Radau", "BDF"]:
+                block = np.ones((ics.shape[-1], ics.shape[-1]))
+                batch_kwargs.setdefault(
+                    "jac_sparsity", scipy.sparse.block_diag([block] * len(ics))
+                )
+            traj = integrate_dyn(
+                standard_rhs_batch,
+                ((ics - mu) / std).ravel(),
+                tpts,
+                dtval=dt,
+                method=method,
+                noise=noise,
+                random_state=rng,
+                jac=standard_jac_batch if self.has_jacobian() else None,
+                rtol=rtol,
+                atol=atol,
+                **batch_kwargs,
+            )
+            if traj.shape[-1] == len(tpts):
+                sol = list(traj.reshape(len(ics), ics.shape[-1], -1))
+                unsolved = ics[:0]
+            elif verbose:
+                warnings.warn(
+                    f"{self.name}: Batched integration did not complete, only got {traj.shape[-1]} points. Integrating each initial condition separately."
+                )
+
+        # compute trajectories
+        for ic in unsolved:
             traj = integrate_dyn(
                 standard_rhs,
                 (ic - mu) / std,
@@ -343,6 +660,7 @@ class DynSys(BaseDyn):
                 dtval=dt,
                 method=method,
                 noise=noise,
+                random_state=rng,
                 jac=standard_jac if self.has_jacobian() else None,
                 rtol=rtol,
                 atol=atol,
@@ -398,6 +716,10 @@ class DynMap(BaseDyn):
         out = self._rhs(*X.T, *self.param_list)
         return np.vstack(out).T
 
+    def has_jit_rhs(self) -> bool:
+        """Check if the map is a numba-compiled _rhs"""
+        return type(self).rhs is DynMap.rhs and hasattr(self._rhs, "py_func")
+
     def rhs_inv(self, Xp):
         """The inverse of the right hand side of a dynamical map"""
         if self._rhs_inv is not None:
@@ -450,11 +772,14 @@ class DynMap(BaseDyn):
         else:
             propagator = self.rhs
 
-        traj = np.zeros((curr.shape[0], n, curr.shape[-1]))
+        if not inverse and self.has_jit_rhs():
+            traj = iterate_map_jit(self._rhs, curr, n, params=tuple(self.param_list))
+        else:
+            traj = np.zeros((curr.shape[0], n, curr.shape[-1]))
 
-        for i in range(n):
-            curr = propagator(curr)
-            traj[:, i, :] = curr
+            for i in range(n):
+                curr = propagator(curr)
+                traj[:, i, :] = curr
 
         sol = np.squeeze(traj)
 
@@ -469,7 +794,8 @@ class DynMap(BaseDyn):
 
 class DynSysDelay(BaseDyn):
     """
-    A delayed differential equation object. Uses a exposed fork of ddeint
+    A delayed differential equation object. Integrates with a compiled method of steps,
+    or with an exposed fork of ddeint.
     The delay timescale is assumed to be the "tau" field. The embedding dimensions are set to a
     default value, but delay equations are infinite dimensional.
     """
@@ -506,6 +832,12 @@ class DynSysDelay(BaseDyn):
         xt, xt_delayed = X(t), X(t - tau)
         return self._rhs(xt, xt_delayed, t, *self.param_list)  # type: ignore
 
+    def has_jit_rhs(self) -> bool:
+        """Check if the right hand side is a numba-compiled _rhs"""
+        return type(self).delayed_rhs is DynSysDelay.delayed_rhs and hasattr(
+            self._rhs, "py_func"
+        )
+
     def make_trajectory(
         self,
         n: int,
@@ -519,6 +851,7 @@ class DynSysDelay(BaseDyn):
         return_times: bool = False,
         embedding_dim: int | None = None,
         history_function: Callable[[float], ArrayLike] | None = None,
+        method: str = "RK4",
         random_seed: int = 0,
         **kwargs,
     ):
@@ -528,8 +861,8 @@ class DynSysDelay(BaseDyn):
 
         Args:
             n (int): the total number of trajectory points
-            method (str): Not used. Currently Euler is the only option here
-            noise (float): The amplitude of brownian forcing
+            init_cond (ndarray): The initial condition, or a B x D batch of initial
+                conditions. The first entry of each sets a constant history.
             resample (bool): whether to resample trajectories to have matching dominant
                 Fourier components
             pts_per_period (int): if resampling, the number of points per period
@@ -547,10 +880,17 @@ class DynSysDelay(BaseDyn):
                 delay embedding of shape (n, d*embedding_dim) where each consecutive (n, d) block
                 will be a trajectory for a different delay parameter.
             history_function (callable): Function for specifying past conditions i.e.
-                points for t < 0
+                points for t < 0. For a batch of initial conditions, it returns one
+                past condition per initial condition.
+            method (str): "RK4" (default) integrates with a compiled fixed-step
+                Runge-Kutta method of steps, with timestep dt. "ddeint" uses the
+                adaptive scipy-based solver, which is also used when the right hand
+                side is not compiled. A batch of histories is integrated by "RK4"
+                in a single pass over the time grid.
 
-        Todo:
-            Support for multiple initial conditions
+        Returns:
+            sol (ndarray): A n x (d * embedding_dim) trajectory, or a batch of
+                trajectories of shape (B, n, d * embedding_dim)
         """
         np.random.seed(random_seed)
 
@@ -581,36 +921,64 @@ class DynSysDelay(BaseDyn):
                 "No initial conditions provided and no default initial conditions available for this system."
             )
         ics = init_cond if init_cond is not None else self.ic
+        batched = np.ndim(ics) > 1
+        ics = np.atleast_2d(ics)
 
         # assume constant past points, overridable behavior
         # need to change initial conditions to NOT be the same size as the default embedding
         # dimensions, since the delay embedding happens as a postprocessing step
-        history_fn = history_function or (lambda t: ics[0])
-        sol = ddeint(partial(self.delayed_rhs, tau=tau), history_fn, tpts)
-
-        # augment the trajectory with per-dimension delay embeddings
-        interp_fns = [
-            interp1d(
+        if history_function is None:
+            history_fn = lambda t: ics[:, 0]
+        elif batched:
+            history_fn = history_function
+        else:
+            history_fn = lambda t: [history_function(t)]
+
+        if method not in ("RK4", "ddeint"):
+            raise ValueError(f"Unknown delay integration method {method}")
+        if method == "RK4" and self.has_jit_rhs():
+            sols = integrate_delay_jit(
+                self._rhs,
+                history_fn,
                 tpts,
-                sol[:, dim],
-                axis=0,
-                kind=kwargs.pop("kind", "linear"),
+                tau,
+                params=self.param_list,
+                dtval=dt,
+                batched=True,
             )
-            for dim in range(sol.shape[-1])
-        ]
+        else:
+            sols = [
+                ddeint(
+                    partial(self.delayed_rhs, tau=tau),
+                    lambda t, i=i: history_fn(t)[i],
+                    tpts,
+                )
+                for i in range(len(ics))
+            ]
 
+        # augment each trajectory with per-dimension delay embeddings
+        kind = kwargs.pop("kind", "linear")
         sample_ts = np.linspace(tau, tpts[-1], n)
-        sol = (
-            np.stack(
-                [
-                    [fn(sample_ts - tau) for fn in interp_fns]
-                    for tau in np.linspace(0, tau, emb_dim)
-                ],
-                axis=1,
-            )
-            .reshape(-1, len(tpts))
-            .T
-        )
+        lags = np.linspace(0, tau, emb_dim)
+        if kind == "linear":
+            sol = interp_delay_embedding(sols, tpts, sample_ts, lags)
+        else:
+            embedded = []
+            for traj in sols:
+                interp_fns = [
+                    scipy.interpolate.interp1d(tpts, traj[:, dim], axis=0, kind=kind)
+                    for dim in range(traj.shape[-1])
+                ]
+                embedded.append(
+                    np.stack(
+                        [[fn(sample_ts - lag) for fn in interp_fns] for lag in lags],
+                        axis=1,
+                    )
+                    .reshape(-1, len(tpts))
+                    .T
+                )
+            sol = np.stack(embedded)
+        sol = sol if batched else sol[0]
 
         if standardize:
             sol = standardize_ts(sol)
@@ -65,6 +65,48 @@ class LorenzBounded(DynSys):
         )
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, beta, r, rho, sigma):
+        x0 = y**2
+        x1 = x**2
+        x2 = 3 * x1
+        x3 = 2 * y
+        x4 = x * x3
+        x5 = z**2
+        x6 = r**2
+        x7 = x5 - x6
+        x8 = -x4 + x7
+        x9 = 1 / x6
+        x10 = sigma * x9
+        x11 = 3 * x0
+        x12 = x1 + x11
+        x13 = 2 * z
+        x14 = x4 * z
+        x15 = x * x5
+        x16 = x**3 - x * x6
+        row1 = [x10 * (x0 + x2 + x8), x10 * (-x12 - x8), x10 * x13 * (x - y)]
+        row2 = [
+            x9
+            * (
+                -rho * x0
+                - rho * x2
+                - rho * x5
+                + x0 * z
+                + x2 * z
+                + x4
+                + x6 * (rho - z)
+                + z**3
+            ),
+            x9 * (-rho * x4 + x12 + x14 + x7),
+            x9 * (-rho * x * x13 + x * x0 + 3 * x15 + x16 + x3 * z),
+        ]
+        row3 = [
+            x9 * (2 * beta * x * z - x2 * y - x5 * y + x6 * y - y**3),
+            x9 * (2 * beta * y * z - x * x11 - x15 - x16),
+            x9 * (beta * x0 + beta * x1 + 3 * beta * x5 - beta * x6 - x14),
+        ]
+        return row1, row2, row3
+
 
 class LorenzCoupled(DynSys):
     @staticjit
@@ -77,6 +119,17 @@ class LorenzCoupled(DynSys):
         z2dot = x2 * y2 - beta * z2
         return x1dot, y1dot, z1dot, x2dot, y2dot, z2dot
 
+    @staticjit
+    def _jac(x1, y1, z1, x2, y2, z2, t, beta, eps, rho, rho1, rho2, sigma):
+        x0 = -beta
+        row1 = [-sigma, sigma, 0, 0, 0, 0]
+        row2 = [rho1 - z1, -1, -x1, 0, 0, 0]
+        row3 = [y1, x1, x0, 0, 0, 0]
+        row4 = [eps, 0, 0, -eps - sigma, sigma, 0]
+        row5 = [0, 0, 0, rho2 - z2, -1, -x2]
+        row6 = [0, 0, 0, y2, x2, x0]
+        return row1, row2, row3, row4, row5, row6
+
 
 class Lorenz96(DynSys):
     def rhs(self, X, t):
@@ -160,6 +213,67 @@ class DoublePendulum(DynSys):
 
         return th1dot, th2dot, p1dot, p2dot
 
+    @staticjit
+    def _jac(th1, th2, p1, p2, t, g, l1, l2, m1, m2):
+        x0 = th1 - th2
+        x1 = np.sin(x0)
+        x2 = m2 * x1**2
+        x3 = m1 + x2
+        x4 = l1 * p2
+        x5 = l2 * p1
+        x6 = np.cos(x0)
+        x7 = 2 * x6
+        x8 = m2 * x7 * (x4 * x6 - x5) + x3 * x4
+        x9 = 1 / l1**2
+        x10 = 1 / l2
+        x11 = 1 / x3**2
+        x12 = x1 * x11
+        x13 = x10 * x12 * x9
+        x14 = 1 / x3
+        x15 = 1 / l1
+        x16 = x10 * x15
+        x17 = x14 * x16
+        x18 = x17 * x6
+        x19 = -x18
+        x20 = m1 + m2
+        x21 = m2 * x6
+        x22 = x20 * x4 - x21 * x5
+        x23 = x22 * x7
+        x24 = -x23 + x3 * x5
+        x25 = 1 / l2**2
+        x26 = x15 * x25
+        x27 = x12 * x26
+        x28 = x20 * x25
+        x29 = 2 * th1 - 2 * th2
+        x30 = np.sin(x29)
+        x31 = p1**2
+        x32 = 1 / l1**3
+        x33 = x10 * x32
+        x34 = x1 / x3**3
+        x35 = (
+            m2**2 * x31 * x33 * x34 * x7
+            - 0.5 * m2 * p1 * p2 * x1 * x10 * x11 * x15
+            + m2 * p2 * x23 * x26 * x34
+        )
+        x36 = 0.5 * x11
+        x37 = p2 * x36
+        x38 = x22 * x26
+        x39 = 2 * (0.5 * m2 * x11 * x31 * x33 + x37 * x38) * np.cos(x29)
+        x40 = p1 * p2
+        x41 = x18 * x40
+        x42 = x11 * x16 * x2 * x40 * x7
+        x43 = x39 - x41 + x42
+        x44 = -x30 * x35 + x43
+        x45 = x30 * x35
+        x46 = x1 * x17
+        x47 = -p2 * x46 + x30 * (m2 * p1 * x10 * x11 * x32 - x16 * x21 * x37)
+        x48 = -p1 * x46 + x30 * (x28 * x37 + x36 * x38)
+        row1 = [x13 * x8, -x13 * x8, x14 * x9, x19]
+        row2 = [x24 * x27, -x24 * x27, x19, x14 * x28 / m2]
+        row3 = [-g * l1 * x20 * np.cos(th1) + x44, -x43 + x45, x47, x48]
+        row4 = [-x44, -g * l2 * m2 * np.cos(th2) + x39 - x41 + x42 - x45, -x47, -x48]
+        return row1, row2, row3, row4
+
     @staticmethod
     @staticjit
     def _postprocessing(th1, th2, p1, p2):
@@ -176,6 +290,18 @@ class SwingingAtwood(DynSys):
         pthdot = -m1 * g * r * np.sin(th)
         return rdot, thdot, prdot, pthdot
 
+    @staticjit
+    def _jac(r, th, pr, pth, t, m1, m2):
+        x0 = 1 / m1
+        x1 = 2 * pth * x0 / r**3
+        x2 = 9.82 * m1
+        x3 = -x2 * np.sin(th)
+        row1 = [0, 0, 1 / (m1 + m2), 0]
+        row2 = [-x1, 0, 0, x0 / r**2]
+        row3 = [-3 * pth**2 * x0 / r**4, x3, 0, x1]
+        row4 = [x3, -r * x2 * np.cos(th), 0, 0]
+        return row1, row2, row3, row4
+
     @staticjit
     def _postprocessing(r, th, pr, pth):
         return r, np.sin(th), pr, pth
@@ -191,6 +317,60 @@ class GlycolyticOscillation(DynSys):
         cdot = q2 * s2 * eta - k * c
         return adot, bdot, cdot
 
+    @staticjit
+    def _jac(a, b, c, t, d, k, l1, l2, nu, q1, q2, s1, s2):
+        x0 = a * s1
+        x1 = b + 1
+        x2 = x1**2
+        x3 = a + 1
+        x4 = l1 + x2 * x3**2
+        x5 = 1 / x4
+        x6 = x2 * x5
+        x7 = x0 * x6
+        x8 = s1 * x3
+        x9 = x6 * x8
+        x10 = 2 * a
+        x11 = x10 + 2
+        x12 = x1**4
+        x13 = 1 / x4**2
+        x14 = c + 1
+        x15 = x14**2
+        x16 = b * d
+        x17 = x16 + 1
+        x18 = x17**2
+        x19 = l2 + x15 * x18
+        x20 = x15 / x19
+        x21 = s2 * x16
+        x22 = x20 * x21
+        x23 = 2 * b
+        x24 = x23 + 2
+        x25 = s2 * x17
+        x26 = x20 * x25
+        x27 = x14**4
+        x28 = x19**2
+        x29 = 1 / x28
+        row1 = [a * s1 * x11 * x12 * x13 * x3 - x7 - x9, -l1 * x1 * x10 * x13 * x8, 0]
+        row2 = [
+            -q1 * x0 * x11 * x12 * x13 * x3 + q1 * x7 + q1 * x9,
+            a * q1 * s1 * x24 * x3 * x5
+            + 2 * b * d * s2 * x18 * x27 * x29
+            - q1 * x0 * x13 * x2 * x24 * x3**3
+            - x22
+            - x26,
+            -l2 * x14 * x23 * x25 * x29,
+        ]
+        row3 = [
+            0,
+            -2 * q2 * x18 * x21 * x27 * x29 + q2 * x22 + q2 * x26,
+            x29
+            * (
+                2 * b * q2 * s2 * x14 * x17 * x19
+                - k * x28
+                - q2 * s2 * x14**3 * x17**3 * x23
+            ),
+        ]
+        return row1, row2, row3
+
 
 class GuckenheimerHolmes(DynSys):
     @staticjit
@@ -200,12 +380,14 @@ class GuckenheimerHolmes(DynSys):
         zdot = e - z**2 - f * x**2 - f * y**2 - a * z**3
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t, a, b, c, d, e, f):
-    #     row1 = a + c * z + 2 * d * z * x, b, -2 * f * x
-    #     row2 = -b + 2 * d * z * y, a + c * z, -2 * f * y
-    #     row3 = c * x + d * x ** 2 + d * y ** 2, c * y, -2 * z - 3 * a * z ** 2
-    #     return row1, row2, row3
+    @staticjit
+    def _jac(x, y, z, t, a, b, c, d, e, f):
+        x0 = a + c * z
+        x1 = 2 * f
+        row1 = [2 * d * x * z + x0, -b + 2 * d * y * z, c * x + d * x**2 + d * y**2]
+        row2 = [b, x0, c * y]
+        row3 = [-x * x1, -x1 * y, z * (-3 * a * z - 2)]
+        return row1, row2, row3
 
 
 class HenonHeiles(DynSys):
@@ -363,6 +545,34 @@ class DoubleGyre(DynSys):
         dz = omega
         return dx, dy, dz
 
+    @staticjit
+    def _jac(x, y, z, t, alpha, eps, omega):
+        x0 = eps * np.sin(z)
+        x1 = 2 * x0
+        x2 = 1 - x1
+        x3 = x * x1 + x2
+        x4 = np.pi * y
+        x5 = np.pi * x * (x * x0 + x2)
+        x6 = np.pi**2 * alpha
+        x7 = x6 * np.cos(x4) * np.cos(x5)
+        x8 = np.sin(x4)
+        x9 = x6 * x8
+        x10 = eps * np.cos(z)
+        x11 = x**2
+        x12 = np.pi * (x * (1 - x1) + x0 * x11)
+        x13 = np.pi * alpha * x8 * np.cos(x12)
+        x14 = x9 * np.sin(x12)
+        x15 = 2 * x10
+        x16 = x * x15
+        row1 = [-x3 * x7, x9 * np.sin(x5), x * x10 * x7 * (2 - x)]
+        row2 = [
+            x1 * x13 - x14 * x3**2,
+            x3 * x7,
+            x13 * (-x15 + x16) - x14 * x3 * (x10 * x11 - x16),
+        ]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return x, y, np.sin(z)
@@ -571,6 +781,19 @@ class InteriorSquirmer(DynSys):
         dr, dth = self._rhs_static(r, th, t, self.a * phase, self.g * (1 - phase))
         return dr, dth, dtt
 
+    def rhs_batch(self, X, t):
+        r, th, tt = X[:, :1], X[:, 1:2], X[:, 2:]
+        phase = self._protocol(tt, self.tau)
+        a, g = self.a * phase, self.g * (1 - phase)
+        nvals = np.arange(1, self.a.shape[0] + 1)
+        sinvals, cosvals = np.sin(th * nvals), np.cos(th * nvals)
+        rnvals = r**nvals
+        vrn = (g * cosvals + a * sinvals) * (nvals * rnvals * (r**2 - 1)) / r
+        vth = (2 * r + (r**2 - 1) * nvals / r) * (a * cosvals - g * sinvals) * rnvals
+        dr = np.sum(vrn, axis=1)
+        dth = np.sum(vth, axis=1) / r[:, 0]
+        return np.stack([dr, dth, np.ones_like(dr)], axis=-1)
+
 
 class OscillatingFlow(DynSys):
     @staticjit
@@ -581,6 +804,19 @@ class OscillatingFlow(DynSys):
         dz = omega
         return dx, dy, dz
 
+    @staticjit
+    def _jac(x, y, z, t, b, k, omega, u):
+        x0 = k * y
+        x1 = k * (b * np.sin(z) + x)
+        x2 = k * u
+        x3 = x2 * np.cos(x0) * np.cos(x1)
+        x4 = x2 * np.sin(x0) * np.sin(x1)
+        x5 = b * np.cos(z)
+        row1 = [x3, -x4, x3 * x5]
+        row2 = [x4, -x3, x4 * x5]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     def _postprocessing(self, x, y, z):
         return np.cos(self.k * x), y, np.sin(z)
 
@@ -596,6 +832,19 @@ class BickleyJet(DynSys):
         dz = omega
         return dy, dx, dz
 
+    def rhs_batch(self, X, t):
+        y, x, z = X[:, :1], X[:, 1:2], X[:, 2:]
+        sechy = 1 / np.cosh(y / self.ell)
+        un = self.k * (x - z * self.sigma)
+        dx = (
+            self.u
+            * sechy**2
+            * (-1 - 2 * (np.cos(un) @ self.eps)[:, None] * np.tanh(y / self.ell))
+        )
+        dy = self.ell * self.u * sechy**2 * (np.sin(un) @ (self.eps * self.k))[:, None]
+        dz = np.full_like(dy, self.omega)
+        return np.hstack([dy, dx, dz])
+
     def _postprocessing(self, x, y, z):
         km = np.min(self.k)
         sm = np.min(self.sigma)
@@ -610,6 +859,13 @@ class ArnoldBeltramiChildress(DynSys):
         dz = c * np.sin(y) + b * np.cos(x)
         return dx, dy, dz
 
+    @staticjit
+    def _jac(x, y, z, t, a, b, c):
+        row1 = [0, -c * np.sin(y), a * np.cos(z)]
+        row2 = [b * np.cos(x), 0, -a * np.sin(z)]
+        row3 = [-b * np.sin(x), c * np.cos(y), 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return np.sin(x), np.cos(y), np.sin(z)
@@ -639,6 +895,15 @@ class ForcedBrusselator(DynSys):
         zdot = w
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, b, f, w):
+        x0 = b - 2 * x * y
+        x1 = x**2
+        row1 = [-x0 - 1, x1, -f * np.sin(z)]
+        row2 = [x0, -x1, 0]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return x, y, np.sin(z)
@@ -652,6 +917,19 @@ class WindmiReduced(DynSys):
         pdot = vsw**2 - p ** (5 / 4) * vsw ** (1 / 2) * (1 + np.tanh(d1 * (i - 1))) / 2
         return idot, vdot, pdot
 
+    @staticjit
+    def _jac(i, v, p, t, a1, b1, b2, b3, d1, vsw):
+        x0 = np.sqrt(vsw)
+        x1 = d1 * (i - 1)
+        row1 = [0, -a1, 0]
+        row2 = [b1, -b3, -0.5 * b2]
+        row3 = [
+            -0.5 * d1 * p ** (5 / 4) * x0 / np.cosh(x1) ** 2,
+            0,
+            -0.625 * p ** (1 / 4) * x0 * (np.tanh(x1) + 1),
+        ]
+        return row1, row2, row3
+
 
 class MooreSpiegel(DynSys):
     @staticjit
@@ -689,6 +967,52 @@ class CoevolvingPredatorPrey(DynSys):
         )
         return xdot, ydot, alphadot
 
+    @staticjit
+    def _jac(x, y, alpha, t, a1, a2, a3, b1, b2, d1, d2, delta, k1, k2, k4, vv):
+        x0 = b2 * x + 1
+        x1 = 1 / x0
+        x2 = a3 * x1
+        x3 = alpha * delta
+        x4 = k1 * (-alpha + x3)
+        x5 = -x * x4 + 1
+        x6 = alpha * b1
+        x7 = x6 + 1
+        x8 = 1 / x7
+        x9 = a1 * x8
+        x10 = 1 / x0**2
+        x11 = alpha * x9
+        x12 = alpha**4
+        x13 = delta**4
+        x14 = alpha**2
+        x15 = delta**2
+        x16 = k1 * x
+        x17 = a1 / x7**2
+        x18 = 2 * alpha
+        x19 = 4 * alpha**3
+        row1 = [
+            alpha * x5 * x9
+            - d1 * (-k2 * (x14 * x15 - x14) + k4 * (x12 * x13 - x12) + 1)
+            + x * (a3 * b2 * x10 * y - x11 * x4)
+            - x2 * y,
+            -x * x2,
+            x
+            * (
+                a1 * x5 * x8
+                - d1 * (-k2 * (x15 * x18 - x18) + k4 * (x13 * x19 - x19))
+                - x11 * x16 * (delta - 1)
+                - x17 * x5 * x6
+            ),
+        ]
+        row2 = [a2 * x10 * y, x1 * (a2 * x - d2 * x0), 0]
+        row3 = [
+            -k1 * vv * x3 * x9,
+            0,
+            2 * d1 * k2 * vv * x15
+            - 12 * d1 * k4 * vv * x13 * x14
+            - delta * vv * x16 * x17,
+        ]
+        return row1, row2, row3
+
 
 class KawczynskiStrizhak(DynSys):
     @staticjit
@@ -736,7 +1060,7 @@ class BelousovZhabotinsky(DynSys):
         z0,
     ):
         ybar = (1 / y0) * yb1 * z * v / (yb2 * x + yb3 + kf)
-        x = max(0, x)
+        x = np.maximum(0, x)
         rf = (ci - z0 * z) * np.sqrt(x)
         xdot = c1 * x * ybar + c2 * ybar + c3 * x**2 + c4 * rf + c5 * x * z - kf * x
         zdot = (c6 / z0) * rf + c7 * x * z + c8 * z * v + c9 * z - kf * z
@@ -770,6 +1094,16 @@ class RabinovichFabrikant(DynSys):
         zdot = -2 * a * z - 2 * x * y * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, g):
+        x0 = 2 * y
+        x1 = x * x0
+        x2 = x**2
+        row1 = [g + x1, x2 + z - 1, y]
+        row2 = [-3 * x2 + 3 * z + 1, g, 3 * x]
+        row3 = [-x0 * z, -2 * x * z, -2 * a - x1]
+        return row1, row2, row3
+
 
 class NoseHoover(DynSys):
     @staticjit
@@ -779,6 +1113,13 @@ class NoseHoover(DynSys):
         zdot = a - y**2
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a):
+        row1 = [0, 1, 0]
+        row2 = [-1, z, y]
+        row3 = [0, -2 * y, 0]
+        return row1, row2, row3
+
 
 class Dadras(DynSys):
     @staticjit
@@ -788,6 +1129,13 @@ class Dadras(DynSys):
         zdot = c * x * y - e * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, c, e, o, p, r):
+        row1 = [-p, o * z + 1, o * y]
+        row2 = [-z, r, 1 - x]
+        row3 = [c * y, c * x, -e]
+        return row1, row2, row3
+
 
 class RikitakeDynamo(DynSys):
     @staticjit
@@ -820,6 +1168,19 @@ class NuclearQuadrupole(DynSys):
         p2dot = -a * q2 - 3 * np.sqrt(2) * b * q1 * q2 - d * q2 * q1**2 - d * q2**3
         return q1dot, q2dot, p1dot, p2dot
 
+    @staticjit
+    def _jac(q1, q2, p1, p2, t, a, b, d):
+        x0 = d * q2**2
+        x1 = d * q1**2
+        x2 = 3 * np.sqrt(2) * b
+        x3 = q1 * x2
+        x4 = q2 * (-2 * d * q1 - x2)
+        row1 = [0, 0, a, 0]
+        row2 = [0, 0, 0, a]
+        row3 = [-a - x0 - 3 * x1 + x3, x4, 0, 0]
+        row4 = [x4, -a - 3 * x0 - x1 - x3, 0, 0]
+        return row1, row2, row3, row4
+
 
 class PehlivanWei(DynSys):
     @staticjit
@@ -1191,12 +1552,12 @@ class SprottMore(DynSys):
         zdot = y**2 - np.exp(-(x**2))
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t):
-    #     row1 = [0, 1, 0]
-    #     row2 = [-1, -np.sign(z), 0]
-    #     row3 = [-2 * x * np.exp(-x ** 2), 2 * y, 0]
-    #     return row1, row2, row3
+    @staticjit
+    def _jac(x, y, z, t):
+        row1 = [0, 1, 0]
+        row2 = [-1, -np.sign(z), 0]
+        row3 = [2 * x * np.exp(-(x**2)), 2 * y, 0]
+        return row1, row2, row3
 
 
 class Arneodo(DynSys):
@@ -1295,12 +1656,12 @@ class Bouali2(DynSys):
         zdot = -1.5 * m * x + m * bb * x * z - c * z
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t, a, b, bb, c, g, m, y0):
-    #     row1 = [a * y0 - a * y, -a * x, -b]
-    #     row2 = [2 * g * x, g * x ** 2 - g, 0]
-    #     row3 = [-1.5 * m + m * bb * z, 0, -c + m * bb * x]
-    #     return row1, row2, row3
+    @staticjit
+    def _jac(x, y, z, t, a, b, bb, c, g, m, y0):
+        row1 = [a * (-y + y0), -a * x, -b]
+        row2 = [2 * g * x * y, g * (x**2 - 1), 0]
+        row3 = [0.5 * m * (2 * bb * z - 3), 0, bb * m * x - c]
+        return row1, row2, row3
 
 
 class Bouali(Bouali2):
@@ -1518,14 +1879,23 @@ class ArnoldWeb(DynSys):
         zdot = w
         return p1dot, p2dot, x1dot, x2dot, zdot
 
-    # @staticjit
-    # def _jac(p1, p2, x1, x2, z, t, mu, w):
-    #     row1 = [-mu * np.cos(x1) / (4 + np.cos(z) + np.cos(x1) + np.cos(x2)) ** 2, 0, 0, 0, 0]
-    #     row2 = [0, -mu * np.cos(x2) / (4 + np.cos(z) + np.cos(x1) + np.cos(x2)) ** 2, 0, 0, 0]
-    #     row3 = [1, 0, 0, 0, 0]
-    #     row4 = [0, 1, 0, 0, 0]
-    #     row5 = [0, 0, 0, 0, 0]
-    #     return row1, row2, row3, row4, row5
+    @staticjit
+    def _jac(p1, p2, x1, x2, z, t, mu, w):
+        x0 = np.sin(x1)
+        x3 = np.cos(x1)
+        x4 = np.cos(x2)
+        x5 = x3 + x4 + np.cos(z) + 4
+        x6 = mu / x5**3
+        x7 = np.sin(x2)
+        x8 = 2 * x0 * x6
+        x9 = -x7 * x8
+        x10 = np.sin(z)
+        row1 = [0, 0, x6 * (-2 * x0**2 - x3 * x5), x9, -x10 * x8]
+        row2 = [0, 0, x9, x6 * (-x4 * x5 - 2 * x7**2), -2 * x10 * x6 * x7]
+        row3 = [1, 0, 0, 0, 0]
+        row4 = [0, 1, 0, 0, 0]
+        row5 = [0, 0, 0, 0, 0]
+        return row1, row2, row3, row4, row5
 
     @staticjit
     def _postprocessing(p1, p2, x1, x2, z):
@@ -1540,8 +1910,13 @@ class NewtonLiepnik(DynSys):
         zdot = b * z - 5 * x * y
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t, a, b):
+    @staticjit
+    def _jac(x, y, z, t, a, b):
+        x0 = 5 * x
+        row1 = [-a, 10 * z + 1, 10 * y]
+        row2 = [5 * z - 1, -0.4, x0]
+        row3 = [-5 * y, -x0, b]
+        return row1, row2, row3
 
 
 class HyperRossler(DynSys):
@@ -1553,6 +1928,14 @@ class HyperRossler(DynSys):
         wdot = -c * z + d * w
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        row1 = [0, -1, -1, 0]
+        row2 = [1, a, 0, 1]
+        row3 = [z, 0, x, 0]
+        row4 = [0, 0, -c, d]
+        return row1, row2, row3, row4
+
 
 class HyperLorenz(DynSys):
     @staticjit
@@ -1563,6 +1946,16 @@ class HyperLorenz(DynSys):
         wdot = d * w - x * z
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = -z
+        x1 = -x
+        row1 = [-a, a, 0, 1]
+        row2 = [c + x0, -1, x1, 0]
+        row3 = [y, x, -b, 0]
+        row4 = [x0, 0, x1, d]
+        return row1, row2, row3, row4
+
 
 class HyperCai(DynSys):
     @staticjit
@@ -1573,6 +1966,14 @@ class HyperCai(DynSys):
         wdot = -e * x
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d, e):
+        row1 = [-a, a, 0, 0]
+        row2 = [b - z, c, -x, 1]
+        row3 = [0, 2 * y, -d, 0]
+        row4 = [-e, 0, 0, 0]
+        return row1, row2, row3, row4
+
 
 class HyperBao(DynSys):
     @staticjit
@@ -1583,6 +1984,14 @@ class HyperBao(DynSys):
         wdot = e * x + d * y * z
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d, e):
+        row1 = [-a, a, 0, 1]
+        row2 = [-z, c, -x, 0]
+        row3 = [y, x, -b, 0]
+        row4 = [e, d * z, d * y, 0]
+        return row1, row2, row3, row4
+
 
 class HyperJha(DynSys):
     @staticjit
@@ -1593,6 +2002,16 @@ class HyperJha(DynSys):
         wdot = -x * z + d * w
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = -z
+        x1 = -x
+        row1 = [-a, a, 0, 1]
+        row2 = [b + x0, -1, x1, 0]
+        row3 = [y, x, -c, 0]
+        row4 = [x0, 0, x1, d]
+        return row1, row2, row3, row4
+
 
 class HyperQi(DynSys):
     @staticjit
@@ -1603,6 +2022,14 @@ class HyperQi(DynSys):
         wdot = -d * w + f * z + x * y
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d, e, f):
+        row1 = [-a, a + z, y, 0]
+        row2 = [b - z, b, -x, 0]
+        row3 = [y, x, -c, -e]
+        row4 = [y, x, f, -d]
+        return row1, row2, row3, row4
+
 
 class Qi(DynSys):
     @staticjit
@@ -1613,6 +2040,20 @@ class Qi(DynSys):
         wdot = -d * w + x * y * z
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = w * z
+        x1 = w * y
+        x2 = y * z
+        x3 = w * x
+        x4 = x * z
+        x5 = x * y
+        row1 = [-a, a + x0, x1, x2]
+        row2 = [b - x0, b, -x3, -x4]
+        row3 = [x1, x3, -c, x5]
+        row4 = [x2, x4, x5, -d]
+        return row1, row2, row3, row4
+
 
 class LorenzStenflo(DynSys):
     @staticjit
@@ -1623,6 +2064,15 @@ class LorenzStenflo(DynSys):
         wdot = -x - a * w
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = -a
+        row1 = [x0, a, 0, d]
+        row2 = [c - z, -1, -x, 0]
+        row3 = [y, x, -b, 0]
+        row4 = [-1, 0, 0, x0]
+        return row1, row2, row3, row4
+
 
 class HyperYangChen(DynSys):
     @staticjit
@@ -1633,6 +2083,14 @@ class HyperYangChen(DynSys):
         wdot = -d * x
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        row1 = [-a, a, 0, 0]
+        row2 = [c - z, 0, -x, 1]
+        row3 = [y, x, -b, 0]
+        row4 = [-d, 0, 0, 0]
+        return row1, row2, row3, row4
+
 
 class HyperYan(DynSys):
     @staticjit
@@ -1643,6 +2101,16 @@ class HyperYan(DynSys):
         wdot = -d * w + y * z - x * z
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = -x
+        x1 = -z
+        row1 = [-a, a, 0, 0]
+        row2 = [-a + c - z, c, x0, 0]
+        row3 = [y + z, x + x1, -b - x0 - y, -1]
+        row4 = [x1, z, -x + y, -d]
+        return row1, row2, row3, row4
+
 
 class HyperXu(DynSys):
     @staticjit
@@ -1653,6 +2121,14 @@ class HyperXu(DynSys):
         wdot = x * z - d * y
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d, e):
+        row1 = [-a, a, 0, 1]
+        row2 = [b + e * z, 0, e * x, 0]
+        row3 = [-y, -x, -c, 0]
+        row4 = [z, -d, x, 0]
+        return row1, row2, row3, row4
+
 
 class HyperWang(DynSys):
     @staticjit
@@ -1663,6 +2139,14 @@ class HyperWang(DynSys):
         wdot = -d * x
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d, e):
+        row1 = [-a, a, 0, 0]
+        row2 = [b - z, 0, -x, 1]
+        row3 = [2 * e * x, 0, -c, 0]
+        row4 = [-d, 0, 0, 0]
+        return row1, row2, row3, row4
+
 
 class HyperPang(DynSys):
     @staticjit
@@ -1673,6 +2157,15 @@ class HyperPang(DynSys):
         wdot = -d * x - d * y
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        x0 = -d
+        row1 = [-a, a, 0, 0]
+        row2 = [-z, c, -x, 1]
+        row3 = [y, x, -b, 0]
+        row4 = [x0, x0, 0, 0]
+        return row1, row2, row3, row4
+
 
 class HyperLu(DynSys):
     @staticjit
@@ -1683,6 +2176,14 @@ class HyperLu(DynSys):
         wdot = d * w + x * z
         return xdot, ydot, zdot, wdot
 
+    @staticjit
+    def _jac(x, y, z, w, t, a, b, c, d):
+        row1 = [-a, a, 0, 1]
+        row2 = [-z, c, -x, 0]
+        row3 = [y, x, -b, 0]
+        row4 = [z, 0, x, d]
+        return row1, row2, row3, row4
+
 
 class SaltonSea(DynSys):
     @staticjit
@@ -1692,6 +2193,18 @@ class SaltonSea(DynSys):
         zdot = th * y * z / (y + a) - d * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, d, k, lam, m, mu, r, th):
+        x0 = 1 / k
+        x1 = k * lam
+        x2 = a + y
+        x3 = a * z / x2**2
+        x4 = 1 / x2
+        row1 = [x0 * (-r * x + r * (k - x - y) - x1 * y), x * x0 * (-r - x1), 0]
+        row2 = [lam * y, lam * x - m * x3 - mu, -m * x4 * y]
+        row3 = [0, th * x3, x4 * (-d * x2 + th * y)]
+        return row1, row2, row3
+
 
 class ExcitableCell(DynSys):
     def rhs(self, X, t):
@@ -1820,15 +2333,18 @@ class Aizawa(DynSys):
         )
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t, a, b, c, d, e, f):
-    #     xdot = x * z - b * x - d * y
-    #     ydot = d * x + y * z - b * y
-    #     zdot = c + a * z - 0.333333333333333333 * z ** 3 - x ** 2 - y ** 2 - e * z * x ** 2 - e * z * y ** 2 + f * z * x ** 3
-    #     row1 = [z - b, -d, x]
-    #     row2 = [d, z - b, y]
-    #     row3 = [- 2 * x - 2 * e * z + 3 * f * z * x ** 2, - 2 * y
-    #     return row1, row2, row3
+    @staticjit
+    def _jac(x, y, z, t, a, b, c, d, e, f):
+        x0 = -b + z
+        x1 = e * z
+        row1 = [x0, -d, x]
+        row2 = [d, x0, y]
+        row3 = [
+            x * (3 * f * x * z - 2 * x1 - 2),
+            2 * y * (-x1 - 1),
+            a - e * x**2 - e * y**2 + f * x**3 - z**2,
+        ]
+        return row1, row2, row3
 
 
 class AnishchenkoAstakhov(DynSys):
@@ -1881,6 +2397,16 @@ class AtmosphericRegime(DynSys):
         zdot = mu2 * z - omega * y - alpha * y**2 - beta * y * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, alpha, beta, mu1, mu2, omega, sigma):
+        x0 = sigma * x
+        x1 = alpha * y
+        x2 = beta * z
+        row1 = [mu1 + sigma * y, x0, 0]
+        row2 = [-2 * x0, alpha * z + mu2, omega + x1 + 2 * x2]
+        row3 = [0, -omega - 2 * x1 - x2, -beta * y + mu2]
+        return row1, row2, row3
+
 
 class Hadley(DynSys):
     @staticjit
@@ -1906,6 +2432,13 @@ class ForcedVanDerPol(DynSys):
         zdot = w
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, mu, w):
+        row1 = [0, 1, 0]
+        row2 = [-2 * mu * x * y - 1, mu * (1 - x**2), a * np.cos(z)]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return x, y, np.sin(z)
@@ -1919,6 +2452,13 @@ class ForcedFitzHughNagumo(DynSys):
         zdot = omega
         return vdot, wdot, zdot
 
+    @staticjit
+    def _jac(v, w, z, t, a, b, curr, f, gamma, omega):
+        row1 = [1 - v**2, -1, f * np.cos(z)]
+        row2 = [gamma, -b * gamma, 0]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return x, y, np.sin(z)
@@ -1932,12 +2472,15 @@ class HindmarshRose(DynSys):
         zdot = -s / tz * x - 1 / tz * z + c / tz
         return xdot, ydot, zdot
 
-    # @staticjit
-    # def _jac(x, y, z, t, a, b, c, d, s, tx, tz):
-    #     row1 = [-1 / tx - 3 * a / tx * x ** 2 + 2 * b / tx * x, 1 / tx, 1 / tx]
-    #     row2 = [-3 * a * x ** 2 - 2 * (d - b) * x, 0, 1]
-    #     row3 = [-s / tz, 0, -1 / tz - c / tz]
-    #     return row1, row2, row3
+    @staticjit
+    def _jac(x, y, z, t, a, b, c, d, s, tx, tz):
+        x0 = 1 / tx
+        x1 = 3 * a
+        x2 = 1 / tz
+        row1 = [x0 * (2 * b * x - tx - x**2 * x1), x0, x0]
+        row2 = [x * (2 * b - 2 * d - x * x1), 0, 1]
+        row3 = [-s * x2, 0, -x2]
+        return row1, row2, row3
 
 
 class Colpitts(DynSys):
@@ -1975,6 +2518,22 @@ class Blasius(DynSys):
         zdot = -c * (z - zs) + alpha2 * y * z / (1 + k2 * y)
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, alpha1, alpha2, b, c, k1, k2, zs):
+        x0 = k1 * x + 1
+        x1 = alpha1 * y / x0**2
+        x2 = alpha1 * x / x0
+        x3 = k2 * y
+        x4 = x3 + 1
+        x5 = 1 / x4
+        x6 = alpha2 * z
+        x7 = x6 / x4**2
+        x8 = alpha2 * y
+        row1 = [a - x1, -x2, 0]
+        row2 = [x1, -b + x2 + x3 * x7 - x5 * x6, -x5 * x8]
+        row3 = [0, x7, x5 * (-c * x4 + x8)]
+        return row1, row2, row3
+
 
 class TurchinHanski(DynSys):
     @staticjit
@@ -1989,6 +2548,23 @@ class TurchinHanski(DynSys):
         zdot = 2 * np.pi * lamb
         return ndot, pdot, zdot
 
+    @staticjit
+    def _jac(n, p, z, t, a, d, e, g, h, lamb, r, s):
+        x0 = n * r
+        x1 = e * np.sin(z)
+        x2 = d + n
+        x3 = h**2
+        x4 = n**2
+        x5 = e * np.cos(z)
+        row1 = [
+            -a * d * p / x2**2 - 2 * g * n * x3 / (x3 + x4) ** 2 - r * x1 + r - 2 * x0,
+            -a * n / x2,
+            -x0 * x5,
+        ]
+        row2 = [p**2 * s / x4, s * (-n * x1 + n - 2 * p) / n, -p * s * x5]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, y, z):
         return x, y, np.sin(z)
@@ -2006,6 +2582,17 @@ class StickSlipOscillator(DynSys):
         thdot = w
         return xdot, vdot, thdot
 
+    @staticjit
+    def _jac(x, v, th, t, a, alpha, b, beta, eps, gamma, t0, vs, w):
+        row1 = [0, 1, 0]
+        row2 = [
+            a - 3 * b * x**2,
+            eps * (alpha - 3 * beta * (v - vs) ** 2),
+            -eps * gamma * np.sin(th),
+        ]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
     @staticjit
     def _postprocessing(x, v, th):
         return x, v, np.cos(th)
@@ -2019,6 +2606,22 @@ class HastingsPowell(DynSys):
         zdot = z * a2 * y / (1 + b2 * y) - d2 * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a1, a2, b1, b2, d1, d2):
+        x0 = b1 * x + 1
+        x1 = a1 * y / x0**2
+        x2 = a1 * x / x0
+        x3 = b2 * y
+        x4 = x3 + 1
+        x5 = 1 / x4
+        x6 = a2 * z
+        x7 = x6 / x4**2
+        x8 = a2 * y
+        row1 = [-2 * x - x1 + 1, -x2, 0]
+        row2 = [x1, -d1 + x2 + x3 * x7 - x5 * x6, -x5 * x8]
+        row3 = [0, x7, x5 * (-d2 * x4 + x8)]
+        return row1, row2, row3
+
 
 class CellularNeuralNetwork(DynSys):
     @staticjit
@@ -2042,6 +2645,9 @@ class BeerRNN(DynSys):
         Xdot = (-X + np.matmul(self.w, self._sig(X + self.theta))) / self.tau
         return Xdot
 
+    def rhs_batch(self, X, t):
+        return (-X + np.matmul(self._sig(X + self.theta), self.w.T)) / self.tau
+
 
 class Torus(DynSys):
     @staticjit
@@ -2055,6 +2661,13 @@ class Torus(DynSys):
         zdot = a * n * np.cos(n * t)
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a, n, r):
+        row1 = [0, 0, 0]
+        row2 = [0, 0, 0]
+        row3 = [0, 0, 0]
+        return row1, row2, row3
+
 
 class CaTwoPlusQuasiperiodic(CaTwoPlus):
     pass
@@ -2082,6 +2695,14 @@ class MacArthur(DynSys):
         rrdot = self.d * (self.s - rr) - np.matmul(self.c, (mu * nn))
         return np.hstack([nndot, rrdot])
 
+    def rhs_batch(self, X, t):
+        nn, rr = X[:, :5], X[:, 5:]
+        u = self.r * rr[:, None, :] / (self.k.T + rr[:, None, :])
+        mu = np.min(u, axis=-1)
+        nndot = nn * (mu - self.m)
+        rrdot = self.d * (self.s - rr) - np.matmul(mu * nn, self.c.T)
+        return np.hstack([nndot, rrdot])
+
 
 class ItikBanksTumor(DynSys):
     @staticjit
@@ -2091,6 +2712,14 @@ class ItikBanksTumor(DynSys):
         zdot = r3 * x * z / (x + k3) - a31 * x * z - d3 * z
         return xdot, ydot, zdot
 
+    @staticjit
+    def _jac(x, y, z, t, a12, a13, a21, a31, d3, k3, r2, r3):
+        x0 = k3 + x
+        row1 = [-a12 * y - a13 * z - 2 * x + 1, -a12 * x, -a13 * x]
+        row2 = [-a21 * y, -a21 * x - 2 * r2 * y + r2, 0]
+        row3 = [-a31 * z + k3 * r3 * z / x0**2, 0, (r3 * x - x0 * (a31 * x + d3)) / x0]
+        return row1, row2, row3
+
 
 ## Doesn't match described dynamics
 # class CosmologyFriedmann(DynSys):
@@ -7,7 +7,6 @@ Low-dimensional chaotic maps in Python
 Requirements:
 + numpy
 + scipy
-+ sdeint (for integration with noise)
 + numba (optional, for faster integration)
 + jax (optional, for faster integration)
 
@@ -239,9 +238,6 @@ class Henon(DynMap):
         return x, y
 
 
-from scipy.optimize import fsolve
-
-
 class BlinkingVortexMap(DynMap):
     def __post_init__(self):
         pass
@@ -271,20 +267,56 @@ class BlinkingVortexMap(DynMap):
         out = qq - fac * np.sin(qq) - (tp - fac * np.sin(tp)) - 2 * np.pi * t / tlam
         return out
 
+    @staticjit
+    def solve_root(fac, c, guess, tol=1e-12, max_iter=50):
+        """
+        Solve the Kepler-like equation qq - fac * sin(qq) = c for each point
+
+        Uses Halley's method, falling back to bisection whenever a step leaves the
+        bracket [c - fac, c + fac] that contains the root. Each point stops iterating
+        as soon as it has converged.
+        """
+        qq = np.empty(len(c))
+        for i in range(len(c)):
+            lo, hi = c[i] - fac[i], c[i] + fac[i]
+            q = min(max(guess[i], lo), hi)
+            for _ in range(max_iter):
+                f0 = q - fac[i] * np.sin(q) - c[i]
+                if f0 == 0:
+                    break
+                elif f0 < 0:
+                    lo = q
+                else:
+                    hi = q
+                f1 = 1 - fac[i] * np.cos(q)
+                f2 = fac[i] * np.sin(q)
+                denom = 2 * f1**2 - f0 * f2
+                q_new = q - 2 * f0 * f1 / denom if denom != 0 else np.nan
+                if not (lo <= q_new <= hi):
+                    q_new = 0.5 * (lo + hi)
+                converged = abs(q_new - q) <= tol * (1 + abs(q))
+                q = q_new
+                if converged:
+                    break
+            qq[i] = q
+        return qq
+
     def _rhs(self, rt, tt, a, b, gamma, t):
         lam2, lam, etac, rho = self.make_parameters(rt, tt, a, b, t)
 
-        # parallel case
-        if len(np.asarray(rt).shape) > 0:
-            thetat = list()
-            for arg_set in zip(rt, tt, lam2, lam, etac, rho):
-                root_term = lambda x: self.root(x, t, *arg_set, gamma)
-                thetat_i = fsolve(root_term, 0.01)[0]
-                thetat.append(thetat_i)
-            thetat = np.array(thetat)
-        else:
-            root_term = lambda x: self.root(x, t, rt, tt, lam2, lam, etac, rho, gamma)
-            thetat = fsolve(root_term, 0.01)[0]
+        # the root of self.root() solves thetat - fac * sin(thetat) = c
+        tp = np.arctan2(rt * np.sin(tt), -etac + rt * np.cos(tt))
+        fac = (2 * lam) / (1 + lam2)
+        tlam = (2 * np.pi) ** 2 * ((rho**2) / gamma) * (1 + lam2) / (1 - lam2)
+        c = tp - fac * np.sin(tp) + 2 * np.pi * t / tlam
+
+        # c is the solution for fac = 0, which is a closer starting point than the
+        # solution of the previous step, since successive points are uncorrelated
+        shape = np.shape(c)
+        fac, c = np.broadcast_arrays(np.atleast_1d(fac), np.atleast_1d(c))
+        thetat = self.solve_root(fac.ravel(), c.ravel(), c.ravel())
+        thetat = thetat.reshape(shape)[()]
+
         rout = np.sqrt(rho**2 + etac**2 + 2 * rho * etac * np.cos(thetat))
         thout = np.arctan2(rho * np.sin(thetat), etac + rho * np.cos(thetat))
 
@@ -17,9 +17,6 @@ from scipy.stats import (
 
 from .utils import has_module
 
-if has_module("sklearn"):
-    from sklearn.feature_selection import mutual_info_regression
-
 
 def are_broadcastable(shape1, shape2):
     """
@@ -383,6 +380,8 @@ def mutual_information(y_true, y_pred):
     """
     if not has_module("sklearn"):
         raise ImportError("Sklearn is required for mutual information")
+    from sklearn.feature_selection import mutual_info_regression
+
     mi = np.zeros(y_true.shape[1])
     for i in range(y_true.shape[1]):
         mi[i] = mutual_info_regression(
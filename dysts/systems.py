@@ -1,11 +1,17 @@
 """Utilities for the implemented systems"""
 
+import contextlib
+import copy
 import inspect
+import itertools
 import json
-from multiprocessing import Pool
+import os
+import queue
+import warnings
+from collections.abc import Callable, Iterator, Sequence
 from os import PathLike
 from types import ModuleType
-from typing import Any, Sequence
+from typing import Any
 
 import numpy as np
 import numpy.typing as npt
@@ -16,10 +22,31 @@ from . import maps as dmp
 from .base import (
     DATAPATH_CONTINUOUS,
     DATAPATH_DISCRETE,
+    STIFFNESS_THRESHOLD,
     BaseDyn,
     DynMap,
     DynSys,
     DynSysDelay,
+    get_metadata,
+    reload_metadata,
+)
+from .sampling import GaussianInitialConditionSampler
+from .utils import (
+    JIT_METHODS,
+    allocate_trajectory,
+    check_jacobian,
+    compile_jacobian,
+    has_module,
+    integrate_delay_jit,
+    integrate_jit,
+    integrate_sde_jit,
+    is_worker_pool_running,
+    iterate_map_jit,
+    jacobian_source,
+    lease_worker_pool,
+    set_jit_cache_dir,
+    shutdown_worker_pool,
+    time_limit,
 )
 
 Array = npt.NDArray[np.float64]
@@ -91,15 +118,23 @@ def get_system_data(
         )
 
     systems = get_attractor_list(sys_class, exclude)
-    with open(datapath, "r") as file:
-        data = json.load(file)
+    data = get_metadata(datapath)
+
+    # filter out systems from the data, copying so that the shared metadata is untouched
+    return copy.deepcopy({k: v for k, v in data.items() if k in systems})
+
 
-    # filter out systems from the data
-    return {k: v for k, v in data.items() if k in systems}
+def _system_from_name(name: str) -> BaseDyn:
+    """Instantiate a continuous system or discrete map by name"""
+    module = dfl if hasattr(dfl, name) else dmp
+    return getattr(module, name)()
 
 
 def _compute_trajectory(
-    n: int, system: str | BaseDyn, kwargs: dict[str, Any]
+    n: int,
+    system: str | BaseDyn,
+    kwargs: dict[str, Any],
+    timeout: float | None = None,
 ) -> Array | None:
     """Helper function to compute a single trajectory for a dynamical system.
 
@@ -107,18 +142,26 @@ def _compute_trajectory(
         system (Union[str, BaseDyn]): Either a string name of a system or a system instance
         n (int): Number of timepoints to integrate
         kwargs (Dict[str, Any]): Additional arguments passed to make_trajectory
+        timeout (float): Wall-clock timeout in seconds, after which the integration is
+            stopped and None is returned
 
     Returns:
-        Optional[Array]: The computed trajectory, or None if error occurs and _silent_errors=True
+        Optional[Array]: The computed trajectory, or None if the integration timed out
+            or an error occurs and _silent_errors=True
     """
     if isinstance(system, str):
-        sys = getattr(dfl, system)()
+        sys = _system_from_name(system)
     else:
         sys = system
 
+    kwargs = dict(kwargs)
     silent_errors = kwargs.pop("_silent_errors", False)
     try:
-        traj = sys.make_trajectory(n, **kwargs)
+        with time_limit(timeout):
+            traj = sys.make_trajectory(n, **kwargs)
+    except TimeoutError:
+        warnings.warn(f"{sys.name}: Integration exceeded {timeout} seconds. Skipping.")
+        return None
     except Exception as exception:
         print(f"Error in {sys.name}: {exception}")
         if silent_errors:
@@ -128,22 +171,112 @@ def _compute_trajectory(
     return traj
 
 
+def _compute_trajectory_task(
+    args: tuple[int, str | BaseDyn, dict[str, Any], float | None],
+) -> tuple[str, Array | None]:
+    """Worker entry point, which returns the system name alongside its trajectory"""
+    n, system, kwargs, timeout = args
+    name = system if isinstance(system, str) else system.name
+    return name, _compute_trajectory(n, system, kwargs, timeout)
+
+
+def iter_trajectory_ensemble(
+    n: int,
+    use_tqdm: bool = True,
+    use_multiprocessing: bool = False,
+    subset: Sequence[str] | Sequence[BaseDyn] | None = None,
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    maxtasksperchild: int | None = None,
+    timeout: float | None = None,
+    **kwargs,
+) -> Iterator[tuple[str, Array | None]]:
+    """
+    Lazily integrate multiple dynamical systems with identical settings, yielding
+    each trajectory as soon as it is computed
+
+    Large ensembles can be written to disk one system at a time. When integrating in
+    parallel, a bounded window of chunks (twice the number of workers) is submitted
+    ahead of the consumer, and a new chunk only once a finished one has been
+    consumed, so at most that many trajectories are held in memory. Closing the
+    generator early stops further submissions, but chunks already submitted run to
+    completion on the persistent pool, and their results are discarded.
+
+    Args:
+        n (int): The number of timepoints to integrate
+        use_tqdm (bool): Whether to use a progress bar
+        use_multiprocessing (bool): Whether to integrate the systems in parallel on a
+            persistent pool of worker processes, which is reused across calls
+        subset (list): A list of system names or BaseDyn (e.g. custom dynamical systems). Defaults to all continuous systems.
+            Can also pass in `sys_class` as a kwarg to specify other system classes.
+        max_workers (int): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int): The number of systems sent to a worker at a time
+        maxtasksperchild (int): The number of tasks a worker completes before it is
+            replaced with a fresh process. Defaults to the lifetime of the pool.
+        timeout (float): Wall-clock timeout in seconds for each system. Systems that
+            exceed it are stopped and return None.
+        kwargs (dict): Integration options passed to each system's make_trajectory() method
+
+    Yields:
+        (name, trajectory) pairs, in subset order when integrating serially and in the
+            order in which the systems finish when using multiprocessing
+    """
+    if subset is None:
+        sys_class = kwargs.pop("sys_class", "continuous")
+        exclude = kwargs.pop("exclude", [])
+        subset = get_attractor_list(sys_class, exclude)
+
+    if use_multiprocessing:
+        solutions = _multiprocessed_compute_trajectory(
+            n,
+            subset,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            maxtasksperchild=maxtasksperchild,
+            timeout=timeout,
+            **kwargs,
+        )
+    else:
+        solutions = (
+            _compute_trajectory_task((n, system, kwargs, timeout)) for system in subset
+        )
+
+    if use_tqdm:
+        solutions = tqdm(solutions, total=len(subset), desc="Integrating systems")
+
+    yield from solutions
+
+
 def make_trajectory_ensemble(
     n: int,
     use_tqdm: bool = True,
     use_multiprocessing: bool = False,
     subset: Sequence[str] | Sequence[BaseDyn] | None = None,
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    maxtasksperchild: int | None = None,
+    timeout: float | None = None,
     **kwargs,
 ) -> dict[str, Array | None]:
     """
     Integrate multiple dynamical systems with identical settings
 
+    All trajectories are kept in memory; use iter_trajectory_ensemble() to process
+    large ensembles one system at a time.
+
     Args:
         n (int): The number of timepoints to integrate
         use_tqdm (bool): Whether to use a progress bar
-        use_multiprocessing (bool): Not yet implemented.
+        use_multiprocessing (bool): Whether to integrate the systems in parallel on a
+            persistent pool of worker processes, which is reused across calls
         subset (list): A list of system names or BaseDyn (e.g. custom dynamical systems). Defaults to all continuous systems.
             Can also pass in `sys_class` as a kwarg to specify other system classes.
+        max_workers (int): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int): The number of systems sent to a worker at a time
+        maxtasksperchild (int): The number of tasks a worker completes before it is
+            replaced with a fresh process. Defaults to the lifetime of the pool.
+        timeout (float): Wall-clock timeout in seconds for each system. Systems that
+            exceed it are stopped and return None.
         kwargs (dict): Integration options passed to each system's make_trajectory() method
 
     Returns:
@@ -155,39 +288,110 @@ def make_trajectory_ensemble(
         exclude = kwargs.pop("exclude", [])
         subset = get_attractor_list(sys_class, exclude)
 
-    if use_tqdm and not use_multiprocessing:
-        subset = tqdm(subset, desc="Integrating systems")  # type: ignore
+    all_sols = dict(
+        iter_trajectory_ensemble(
+            n,
+            use_tqdm=use_tqdm,
+            use_multiprocessing=use_multiprocessing,
+            subset=subset,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            maxtasksperchild=maxtasksperchild,
+            timeout=timeout,
+            **kwargs,
+        )
+    )
+
+    # return the trajectories in the order of the subset
+    names = [sys if isinstance(sys, str) else sys.name for sys in subset]
+    return {name: all_sols[name] for name in names}
 
-    all_sols = dict()
-    if use_multiprocessing:
-        all_sols = _multiprocessed_compute_trajectory(n, subset or [], **kwargs)
-    else:
-        # stupid lint error fix for subset being possibly None
-        for system in subset or []:
-            sol = _compute_trajectory(n, system, kwargs)
-            equation_name = system if isinstance(system, str) else system.name
-            all_sols[equation_name] = sol
 
-    return all_sols
+def _compute_trajectory_chunk(
+    tasks: list[tuple[int, str | BaseDyn, dict[str, Any], float | None]],
+) -> list[tuple[str, Array | None]]:
+    """Worker entry point for a chunk of systems"""
+    return [_compute_trajectory_task(task) for task in tasks]
 
 
 def _multiprocessed_compute_trajectory(
-    n: int, subset: Sequence[str] | Sequence[BaseDyn], **kwargs
-) -> dict[str, Array | None]:
+    n: int,
+    subset: Sequence[str] | Sequence[BaseDyn],
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    maxtasksperchild: int | None = None,
+    timeout: float | None = None,
+    max_pending: int | None = None,
+    **kwargs,
+) -> Iterator[tuple[str, Array | None]]:
     """Helper for handling multiprocessed integration
 
     Args:
         n: Number of timepoints to integrate
         subset: Systems to compute trajectories for
+        max_workers: Number of worker processes
+        chunksize: Number of systems sent to a worker at a time
+        maxtasksperchild: Number of tasks a worker completes before it is replaced
+        timeout: Wall-clock timeout in seconds for each system
+        max_pending: Number of chunks submitted to the pool but not yet consumed.
+            Defaults to twice the number of workers.
         **kwargs: Additional arguments passed to _compute_trajectory
+
+    Yields:
+        (name, trajectory) pairs in the order in which the systems finish
     """
-    with Pool() as pool:
-        solutions = pool.starmap(
-            _compute_trajectory, [(n, system, kwargs) for system in subset]
+    # instantiate systems here, so that workers receive them without re-reading metadata
+    systems = [
+        _system_from_name(system) if isinstance(system, str) else system
+        for system in subset
+    ]
+    tasks = [(n, system, kwargs, timeout) for system in systems]
+    chunks = iter([tasks[i : i + chunksize] for i in range(0, len(tasks), chunksize)])
+    if max_pending is None:
+        max_pending = 2 * (max_workers or os.cpu_count() or 1)
+
+    # the pool's result thread puts finished chunks here, in the order they finish
+    finished = queue.SimpleQueue()
+
+    # the pool's callbacks never fire once it is terminated, for example by
+    # shutdown_worker_pool(), which precompile() calls
+    def check_pool():
+        if not is_worker_pool_running(pool):
+            raise RuntimeError(
+                "The worker pool was shut down while the ensemble was being integrated"
+            )
+
+    def submit(chunk):
+        check_pool()
+        pool.apply_async(
+            _compute_trajectory_chunk,
+            (chunk,),
+            callback=lambda result: finished.put((result, None)),
+            error_callback=lambda exception: finished.put((None, exception)),
         )
 
-    names = [sys if isinstance(sys, str) else sys.name for sys in subset]
-    return dict(zip(names, solutions))
+    # submit a new chunk only once a finished one is consumed, so that results
+    # cannot pile up in the parent process however slowly they are consumed
+    with lease_worker_pool(max_workers, maxtasksperchild) as pool:
+        n_pending = 0
+        for chunk in itertools.islice(chunks, max_pending):
+            submit(chunk)
+            n_pending += 1
+
+        while n_pending > 0:
+            try:
+                result, exception = finished.get(timeout=1.0)
+            except queue.Empty:
+                check_pool()
+                continue
+            n_pending -= 1
+            if exception is not None:
+                raise exception
+            yield from result
+
+            for chunk in itertools.islice(chunks, 1):
+                submit(chunk)
+                n_pending += 1
 
 
 def compute_trajectory_statistics(
@@ -222,5 +426,383 @@ def compute_trajectory_statistics(
 
         with open(datapath, "w") as f:
             json.dump(data, f, indent=2)
+        reload_metadata(datapath)
 
     return stats
+
+
+def compute_integration_methods(
+    subset: Sequence[str] | None = None,
+    datapath: PathLike | None = None,
+    threshold: float = STIFFNESS_THRESHOLD,
+    use_tqdm: bool = True,
+    **kwargs,
+) -> dict[str, dict[str, Any]]:
+    """
+    Probe the stiffness of each system and choose the method that
+    make_trajectory(method="auto") integrates it with
+
+    Args:
+        subset (list): A list of system names. Defaults to all continuous systems
+            without delays.
+        datapath (str): Path to a metadata JSON file in which to record each system's
+            "integration_method" and "stiffness"
+        threshold (float): The stiffness ratio above which a system is integrated with
+            an implicit method
+        use_tqdm (bool): Whether to use a progress bar
+        kwargs: Additional keyword arguments passed to DynSys.estimate_stiffness()
+
+    Returns:
+        A dictionary mapping each system name to its chosen method and stiffness
+    """
+    if subset is None:
+        subset = get_attractor_list("continuous_no_delay")
+
+    choices = {}
+    for name in tqdm(subset, disable=not use_tqdm):
+        system = getattr(dfl, name)()
+        stiffness = system.estimate_stiffness(**kwargs)
+        choices[name] = {
+            "integration_method": "Radau" if stiffness > threshold else "DOP853",
+            "stiffness": float(stiffness),
+        }
+
+    if datapath is not None:
+        with open(datapath) as f:
+            data = json.load(f)
+
+        for name, choice in choices.items():
+            data[name].update(choice)
+
+        with open(datapath, "w") as f:
+            json.dump(data, f, indent=2)
+        reload_metadata(datapath)
+
+    return choices
+
+
+def generate_jacobians(
+    subset: Sequence[str] | None = None,
+    attach: bool = False,
+    n_points: int = 8,
+    use_tqdm: bool = True,
+    **kwargs,
+) -> dict[str, str]:
+    """
+    Derive analytic Jacobians for systems without a `_jac` method, by differentiating
+    each system's right hand side with sympy
+
+    Each Jacobian is validated against finite differences at points sampled from a
+    short trajectory of the system, and systems whose Jacobians cannot be derived or
+    fail validation are skipped with a warning.
+
+    Args:
+        subset (list): A list of system names. Defaults to all continuous systems
+            without delays that have a compiled right hand side and no Jacobian.
+        attach (bool): Whether to compile each validated Jacobian and set it as the
+            `_jac` method of the system's class
+        n_points (int): The number of points at which to validate each Jacobian
+        use_tqdm (bool): Whether to use a progress bar
+        kwargs: Additional keyword arguments passed to check_jacobian()
+
+    Returns:
+        A dictionary mapping each system name to the source code of its `_jac`
+        method, in the format used by dysts.flows
+    """
+    if subset is None:
+        subset = [
+            name
+            for name in get_attractor_list("continuous_no_delay")
+            if (system := getattr(dfl, name)()).has_jit_rhs()
+            and not system.has_jacobian()
+        ]
+
+    sources = {}
+    for name in tqdm(subset, disable=not use_tqdm):
+        system = getattr(dfl, name)()
+        dim = len(system.ic)
+        try:
+            src = jacobian_source(system._rhs, dim)
+            jac = compile_jacobian(system._rhs, dim)
+        except Exception as e:
+            warnings.warn(f"Could not derive a Jacobian for {name}: {e}")
+            continue
+
+        points = system.make_trajectory(n_points, pts_per_period=n_points)
+        if points is None or not check_jacobian(
+            system._rhs, jac.func, points, tuple(system.param_list), **kwargs
+        ):
+            warnings.warn(f"The derived Jacobian of {name} failed validation")
+            continue
+
+        sources[name] = src
+        if attach:
+            type(system)._jac = jac
+
+    return sources
+
+
+def _write_trajectory_task(
+    args: tuple[str, BaseDyn, int, Array, int, dict[str, Any], float | None],
+) -> tuple[str, dict[str, Any]]:
+    """Worker entry point, which integrates each initial condition of a system and
+    writes the trajectories into the system's array in the dataset"""
+    store_path, system, n, ics, seed, kwargs, timeout = args
+
+    values = None
+    failed_ics = []
+    if isinstance(system, DynSysDelay):
+        # delay systems integrate the whole batch of histories in one pass
+        traj_kwargs = {"random_seed": seed, **kwargs, "init_cond": np.asarray(ics)}
+        out = _compute_trajectory(
+            n, system, traj_kwargs | {"return_times": True}, timeout
+        )
+        if out is None:
+            failed_ics = list(range(len(ics)))
+        else:
+            tpts, trajs = out
+            values = allocate_trajectory(
+                store_path, system.name, trajs.shape, time=tpts
+            )
+            values[:] = trajs
+            failed_ics = [i for i, traj in enumerate(trajs) if np.isnan(traj).any()]
+    else:
+        for i, ic in enumerate(ics):
+            traj_kwargs = {"random_seed": seed, **kwargs, "init_cond": ic}
+            out = _compute_trajectory(
+                n, system, traj_kwargs | {"return_times": True}, timeout
+            )
+            if out is None:
+                failed_ics.append(i)
+                continue
+
+            tpts, traj = out
+            traj = traj.reshape(len(traj), -1)
+            if values is None:
+                shape = (len(ics), *traj.shape)
+                values = allocate_trajectory(store_path, system.name, shape, time=tpts)
+            if traj.shape != values.shape[1:]:
+                warnings.warn(f"{system.name}: Trajectory {i} has shape {traj.shape}")
+                failed_ics.append(i)
+                continue
+            values[i] = traj
+
+    if values is not None:
+        values.flush()
+
+    return system.name, {
+        "shape": None if values is None else list(values.shape),
+        "failed_ics": failed_ics,
+    }
+
+
+def make_trajectory_dataset(
+    store_path: str | PathLike,
+    n: int,
+    n_ics: int = 1,
+    ic_sampler: Callable[..., Array | None] | None = None,
+    subset: Sequence[str] | Sequence[BaseDyn] | None = None,
+    use_tqdm: bool = True,
+    use_multiprocessing: bool = False,
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    maxtasksperchild: int | None = None,
+    timeout: float | None = None,
+    random_seed: int = 0,
+    **kwargs,
+) -> dict[str, Any]:
+    """
+    Integrate multiple dynamical systems from several initial conditions each, and
+    write the trajectories to a trajectory store on disk
+
+    Each system's trajectories are written into a memory-mapped array of shape
+    (n_ics, n, D), so that the dataset can be larger than the available memory and
+    workers do not send trajectories back to the main process. Entries of initial
+    conditions that fail to integrate are left as NaN. A manifest.json file in the
+    store records the parameters, initial conditions, timestep and seed of each system.
+    The trajectories can be read with dysts.utils.read_trajectory().
+
+    Args:
+        store_path (str): Path to the store directory
+        n (int): The number of timepoints to integrate
+        n_ics (int): The number of initial conditions per system. The first is the
+            system's default initial condition.
+        ic_sampler (callable): Function called as ic_sampler(ic, system) to sample each
+            additional initial condition, such as the samplers in dysts.sampling. A
+            copy of it is seeded separately for each system. Defaults to
+            GaussianInitialConditionSampler.
+        subset (list): A list of system names or BaseDyn (e.g. custom dynamical systems). Defaults to all continuous systems.
+            Can also pass in `sys_class` as a kwarg to specify other system classes.
+        use_tqdm (bool): Whether to use a progress bar
+        use_multiprocessing (bool): Whether to integrate the systems in parallel on a
+            persistent pool of worker processes
+        max_workers (int): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int): The number of systems sent to a worker at a time
+        maxtasksperchild (int): The number of tasks a worker completes before it is
+            replaced with a fresh process. Defaults to the lifetime of the pool.
+        timeout (float): Wall-clock timeout in seconds for each trajectory
+        random_seed (int): Seed from which the seed of each system is derived
+        kwargs (dict): Integration options passed to each system's make_trajectory() method
+
+    Returns:
+        manifest (dict): The contents of the manifest
+    """
+    store_path = os.fspath(store_path)
+    if subset is None:
+        sys_class = kwargs.pop("sys_class", "continuous")
+        exclude = kwargs.pop("exclude", [])
+        subset = get_attractor_list(sys_class, exclude)
+
+    if n_ics > 1 and ic_sampler is None:
+        ic_sampler = GaussianInitialConditionSampler()
+
+    systems = [
+        _system_from_name(system) if isinstance(system, str) else system
+        for system in subset
+    ]
+    seed_seqs = np.random.SeedSequence(random_seed).spawn(len(systems))
+
+    entries: dict[str, dict[str, Any]] = {}
+    tasks = []
+    for system, seed_seq in zip(systems, seed_seqs):
+        seed = int(seed_seq.generate_state(1)[0])
+        ics = [np.asarray(system.ic, dtype=np.float64)]
+        if n_ics > 1:
+            # seed a copy, so that the caller's sampler is left unchanged
+            sampler = copy.copy(ic_sampler)
+            sampler.set_rng(np.random.default_rng(seed))  # type: ignore
+            ics += [sampler(system.ic, system) for _ in range(n_ics - 1)]  # type: ignore
+        if any(ic is None for ic in ics):
+            warnings.warn(
+                f"{system.name}: Could not sample initial conditions. Skipping."
+            )
+            continue
+
+        ics_arr = np.stack(ics).astype(np.float64)
+        entries[system.name] = {
+            "parameters": {k: np.asarray(v).tolist() for k, v in system.params.items()},
+            "initial_conditions": ics_arr.tolist(),
+            "dt": getattr(system, "dt", None),
+            "seed": seed,
+        }
+        tasks.append((store_path, system, n, ics_arr, seed, kwargs, timeout))
+
+    with contextlib.ExitStack() as stack:
+        if use_multiprocessing:
+            pool = stack.enter_context(
+                lease_worker_pool(max_workers, maxtasksperchild)
+            )
+            results = pool.imap_unordered(_write_trajectory_task, tasks, chunksize)
+        else:
+            results = map(_write_trajectory_task, tasks)
+
+        for name, result in tqdm(
+            results, total=len(tasks), desc="Integrating systems", disable=not use_tqdm
+        ):
+            entries[name].update(result)
+
+    manifest = {
+        "n": n,
+        "n_ics": n_ics,
+        "random_seed": random_seed,
+        "timeout": timeout,
+        "integration_kwargs": kwargs,
+        "systems": entries,
+    }
+    os.makedirs(store_path, exist_ok=True)
+    with open(os.path.join(store_path, "manifest.json"), "w") as file:
+        json.dump(manifest, file, indent=2, default=str)
+
+    return manifest
+
+
+def _warm_compiled_functions(system: BaseDyn) -> None:
+    """
+    Call a system's compiled functions with the argument types used in integration
+
+    The compiled integration loops take the system's right hand side as an argument,
+    and so are specialized for each system and cannot be cached on disk. They are
+    compiled here as well, so that worker processes forked afterwards inherit them.
+    """
+    params = tuple(system.param_list)
+    if isinstance(system, DynSys):
+        ic = np.asarray(system.ic, dtype=np.float64)
+        system.rhs(ic, 0.0)
+        system.rhs_batch(ic[None], 0.0)
+        if system.has_jacobian():
+            system.jac(ic, 0.0)
+        if system.has_jit_rhs():
+            tvals = np.array([0.0, 1e-3])
+            for method in JIT_METHODS:
+                integrate_jit(system._rhs, ic, tvals, params, method=method)
+            integrate_sde_jit(system._rhs, ic, tvals, 0.0, params)
+    elif isinstance(system, DynMap):
+        # the first step may see integer initial conditions, and later steps floats
+        curr = np.atleast_2d(system.ic)
+        system.rhs(system.rhs(curr))
+        if system.has_jit_rhs():
+            iterate_map_jit(system._rhs, curr, 1, params)
+    elif isinstance(system, DynSysDelay):
+        ic = np.asarray(system.ic, dtype=np.float64)
+        system.delayed_rhs(lambda t: ic[0], 0.0, system.tau)
+        if system.has_jit_rhs():
+            tvals = np.array([0.0, system.tau])
+            integrate_delay_jit(
+                system._rhs,
+                lambda t: ic[None, 0],
+                tvals,
+                system.tau,
+                params,
+                batched=True,
+            )
+
+
+def precompile(
+    sys_class: str | Sequence[str] = ("continuous", "discrete"),
+    cache_dir: str | PathLike | None = None,
+    use_tqdm: bool = True,
+    subset: Sequence[str] | None = None,
+) -> list[str]:
+    """
+    Compile the right hand side and Jacobian of every system ahead of time
+
+    The compiled functions are written to numba's on-disk cache, so that later
+    processes, such as multiprocessing workers, load them instead of compiling. The
+    integration loops, and the wrappers generated around each right hand side, cannot
+    be cached on disk, and are instead compiled in the calling process. The persistent
+    worker pool is restarted, so that its workers are forked with them.
+
+    Args:
+        sys_class (str or list): The classes of systems to compile, as accepted by
+            get_attractor_list()
+        cache_dir (str): Directory for the numba cache. Defaults to numba's default,
+            or the NUMBA_CACHE_DIR environment variable if it is set.
+        use_tqdm (bool): Whether to use a progress bar
+        subset (list): The names of the systems to compile. Overrides sys_class.
+
+    Returns:
+        failed (list): The names of systems whose functions failed to compile
+    """
+    if not has_module("numba"):
+        warnings.warn("numba is not installed, so there is nothing to precompile.")
+        return []
+
+    if cache_dir is not None:
+        set_jit_cache_dir(cache_dir)
+
+    if subset is not None:
+        names = list(subset)
+    else:
+        sys_classes = [sys_class] if isinstance(sys_class, str) else sys_class
+        names = [name for cls in sys_classes for name in get_attractor_list(cls)]
+
+    failed = []
+    for name in tqdm(names, desc="Compiling systems", disable=not use_tqdm):
+        try:
+            _warm_compiled_functions(_system_from_name(name))
+        except Exception as exception:
+            warnings.warn(f"Could not compile {name}: {exception}")
+            failed.append(name)
+
+    shutdown_worker_pool()
+    return failed
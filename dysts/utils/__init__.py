@@ -5,4 +5,6 @@ dependencies on the rest of the package.
 
 from .integration_utils import *
 from .native_utils import *
+from .storage_utils import *
+from .symbolic_utils import *
 from .utils import *
@@ -1,18 +1,25 @@
 """Utilities for integration"""
 
+from functools import cache
 from typing import Callable
 
 import numpy as np
-import scipy.integrate
-import scipy.interpolate
-from scipy.integrate import solve_ivp
-from scipy.signal import resample
+import scipy  # submodules are imported by scipy on first access
 
-from .native_utils import has_module
+from .native_utils import LazyJit
 from .utils import freq_from_autocorr
 
-if has_module("sdeint"):
-    from sdeint import itoint
+JIT_METHODS = ("RK4", "DOPRI5")
+
+# The number of steps after which the compiled integration loops return to Python
+STEPS_PER_CALL = 100_000
+
+# The compiled integration loops below are not cached on disk. They take the wrapped
+# right hand side as an argument, and numba types such an argument by the identity of
+# its dispatcher, so a cached loop would never match in a new process. The wrappers
+# are generated with exec, and numba can only cache functions defined in a source
+# file. dysts.precompile() compiles both in the parent process instead, where they
+# are inherited by worker processes forked afterwards.
 
 
 def cast_to_numpy(x, singleton_scalar=False):
@@ -53,11 +60,12 @@ def integrate_dyn(
     tvals: np.ndarray,
     noise: float | np.ndarray = 0.0,
     dtval=None,
+    random_state: int | np.random.Generator | None = None,
     **kwargs,
 ):
     """
     Given the RHS of a dynamical system, integrate the system
-    noise > 0 requires the Python library sdeint (assumes Brownian noise)
+    noise > 0 integrates with the Euler-Maruyama method (assumes Brownian noise)
 
     Args:
         f (callable): The right hand side of a system of ODEs.
@@ -67,6 +75,8 @@ def integrate_dyn(
             vector is passed, this will be different for each dynamical variable
         dtval (float): The starting integration timestep. This will be the exact timestep for
             fixed-step integrators, or stochastic integration.
+        random_state (int or Generator): The seed or random number generator for the
+            noise
         kwargs (dict): Arguments passed to scipy.integrate.solve_ivp.
 
     Returns:
@@ -75,19 +85,23 @@ def integrate_dyn(
     ic = np.array(ic)
 
     if np.abs(noise).sum() > 0:
-        if not has_module("sdeint"):
-            raise ImportError(
-                "Please install the package sdeint in order to integrate with noise."
-            )
-        gw = lambda y, t: noise * np.diag(ic)
-        fw = lambda y, t: np.array(f(t, y))
-        tvals_fine = np.linspace(
-            np.min(tvals), np.max(tvals), int(np.ptp(tvals) / dtval)
+        # the diffusion is noise * diag(ic), applied to each dynamical variable
+        dtval = np.median(np.diff(tvals)) if dtval is None else dtval
+        sol, n_complete = _euler_maruyama_kernel.func(
+            lambda t, y, params: np.asarray(f(t, y), dtype=np.float64),
+            (),
+            np.atleast_2d(ic.astype(np.float64)),
+            np.atleast_2d(noise * ic),
+            np.asarray(tvals, dtype=np.float64),
+            dtval,
+            np.random.default_rng(random_state),
         )
-        sol_fine = itoint(fw, gw, np.array(ic), tvals_fine).T
-        sol = np.vstack([resample(item, len(tvals)) for item in sol_fine])
+        sol = sol[0, :, : n_complete[0]]
     else:
-        sol0 = solve_ivp(
+        # explicit methods warn about a jac argument, which they do not use
+        if kwargs.get("method", "RK45") in ("RK23", "RK45", "DOP853"):
+            kwargs.pop("jac", None)
+        sol0 = scipy.integrate.solve_ivp(
             f,
             [tvals[0], tvals[-1]],
             ic,
@@ -104,7 +118,6 @@ def integrate_weiner(f, noise_amp, ic, tvals):
     """
     Given the RHS of a dynamical system, integrate the
     system assuming Brownian noise
-    Requires the Python library sdeint
 
     Args:
         f (callable): the right hand side of a system of ODE
@@ -155,6 +168,687 @@ def generate_ic_ensemble(
     return sol
 
 
+# ---------------------- START OF compiled integrators ----------------------
+# Fixed-step and adaptive Runge-Kutta loops that run entirely inside numba, so that
+# a compiled right hand side is never called back from Python during integration.
+
+# Dormand-Prince 5(4) tableau, error estimate, and dense output coefficients
+DOPRI5_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+DOPRI5_A = np.array(
+    [
+        [0, 0, 0, 0, 0],
+        [1 / 5, 0, 0, 0, 0],
+        [3 / 40, 9 / 40, 0, 0, 0],
+        [44 / 45, -56 / 15, 32 / 9, 0, 0],
+        [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0],
+        [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+    ]
+)
+DOPRI5_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+DOPRI5_E = np.array(
+    [-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40]
+)
+DOPRI5_P = np.array(
+    [
+        [
+            1,
+            -8048581381 / 2820520608,
+            8663915743 / 2820520608,
+            -12715105075 / 11282082432,
+        ],
+        [0, 0, 0, 0],
+        [
+            0,
+            131558114200 / 32700410799,
+            -68118460800 / 10900136933,
+            87487479700 / 32700410799,
+        ],
+        [
+            0,
+            -1754552775 / 470086768,
+            14199869525 / 1410260304,
+            -10690763975 / 1880347072,
+        ],
+        [
+            0,
+            127303824393 / 49829197408,
+            -318862633887 / 49829197408,
+            701980252875 / 199316789632,
+        ],
+        [
+            0,
+            -282668133 / 205662961,
+            2019193451 / 616988883,
+            -1453857185 / 822651844,
+        ],
+        [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+    ]
+)
+DOPRI5_PT = np.ascontiguousarray(DOPRI5_P.T)
+
+
+@cache
+def make_jit_rhs(rhs: Callable, dim: int) -> Callable:
+    """
+    Wrap a compiled right hand side with signature rhs(*X, t, *params) into a compiled
+    function f(t, y, params) that returns the derivative as an array.
+
+    Args:
+        rhs (callable): A numba-compiled right hand side, such as a system's `_rhs`
+        dim (int): The dimension of the state vector
+
+    Returns:
+        f (callable): A compiled function f(t, y, params) -> dy
+    """
+    args = ", ".join(f"y[{i}]" for i in range(dim))
+    outs = (
+        "\n".join(f"    dy[{i}] = out[{i}]" for i in range(dim))
+        if dim > 1
+        else "    dy[0] = out"
+    )
+    src = (
+        "def jit_rhs(t, y, params):\n"
+        f"    out = rhs({args}, t, *params)\n"
+        f"    dy = np.empty({dim})\n"
+        f"{outs}\n"
+        "    return dy\n"
+    )
+    namespace = {"rhs": rhs, "np": np}
+    exec(src, namespace)
+    return LazyJit(namespace["jit_rhs"]).dispatcher
+
+
+@cache
+def make_jit_jac(jac: Callable, dim: int) -> Callable:
+    """
+    Wrap a compiled Jacobian with signature jac(*X, t, *params), which returns a
+    sequence of rows, into a compiled function f(X, tvals, params, out) that writes
+    the Jacobians at a batch of states into an array.
+
+    Args:
+        jac (callable): A numba-compiled Jacobian, such as a system's `_jac`
+        dim (int): The dimension of the state vector
+
+    Returns:
+        f (callable): A compiled function f(X, tvals, params, out), which evaluates the
+            Jacobian at each state X[b] and time tvals[b] into out[b]
+    """
+    args = ", ".join(f"X[b, {i}]" for i in range(dim))
+    outs = "\n".join(
+        f"        for j in range({dim}):\n            out[b, {i}, j] = rows[{i}][j]"
+        for i in range(dim)
+    )
+    src = (
+        "def jit_jac(X, tvals, params, out):\n"
+        "    for b in range(X.shape[0]):\n"
+        f"        rows = jac({args}, tvals[b], *params)\n"
+        f"{outs}\n"
+        "    return out\n"
+    )
+    namespace = {"jac": jac}
+    exec(src, namespace)
+    return LazyJit(namespace["jit_jac"]).dispatcher
+
+
+@LazyJit
+def _rk4_kernel(
+    f,
+    params,
+    sol,
+    n_complete,
+    failed,
+    t_curr,
+    y_curr,
+    n_sub_done,
+    tvals,
+    dt,
+    max_call_steps,
+):
+    """
+    Fixed-step fourth-order Runge-Kutta, stepping exactly onto each output time
+
+    Each trajectory resumes from the step state (t_curr, y_curr) at which it stopped,
+    n_sub_done steps into the interval after its last completed output time. Returns
+    False once max_call_steps steps have been taken, so that the caller regains
+    control, and True when every trajectory has finished or diverged.
+    """
+    call_steps = 0
+    for b in range(sol.shape[0]):
+        k = n_complete[b]
+        y = y_curr[b].copy()
+        t = t_curr[b]
+        i = n_sub_done[b]
+        while k < len(tvals) and not failed[b]:
+            n_sub = max(1, int(np.ceil((tvals[k] - tvals[k - 1]) / dt)))
+            h = (tvals[k] - tvals[k - 1]) / n_sub
+            while i < n_sub and call_steps < max_call_steps:
+                k1 = f(t, y, params)
+                k2 = f(t + h / 2, y + h / 2 * k1, params)
+                k3 = f(t + h / 2, y + h / 2 * k2, params)
+                k4 = f(t + h, y + h * k3, params)
+                y = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+                t += h
+                i += 1
+                call_steps += 1
+            if i < n_sub:
+                break
+            if not np.all(np.isfinite(y)):
+                failed[b] = True
+                break
+            sol[b, :, k] = y
+            t = tvals[k]
+            i = 0
+            k += 1
+            n_complete[b] = k
+
+        t_curr[b] = t
+        y_curr[b] = y
+        n_sub_done[b] = i
+        if call_steps >= max_call_steps:
+            return False
+    return True
+
+
+@LazyJit
+def _euler_maruyama_kernel(f, params, ics, sigma, tvals, dt, rng):
+    """
+    Euler-Maruyama with diagonal additive noise of amplitude sigma, stepping exactly
+    onto each output time. For additive noise this coincides with the Milstein method.
+    """
+    n_ics, dim = ics.shape
+    sol = np.zeros((n_ics, dim, len(tvals)))
+    n_complete = np.zeros(n_ics, dtype=np.int64)
+    for b in range(n_ics):
+        y = ics[b].copy()
+        sol[b, :, 0] = y
+        n_complete[b] = 1
+        for k in range(1, len(tvals)):
+            t = tvals[k - 1]
+            n_sub = max(1, int(np.ceil((tvals[k] - t) / dt)))
+            h = (tvals[k] - t) / n_sub
+            for _ in range(n_sub):
+                dw = np.sqrt(h) * rng.standard_normal(dim)
+                y = y + h * f(t, y, params) + sigma[b] * dw
+                t += h
+            if not np.all(np.isfinite(y)):
+                break
+            sol[b, :, k] = y
+            n_complete[b] = k + 1
+    return sol, n_complete
+
+
+@LazyJit
+def _dopri5_kernel(
+    f,
+    params,
+    sol,
+    n_complete,
+    failed,
+    t_curr,
+    y_curr,
+    h_curr,
+    n_steps,
+    rejected,
+    tvals,
+    rtol,
+    atol,
+    max_steps,
+    max_call_steps,
+):
+    """
+    Adaptive Dormand-Prince 5(4), evaluated on the output times by dense output
+
+    Each trajectory resumes from the step state (t_curr, y_curr, h_curr, rejected)
+    at which it stopped. Returns False once max_call_steps steps have been taken, so
+    that the caller regains control, and True when every trajectory has finished
+    or failed.
+    """
+    dim = y_curr.shape[1]
+    t_end = tvals[-1]
+    eps = np.finfo(np.float64).eps
+    K = np.zeros((7, dim))
+    call_steps = 0
+    for b in range(sol.shape[0]):
+        if failed[b] or n_complete[b] >= len(tvals):
+            continue
+        y = y_curr[b].copy()
+        t = t_curr[b]
+        h = h_curr[b]
+        k_out = n_complete[b]
+        K[0] = f(t, y, params)
+        step_rejected = rejected[b]
+        while k_out < len(tvals):
+            if call_steps >= max_call_steps:
+                break
+            if h < 10 * eps * max(abs(t), 1.0) or n_steps[b] >= max_steps:
+                failed[b] = True
+                break
+            t_new = t + h
+            if t_new >= t_end:
+                h, t_new = t_end - t, t_end
+            for s in range(1, 6):
+                dy = np.zeros(dim)
+                for j in range(s):
+                    dy += DOPRI5_A[s, j] * K[j]
+                K[s] = f(t + DOPRI5_C[s] * h, y + h * dy, params)
+            dy = np.zeros(dim)
+            for j in range(6):
+                dy += DOPRI5_B[j] * K[j]
+            y_new = y + h * dy
+            K[6] = f(t + h, y_new, params)
+            err = np.zeros(dim)
+            for j in range(7):
+                err += DOPRI5_E[j] * K[j]
+            scale = atol + np.maximum(np.abs(y), np.abs(y_new)) * rtol
+            err_norm = np.sqrt(np.mean((h * err / scale) ** 2))
+            n_steps[b] += 1
+            call_steps += 1
+
+            if not np.isfinite(err_norm):
+                h *= 0.2
+                step_rejected = True
+                continue
+
+            if err_norm < 1:
+                if err_norm == 0:
+                    factor = 10.0
+                else:
+                    factor = min(10.0, 0.9 * err_norm ** (-1 / 5))
+                if step_rejected:
+                    factor = min(1.0, factor)
+                step_rejected = False
+
+                # dense output at every requested time point inside the step
+                Q = DOPRI5_PT @ K
+                while k_out < len(tvals) and tvals[k_out] <= t_new:
+                    x = min((tvals[k_out] - t) / h, 1.0)
+                    sol[b, :, k_out] = y + h * (
+                        Q[0] * x + Q[1] * x**2 + Q[2] * x**3 + Q[3] * x**4
+                    )
+                    k_out += 1
+                n_complete[b] = k_out
+
+                t = t_new
+                y = y_new
+                K[0] = K[6]
+                h *= factor
+            else:
+                h *= max(0.2, 0.9 * err_norm ** (-1 / 5))
+                step_rejected = True
+
+        t_curr[b] = t
+        y_curr[b] = y
+        h_curr[b] = h
+        rejected[b] = step_rejected
+        if call_steps >= max_call_steps:
+            return False
+    return True
+
+
+def integrate_jit(
+    rhs: Callable,
+    ic: np.ndarray,
+    tvals: np.ndarray,
+    params: tuple = (),
+    method: str = "RK4",
+    dtval: float | None = None,
+    rtol: float = 1e-6,
+    atol: float = 1e-6,
+    max_steps: int = 10**8,
+) -> list[np.ndarray]:
+    """
+    Integrate a compiled right hand side with a Runge-Kutta loop compiled by numba
+
+    Args:
+        rhs (callable): A numba-compiled right hand side with signature
+            rhs(*X, t, *params), such as a system's `_rhs`
+        ic (ndarray): The initial condition(s), with shape (D,) or (B, D)
+        tvals (ndarray): The time points at which to evaluate the solution
+        params (tuple): The parameters passed to the right hand side
+        method (str): "RK4" for a fixed-step fourth-order Runge-Kutta method with
+            timestep dtval, or "DOPRI5" for the adaptive Dormand-Prince method with
+            dense output, starting from timestep dtval
+        dtval (float): The integration timestep
+        rtol (float): The relative tolerance (DOPRI5 only)
+        atol (float): The absolute tolerance (DOPRI5 only)
+        max_steps (int): The maximum number of steps per initial condition (DOPRI5
+            only)
+
+    Returns:
+        sol (list): One D x T' trajectory per initial condition. If the integration
+            diverged or failed, T' is the number of time points reached before failure
+    """
+    ics = np.atleast_2d(np.asarray(ic, dtype=np.float64))
+    tvals = np.asarray(tvals, dtype=np.float64)
+    dtval = np.median(np.diff(tvals)) if dtval is None else dtval
+    f = make_jit_rhs(rhs, ics.shape[-1])
+    params = tuple(params)
+
+    n_ics, dim = ics.shape
+    sol = np.zeros((n_ics, dim, len(tvals)))
+    sol[:, :, 0] = ics
+    n_complete = np.ones(n_ics, dtype=np.int64)
+    failed = np.zeros(n_ics, dtype=np.bool_)
+
+    # the loops return to Python every STEPS_PER_CALL steps and are resumed, so that
+    # a time_limit() around the integration can interrupt them
+    finished = False
+    t_curr = np.full(n_ics, tvals[0])
+    y_curr = ics.copy()
+    if method == "RK4":
+        n_sub_done = np.zeros(n_ics, dtype=np.int64)
+        while not finished:
+            finished = _rk4_kernel(
+                f,
+                params,
+                sol,
+                n_complete,
+                failed,
+                t_curr,
+                y_curr,
+                n_sub_done,
+                tvals,
+                dtval,
+                STEPS_PER_CALL,
+            )
+    elif method == "DOPRI5":
+        h0 = dtval if dtval > 0 else 1e-3 * max(tvals[-1] - tvals[0], 1.0)
+        h_curr = np.full(n_ics, h0, dtype=np.float64)
+        n_steps = np.zeros(n_ics, dtype=np.int64)
+        rejected = np.zeros(n_ics, dtype=np.bool_)
+        while not finished:
+            finished = _dopri5_kernel(
+                f,
+                params,
+                sol,
+                n_complete,
+                failed,
+                t_curr,
+                y_curr,
+                h_curr,
+                n_steps,
+                rejected,
+                tvals,
+                rtol,
+                atol,
+                max_steps,
+                STEPS_PER_CALL,
+            )
+    else:
+        raise ValueError(f"Unknown compiled integration method {method}")
+
+    return [traj[:, :n] for traj, n in zip(sol, n_complete)]
+
+
+def integrate_sde_jit(
+    rhs: Callable,
+    ic: np.ndarray,
+    tvals: np.ndarray,
+    sigma: float | np.ndarray,
+    params: tuple = (),
+    dtval: float | None = None,
+    random_state: int | np.random.Generator | None = None,
+) -> list[np.ndarray]:
+    """
+    Integrate a compiled right hand side driven by additive Brownian noise, with an
+    Euler-Maruyama loop compiled by numba
+
+    Args:
+        rhs (callable): A numba-compiled right hand side with signature
+            rhs(*X, t, *params), such as a system's `_rhs`
+        ic (ndarray): The initial condition(s), with shape (D,) or (B, D)
+        tvals (ndarray): The time points at which to evaluate the solution. The
+            integration steps exactly onto each of them.
+        sigma (float or ndarray): The noise amplitude of each variable, with shape
+            (D,) or (B, D). Each initial condition gets an independent noise path.
+        params (tuple): The parameters passed to the right hand side
+        dtval (float): The maximum integration timestep
+        random_state (int or Generator): The seed or random number generator for the
+            noise
+
+    Returns:
+        sol (list): One D x T' trajectory per initial condition. If the integration
+            diverged, T' is the number of time points reached before divergence
+    """
+    ics = np.atleast_2d(np.asarray(ic, dtype=np.float64))
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), ics.shape)
+    tvals = np.asarray(tvals, dtype=np.float64)
+    dtval = np.median(np.diff(tvals)) if dtval is None else dtval
+    f = make_jit_rhs(rhs, ics.shape[-1])
+
+    sol, n_complete = _euler_maruyama_kernel(
+        f,
+        tuple(params),
+        ics,
+        np.ascontiguousarray(sigma),
+        tvals,
+        dtval,
+        np.random.default_rng(random_state),
+    )
+    return [traj[:, :n] for traj, n in zip(sol, n_complete)]
+
+
+@cache
+def make_jit_map(rhs: Callable, dim: int) -> Callable:
+    """
+    Wrap a compiled map with signature rhs(*X, *params) into a compiled function
+    f(y, params) that advances the state array y by one step in place.
+
+    Args:
+        rhs (callable): A numba-compiled map, such as a DynMap's `_rhs`
+        dim (int): The dimension of the state vector
+
+    Returns:
+        f (callable): A compiled function f(y, params) -> None
+    """
+    args = ", ".join(f"y[{i}]" for i in range(dim))
+    updates = (
+        "\n".join(f"    y[{i}] = out[{i}]" for i in range(dim))
+        if dim > 1
+        else "    y[0] = out"
+    )
+    src = f"def jit_map(y, params):\n    out = rhs({args}, *params)\n{updates}\n"
+    namespace = {"rhs": rhs}
+    exec(src, namespace)
+    return LazyJit(namespace["jit_map"]).dispatcher
+
+
+@LazyJit
+def _map_kernel(f, params, ics, n):
+    """Iterate a map n times from each initial condition"""
+    n_ics, dim = ics.shape
+    traj = np.empty((n_ics, n, dim))
+    y = np.empty(dim)
+    for b in range(n_ics):
+        y[:] = ics[b]
+        for i in range(n):
+            f(y, params)
+            traj[b, i] = y
+    return traj
+
+
+def iterate_map_jit(rhs: Callable, ic: np.ndarray, n: int, params=()) -> np.ndarray:
+    """
+    Iterate a compiled map from one or more initial conditions, entirely in numba
+
+    Args:
+        rhs (callable): A numba-compiled map with signature rhs(*X, *params)
+        ic (ndarray): Initial condition(s), of shape (D,) or (B, D)
+        n (int): The number of iterations
+        params (tuple): Parameters passed to rhs after the state variables
+
+    Returns:
+        traj (ndarray): The iterates, of shape (B, n, D), excluding the initial condition
+    """
+    ics = np.atleast_2d(np.asarray(ic, dtype=np.float64))
+    f = make_jit_map(rhs, ics.shape[-1])
+    return _map_kernel(f, tuple(params), ics, n)
+
+
+@cache
+def make_jit_delay_rhs(rhs: Callable, dim: int) -> Callable:
+    """
+    Wrap a compiled delay right hand side with signature rhs(X, X_delayed, t, *params)
+    into a compiled function f(t, y, y_delayed, params, out) that writes the
+    derivative into out
+
+    Args:
+        rhs (callable): A numba-compiled right hand side, such as a DynSysDelay's
+            `_rhs`. Scalar equations take scalar arguments, while equations of higher
+            dimension take the state arrays.
+        dim (int): The dimension of the state vector
+
+    Returns:
+        f (callable): A compiled function f(t, y, y_delayed, params, out) -> None
+    """
+    if dim == 1:
+        body = "    out[0] = rhs(y[0], yd[0], t, *params)\n"
+    else:
+        body = (
+            "    res = rhs(y, yd, t, *params)\n"
+            f"    for i in range({dim}):\n"
+            "        out[i] = res[i]\n"
+        )
+    src = f"def jit_delay_rhs(t, y, yd, params, out):\n{body}"
+    namespace = {"rhs": rhs}
+    exec(src, namespace)
+    return LazyJit(namespace["jit_delay_rhs"]).dispatcher
+
+
+@LazyJit
+def _dde_rk4_kernel(f, params, hist, hist_deriv, t0, h, tvals):
+    """
+    Method of steps for a single constant delay tau = m * h, with fourth-order
+    Runge-Kutta steps. The states and derivatives at the last m + 1 grid points are
+    kept in ring buffers of shape (m + 1, B, D) that are shared by the batch, so
+    the delayed state at a grid point is read directly and at a midpoint by cubic
+    Hermite interpolation. The solution at tvals is also interpolated with cubic
+    Hermite polynomials.
+    """
+    size, n_ics, dim = hist.shape
+    xbuf = hist.copy()
+    fbuf = hist_deriv.copy()
+    sol = np.empty((n_ics, len(tvals), dim))
+    n_steps = int(np.ceil((tvals[-1] - t0) / h - 1e-9))
+    x, x_new, k1 = (
+        np.empty((n_ics, dim)),
+        np.empty((n_ics, dim)),
+        np.empty((n_ics, dim)),
+    )
+    y, xd_mid = np.empty(dim), np.empty(dim)
+    k2, k3, k4 = np.empty(dim), np.empty(dim), np.empty(dim)
+
+    # the current states are stored at head, and the states a delay ago at head + 1
+    head = size - 1
+    x[:] = xbuf[head]
+    k_out = 0
+    while k_out < len(tvals) and tvals[k_out] <= t0:
+        sol[:, k_out] = x
+        k_out += 1
+
+    t = t0
+    for b in range(n_ics):
+        f(t, x[b], xbuf[(head + 1) % size, b], params, k1[b])
+    for step in range(n_steps):
+        fbuf[head] = k1
+        old, old_next = (head + 1) % size, (head + 2) % size
+        # the derivative jumps at t0, so the last history interval uses the history's
+        f_next = hist_deriv[size - 1] if step == size - 2 else fbuf[old_next]
+        t_new = t0 + (step + 1) * h
+        for b in range(n_ics):
+            for i in range(dim):
+                xd_mid[i] = 0.5 * (
+                    xbuf[old, b, i] + xbuf[old_next, b, i]
+                ) + 0.125 * h * (fbuf[old, b, i] - f_next[b, i])
+                y[i] = x[b, i] + 0.5 * h * k1[b, i]
+            f(t + 0.5 * h, y, xd_mid, params, k2)
+            for i in range(dim):
+                y[i] = x[b, i] + 0.5 * h * k2[i]
+            f(t + 0.5 * h, y, xd_mid, params, k3)
+            for i in range(dim):
+                y[i] = x[b, i] + h * k3[i]
+            f(t_new, y, xbuf[old_next, b], params, k4)
+            for i in range(dim):
+                x_new[b, i] = x[b, i] + h * (k1[b, i] + 2 * (k2[i] + k3[i]) + k4[i]) / 6
+
+        # the derivatives at the new points are reused as k1 of the next step
+        k_start = k_out
+        for b in range(n_ics):
+            f(t_new, x_new[b], xbuf[old_next, b], params, k4)
+            k_out = k_start
+            while k_out < len(tvals) and tvals[k_out] <= t_new + 1e-9 * h:
+                s = (tvals[k_out] - t) / h
+                s2, s3 = s * s, s * s * s
+                for i in range(dim):
+                    sol[b, k_out, i] = (
+                        (2 * s3 - 3 * s2 + 1) * x[b, i]
+                        + (s3 - 2 * s2 + s) * h * k1[b, i]
+                        + (3 * s2 - 2 * s3) * x_new[b, i]
+                        + (s3 - s2) * h * k4[i]
+                    )
+                k_out += 1
+            k1[b] = k4
+
+        # the slot holding the oldest states is no longer needed
+        head = old
+        xbuf[head] = x_new
+        x[:] = x_new
+        t = t_new
+
+    for k in range(k_out, len(tvals)):
+        sol[:, k] = x
+    return sol
+
+
+def integrate_delay_jit(
+    rhs: Callable,
+    history: Callable,
+    tvals: np.ndarray,
+    tau: float,
+    params: tuple = (),
+    dtval: float | None = None,
+    batched: bool = False,
+) -> np.ndarray:
+    """
+    Integrate a delay differential equation with a single constant delay, using a
+    fixed-step fourth-order Runge-Kutta method of steps compiled by numba
+
+    Args:
+        rhs (callable): A numba-compiled right hand side with signature
+            rhs(X, X_delayed, t, *params), such as a DynSysDelay's `_rhs`
+        history (callable): The history function, giving the state for t <= tvals[0].
+            If batched, it gives the B states of a batch of histories, as an array
+            of shape (B, D), or (B,) for scalar equations.
+        tvals (ndarray): The increasing time points at which to evaluate the solution
+        tau (float): The time delay
+        params (tuple): The parameters passed to the right hand side
+        dtval (float): The maximum integration timestep. The timestep used is the
+            largest that divides tau into a whole number of steps. Defaults to the
+            spacing of tvals.
+        batched (bool): Whether to integrate a batch of histories in a single pass
+            over the time grid
+
+    Returns:
+        sol (ndarray): A T x D trajectory, or a B x T x D batch of trajectories
+    """
+    tvals = np.asarray(tvals, dtype=np.float64)
+    dtval = np.median(np.diff(tvals)) if dtval is None else dtval
+    m = max(1, int(np.ceil(tau / dtval - 1e-9)))
+    h = tau / m
+
+    # sample the history on the grid of the m + 1 points spanning one delay
+    t0 = tvals[0]
+    hist = np.array(
+        [history(t) for t in t0 - h * np.arange(m, -1, -1)], dtype=np.float64
+    )
+    hist = hist.reshape(m + 1, len(hist[0]) if batched else 1, -1)
+    hist_deriv = np.gradient(hist, h, axis=0)
+
+    f = make_jit_delay_rhs(rhs, hist.shape[-1])
+    sol = _dde_rk4_kernel(f, tuple(params), hist, hist_deriv, t0, h, tvals)
+    return sol if batched else sol[0]
+
+
 # ----------------------- START OF ddeint IMPLEMENTATION -----------------------
 # from https://github.com/Zulko/ddeint, we expose the code for flexibility
 
@@ -162,7 +856,7 @@ def generate_ic_ensemble(
 class ddeVar:
     """
     The instances of this class are special function-like
-    variables which store their past values in an interpolator and
+    variables which store their past values in a growable buffer and
     can be called for any past time: Y(t), Y(t-d).
     Very convenient for the integration of DDEs.
     """
@@ -172,55 +866,71 @@ class ddeVar:
 
         self.g = g
         self.tc = tc
-        # We must fill the interpolator with 2 points minimum
-
-        self.interpolator = scipy.interpolate.interp1d(
-            np.array([tc - 1, tc]),  # X
-            np.array([self.g(tc), self.g(tc)]).T,  # Y
-            kind="linear",
-            bounds_error=False,
-            fill_value=self.g(tc),
-        )
+        # We must fill the buffer with 2 points minimum
+        y0 = np.asarray(self.g(tc), dtype=float)
+        self._times = np.empty(64)
+        self._values = np.empty((64, *y0.shape))
+        self._times[:2] = [tc - 1, tc]
+        self._values[:2] = y0
+        self._size = 2
 
     def update(self, t, Y):
-        """Add one new (ti,yi) to the interpolator"""
-        Y2 = Y if (Y.size == 1) else np.array([Y]).T
-        self.interpolator = scipy.interpolate.interp1d(
-            np.hstack([self.interpolator.x, [t]]),  # X
-            np.hstack([self.interpolator.y, Y2]),  # Y
-            kind="linear",
-            bounds_error=False,
-            fill_value=Y,
-        )
+        """Add one new (ti,yi) to the history, doubling the buffer when it is full"""
+        if self._size == len(self._times):
+            self._times = np.concatenate([self._times, np.empty_like(self._times)])
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._times[self._size] = t
+        self._values[self._size] = np.reshape(Y, self._values.shape[1:])
+        self._size += 1
 
     def __call__(self, t=0):
         """Y(t) will return the instance's value at time t"""
+        if t <= self.tc:
+            return self.g(t)
 
-        return self.g(t) if (t <= self.tc) else self.interpolator(t)
+        # linear interpolation between stored points, holding the latest value
+        times = self._times[: self._size]
+        if t >= times[-1]:
+            return self._values[self._size - 1].copy()
+        i = np.searchsorted(times, t, side="right")
+        w = (t - times[i - 1]) / (times[i] - times[i - 1])
+        return (1 - w) * self._values[i - 1] + w * self._values[i]
 
 
-class dde(scipy.integrate.ode):
-    """
-    This class overwrites a few functions of ``scipy.integrate.ode``
-    to allow for updates of the pseudo-variable Y between each
-    integration step.
-    """
+@cache
+def _dde_class():
+    """Define dde on first use, since subclassing requires importing scipy.integrate"""
+
+    class dde(scipy.integrate.ode):
+        """
+        This class overwrites a few functions of ``scipy.integrate.ode``
+        to allow for updates of the pseudo-variable Y between each
+        integration step.
+        """
+
+        def __init__(self, f, jac=None):
+            def f2(t, y, args):
+                return f(self.Y, t, *args)
+
+            scipy.integrate.ode.__init__(self, f2, jac)
+            self.set_f_params(None)
+
+        def integrate(self, t, step=False, relax=False):
+            scipy.integrate.ode.integrate(self, t, step, relax)
+            self.Y.update(self.t, self.y)
+            return self.y
 
-    def __init__(self, f, jac=None):
-        def f2(t, y, args):
-            return f(self.Y, t, *args)
+        def set_initial_value(self, Y):
+            self.Y = Y  #!!! Y will be modified during integration
+            scipy.integrate.ode.set_initial_value(self, Y(Y.tc), Y.tc)
 
-        scipy.integrate.ode.__init__(self, f2, jac)
-        self.set_f_params(None)
+    return dde
 
-    def integrate(self, t, step=False, relax=False):
-        scipy.integrate.ode.integrate(self, t, step, relax)
-        self.Y.update(self.t, self.y)
-        return self.y
 
-    def set_initial_value(self, Y):
-        self.Y = Y  #!!! Y will be modified during integration
-        scipy.integrate.ode.set_initial_value(self, Y(Y.tc), Y.tc)
+def __getattr__(name):
+    if name == "dde":
+        return _dde_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def ddeint(func, g, tt, fargs=None):
@@ -288,7 +998,7 @@ def ddeint(func, g, tt, fargs=None):
         yy = ddeint(model,g,tt,fargs=(d,)) # solve the DDE !
     """
 
-    dde_ = dde(func)
+    dde_ = _dde_class()(func)
     dde_.set_initial_value(ddeVar(g, tt[0]))
     dde_.set_f_params(fargs if fargs else [])
     results = [dde_.integrate(dde_.t + dt) for dt in np.diff(tt)]
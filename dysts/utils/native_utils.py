@@ -1,22 +1,98 @@
 """Native python utilities"""
 
+import atexit
+import collections
+import functools
 import gzip
-import importlib
+import importlib.util
 import json
+import multiprocessing.pool
 import os
+import signal
+import sys
 import threading
 import warnings
+from contextlib import contextmanager
+from multiprocessing import Pool
 
 
+@functools.cache
 def has_module(module_name: str) -> bool:
-    """Check if a module is installed"""
+    """Check if a module is installed, without importing it"""
     try:
-        importlib.import_module(module_name)
-        return True
-    except ImportError:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
         return False
 
 
+def set_jit_cache_dir(cache_dir: str | os.PathLike) -> None:
+    """
+    Set the directory in which numba caches compiled functions
+
+    By default, numba stores the cache in a __pycache__ directory next to the source
+    files, or in a user-wide cache directory if the package is not writable. The
+    setting is inherited by worker processes started afterwards.
+
+    Args:
+        cache_dir (str): Path to the cache directory
+    """
+    cache_dir = os.fspath(cache_dir)
+    os.environ["NUMBA_CACHE_DIR"] = cache_dir
+    if "numba" in sys.modules:
+        from numba.core import config
+
+        config.CACHE_DIR = cache_dir
+
+
+class LazyJit:
+    """
+    Apply numba's njit to a function on first use, rather than at import time
+
+    numba itself is only imported once the first compiled function is needed. When
+    the wrapper is a class attribute, it behaves like a static method that returns
+    the compiled function. Falls back to the python function if numba is not installed.
+
+    Args:
+        func (callable): The function to compile
+        **options: Options passed to numba.njit
+    """
+
+    def __init__(self, func, **options):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.options = options
+        self._dispatcher = None
+
+    @property
+    def dispatcher(self):
+        """The compiled function"""
+        if self._dispatcher is None:
+            if has_module("numba"):
+                from numba import njit
+
+                try:
+                    self._dispatcher = njit(self.func, **self.options)
+                except RuntimeError as err:
+                    # raised when caching is requested but no cache directory is writable
+                    if not self.options.get("cache", False):
+                        raise
+                    warnings.warn(f"Not caching {self.__qualname__}: {err}")
+                    options = {**self.options, "cache": False}
+                    self._dispatcher = njit(self.func, **options)
+            else:
+                warnings.warn(
+                    "Numba not installed. Falling back to no JIT compilation."
+                )
+                self._dispatcher = self.func
+        return self._dispatcher
+
+    def __get__(self, obj, objtype=None):
+        return self.dispatcher
+
+    def __call__(self, *args, **kwargs):
+        return self.dispatcher(*args, **kwargs)
+
+
 def convert_json_to_gzip(fpath, encoding="utf-8", delete_original=False):
     """
     Convert a json file to a gzip file in a format that can be easily read by the
@@ -114,3 +190,146 @@ class ComputationHolder:
         my_thread.join(self.timeout)  # kill the thread after `timeout` seconds
 
         return getattr(self, "sol", None)
+
+
+@contextmanager
+def time_limit(timeout: float | None):
+    """
+    A context manager that interrupts its body with a TimeoutError after a wall-clock
+    timeout. Unlike ComputationHolder, the computation is actually stopped, because
+    the exception is raised inside the running code. Compiled code that never returns
+    to Python is only interrupted once it does, and so the compiled integration loops
+    in integrate_jit return to Python periodically.
+
+    Requires SIGALRM, and so is only enforced on Unix in the main thread of a process
+    (such as a multiprocessing worker). Elsewhere, the body runs without a timeout.
+
+    Args:
+        timeout (float): the timeout in seconds. If None, no timeout is applied.
+    """
+    if timeout is None:
+        yield
+        return
+
+    if not hasattr(signal, "SIGALRM") or (
+        threading.current_thread() is not threading.main_thread()
+    ):
+        warnings.warn("Timeouts are not supported here. Running without a timeout.")
+        yield
+        return
+
+    def handler(signum, frame):
+        raise TimeoutError(f"Computation exceeded the timeout of {timeout} seconds")
+
+    previous_handler = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+_WORKER_POOL = None
+_WORKER_POOL_CONFIG = None
+# the number of outstanding leases on each pool
+_WORKER_POOL_LEASES: collections.Counter = collections.Counter()
+
+
+def get_worker_pool(
+    max_workers: int | None = None, maxtasksperchild: int | None = None
+):
+    """
+    Return a persistent multiprocessing pool, which is created on first use and reused
+    by later calls with the same configuration, so that worker startup and JIT
+    compilation are paid once per session rather than once per call.
+
+    Workers are forked when the pool is created, and so they do not see classes or
+    functions defined afterwards in the parent process. Call shutdown_worker_pool()
+    to start fresh workers.
+
+    A different configuration replaces the pool, unless work submitted through
+    lease_worker_pool() is still outstanding, in which case the existing pool is
+    reused with a warning rather than terminated.
+
+    Args:
+        max_workers (int): the number of worker processes. Defaults to the number of
+            CPUs.
+        maxtasksperchild (int): the number of tasks a worker completes before it is
+            replaced with a fresh process. Defaults to the lifetime of the pool.
+
+    Returns:
+        pool (multiprocessing.Pool): the worker pool
+    """
+    global _WORKER_POOL, _WORKER_POOL_CONFIG
+
+    config = (max_workers, maxtasksperchild)
+    if _WORKER_POOL is not None and _WORKER_POOL_CONFIG != config:
+        if _WORKER_POOL_LEASES[_WORKER_POOL] > 0:
+            warnings.warn(
+                f"The worker pool is in use with max_workers, maxtasksperchild = "
+                f"{_WORKER_POOL_CONFIG}, and so is reused instead of reconfigured."
+            )
+            return _WORKER_POOL
+        shutdown_worker_pool()
+
+    if _WORKER_POOL is None:
+        _WORKER_POOL = Pool(processes=max_workers, maxtasksperchild=maxtasksperchild)
+        _WORKER_POOL_CONFIG = config
+
+    return _WORKER_POOL
+
+
+@contextmanager
+def lease_worker_pool(
+    max_workers: int | None = None, maxtasksperchild: int | None = None
+):
+    """
+    Hold the persistent worker pool while work submitted to it is outstanding, so
+    that get_worker_pool() does not terminate it to change the configuration
+
+    Args:
+        max_workers (int): the number of worker processes
+        maxtasksperchild (int): the number of tasks a worker completes before it is
+            replaced with a fresh process
+
+    Yields:
+        pool (multiprocessing.Pool): the worker pool
+    """
+    worker_pool = get_worker_pool(max_workers, maxtasksperchild)
+    _WORKER_POOL_LEASES[worker_pool] += 1
+    try:
+        yield worker_pool
+    finally:
+        _WORKER_POOL_LEASES[worker_pool] -= 1
+        if _WORKER_POOL_LEASES[worker_pool] <= 0:
+            del _WORKER_POOL_LEASES[worker_pool]
+
+
+def is_worker_pool_running(worker_pool) -> bool:
+    """
+    Check whether a pool returned by get_worker_pool() is still the persistent pool
+    and has not been terminated, so that work submitted to it will complete
+
+    Args:
+        worker_pool (multiprocessing.Pool): the pool to check
+
+    Returns:
+        running (bool): whether the pool is still running
+    """
+    return (
+        worker_pool is _WORKER_POOL and worker_pool._state == multiprocessing.pool.RUN
+    )
+
+
+def shutdown_worker_pool():
+    """Terminate the persistent worker pool, if one is running"""
+    global _WORKER_POOL, _WORKER_POOL_CONFIG
+
+    if _WORKER_POOL is not None:
+        _WORKER_POOL.terminate()
+        _WORKER_POOL.join()
+    _WORKER_POOL, _WORKER_POOL_CONFIG = None, None
+
+
+atexit.register(shutdown_worker_pool)
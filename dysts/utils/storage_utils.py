@@ -0,0 +1,154 @@
+"""
+Utilities for storing trajectories in a binary format that can be memory-mapped
+
+A trajectory store is a directory with one subdirectory per system, each holding the
+system's solution in `values.npy` and, optionally, its timepoints in `time.npy`.
+Systems are read and written independently of each other.
+"""
+
+import gzip
+import json
+import os
+
+import numpy as np
+
+
+def _save_array(path: str, arr: np.ndarray) -> None:
+    """Write an array to a .npy file, replacing any existing file atomically"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.save(file, arr)
+    os.replace(tmp_path, path)
+
+
+def save_trajectory(
+    store_path: str,
+    system_name: str,
+    values: np.ndarray,
+    time: np.ndarray | None = None,
+) -> None:
+    """
+    Write the trajectory of a system to a trajectory store
+
+    Args:
+        store_path (str): Path to the store directory, which is created if needed
+        system_name (str): Name of the system
+        values (ndarray): A T x D trajectory
+        time (ndarray): The T timepoints of the trajectory, optional
+    """
+    system_dir = os.path.join(store_path, system_name)
+    os.makedirs(system_dir, exist_ok=True)
+    _save_array(os.path.join(system_dir, "values.npy"), np.asarray(values))
+    if time is not None:
+        _save_array(os.path.join(system_dir, "time.npy"), np.asarray(time))
+
+
+def allocate_trajectory(
+    store_path: str,
+    system_name: str,
+    shape: tuple[int, ...],
+    time: np.ndarray | None = None,
+    dtype: np.dtype | type = np.float64,
+    fill_value: float = np.nan,
+) -> np.memmap:
+    """
+    Create a writable memory-mapped array for the trajectories of a system in a
+    trajectory store, so that trajectories can be written in place
+
+    Args:
+        store_path (str): Path to the store directory, which is created if needed
+        system_name (str): Name of the system
+        shape (tuple): Shape of the array, e.g. (n_ics, T, D)
+        time (ndarray): The T timepoints of the trajectories, optional
+        dtype (dtype): Data type of the array
+        fill_value (float): Initial value of every entry
+
+    Returns:
+        values (memmap): The array backed by the store's values.npy
+    """
+    system_dir = os.path.join(store_path, system_name)
+    os.makedirs(system_dir, exist_ok=True)
+    if time is not None:
+        _save_array(os.path.join(system_dir, "time.npy"), np.asarray(time))
+
+    values = np.lib.format.open_memmap(
+        os.path.join(system_dir, "values.npy"), mode="w+", dtype=dtype, shape=shape
+    )
+    values[:] = fill_value
+    return values
+
+
+def read_trajectory(
+    store_path: str, system_name: str, mmap_mode: str | None = "r"
+) -> tuple[np.ndarray | None, np.ndarray]:
+    """
+    Read the trajectory of a system from a trajectory store
+
+    Args:
+        store_path (str): Path to the store directory
+        system_name (str): Name of the system
+        mmap_mode (str): Memory-map mode passed to np.load. The default returns
+            read-only views of the files, which are paged in from disk as they are
+            accessed. Use None to read the arrays into memory.
+
+    Returns:
+        time (ndarray): The timepoints, or None if they were not stored
+        values (ndarray): A T x D trajectory
+    """
+    system_dir = os.path.join(store_path, system_name)
+    if not os.path.isdir(system_dir):
+        raise KeyError(f"No trajectory stored for {system_name} in {store_path}")
+
+    values = np.load(os.path.join(system_dir, "values.npy"), mmap_mode=mmap_mode)
+    time_path = os.path.join(system_dir, "time.npy")
+    time = (
+        np.load(time_path, mmap_mode=mmap_mode) if os.path.exists(time_path) else None
+    )
+    return time, values
+
+
+def list_trajectories(store_path: str) -> list[str]:
+    """Get the sorted names of the systems in a trajectory store"""
+    return sorted(
+        name
+        for name in os.listdir(store_path)
+        if os.path.exists(os.path.join(store_path, name, "values.npy"))
+    )
+
+
+def convert_json_to_store(
+    fpath: str, store_path: str | None = None, encoding: str = "utf-8"
+) -> str:
+    """
+    Convert a JSON dataset, optionally gzipped, of the form
+    {system_name: {"time": [...], "values": [...]}} to a trajectory store
+
+    Args:
+        fpath (str): Path to the .json or .json.gz file
+        store_path (str): Path to the store directory. Defaults to fpath without its
+            .json or .json.gz extension.
+        encoding (str): Encoding of the JSON file
+
+    Returns:
+        store_path (str): Path to the store directory
+    """
+    if store_path is None:
+        store_path = fpath.removesuffix(".gz").removesuffix(".json")
+        if store_path == fpath:
+            raise ValueError(f"Cannot infer a store path from {fpath}")
+
+    open_fn = gzip.open if fpath.endswith(".gz") else open
+    with open_fn(fpath, "rt", encoding=encoding) as file:
+        dataset = json.load(file)
+
+    # release each system's lists once it has been written
+    for system_name in list(dataset):
+        data = dataset.pop(system_name)
+        save_trajectory(
+            store_path,
+            system_name,
+            np.array(data["values"]),
+            np.array(data["time"]) if "time" in data else None,
+        )
+
+    return store_path
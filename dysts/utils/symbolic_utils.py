@@ -0,0 +1,235 @@
+"""
+Utilities for deriving Jacobians of right hand sides symbolically
+
+Requires the Python library sympy, which is imported on first use.
+"""
+
+import inspect
+import textwrap
+import types
+from collections.abc import Callable
+
+import numpy as np
+
+from .native_utils import LazyJit
+
+# numpy functions that may appear in a right hand side, and their sympy names
+_SYMPY_FUNCTIONS = {
+    "abs": "Abs",
+    "arccos": "acos",
+    "arcsin": "asin",
+    "arctan": "atan",
+    "arctan2": "atan2",
+    "cos": "cos",
+    "cosh": "cosh",
+    "exp": "exp",
+    "log": "log",
+    "sign": "sign",
+    "sin": "sin",
+    "sinh": "sinh",
+    "sqrt": "sqrt",
+    "tan": "tan",
+    "tanh": "tanh",
+}
+
+
+def _sympy_namespace():
+    """A stand-in for the numpy module that maps its functions to sympy"""
+    import sympy
+
+    namespace = types.SimpleNamespace(
+        **{name: getattr(sympy, sym) for name, sym in _SYMPY_FUNCTIONS.items()}
+    )
+    namespace.pi = sympy.pi
+    namespace.e = sympy.E
+    return namespace
+
+
+def symbolic_jacobian(rhs: Callable, dim: int):
+    """
+    Derive the Jacobian of a right hand side with signature rhs(*X, t, *params)
+
+    The right hand side is evaluated on sympy symbols, with the numpy functions it
+    calls replaced by their sympy counterparts.
+
+    Args:
+        rhs (callable): The right hand side, such as a system's `_rhs`. Compiled
+            functions are differentiated through their python implementation.
+        dim (int): The dimension of the state vector
+
+    Returns:
+        jac (sympy.Matrix): The D x D Jacobian with respect to the state variables
+        arg_names (list): The names of the arguments of rhs
+    """
+    import sympy
+
+    func = getattr(rhs, "py_func", rhs)
+    arg_names = list(inspect.signature(func).parameters)
+    symbols = sympy.symbols(arg_names, real=True)
+    if len(arg_names) == 1:
+        symbols = [symbols]
+
+    # rebind the function to a namespace in which np refers to sympy
+    func = types.FunctionType(
+        func.__code__,
+        {**func.__globals__, "np": _sympy_namespace()},
+        func.__name__,
+        func.__defaults__,
+        func.__closure__,
+    )
+    out = func(*symbols)
+    out = out if isinstance(out, tuple | list) else (out,)
+    jac = sympy.Matrix([sympy.sympify(item) for item in out]).jacobian(symbols[:dim])
+    # discontinuities such as np.sign differentiate to zero almost everywhere
+    jac = jac.replace(sympy.DiracDelta, lambda *args: sympy.S.Zero)
+    return jac, arg_names
+
+
+def jacobian_source(
+    rhs: Callable, dim: int, indent: int = 4, max_simplify_ops: int = 40
+) -> str:
+    """
+    Emit the source code of a `_jac` method for a right hand side, in the format used
+    by the systems in dysts.flows
+
+    Numerical constants are written as exact fractions, short entries are simplified,
+    and subexpressions shared between entries are computed once. The emitted code is
+    not line-wrapped, and should be passed through a code formatter.
+
+    Args:
+        rhs (callable): The right hand side, with signature rhs(*X, t, *params)
+        dim (int): The dimension of the state vector
+        indent (int): The indentation of the emitted method
+        max_simplify_ops (int): The number of operations above which an entry of the
+            Jacobian is not simplified
+
+    Returns:
+        src (str): The source code of the decorated `_jac` method
+    """
+    import sympy
+    from sympy.printing.numpy import NumPyPrinter
+    from sympy.printing.precedence import PRECEDENCE
+
+    class Printer(NumPyPrinter):
+        def _print_Pow(self, expr, rational=False):
+            # numpy's printer writes negative integer powers as x**(-2.0)
+            if expr.exp.is_Integer and expr.exp < 0:
+                return f"1/{self.parenthesize(1 / expr, PRECEDENCE['Pow'] - 1)}"
+            return super()._print_Pow(expr, rational=rational)
+
+        def _print_Float(self, expr):
+            # a standalone Float is otherwise printed to 15 significant digits
+            return repr(float(expr))
+
+    jac, arg_names = symbolic_jacobian(rhs, dim)
+    printer = Printer({"fully_qualified_modules": True})
+
+    def simplify(expr):
+        # constants such as 0.5 in the right hand side become exact rationals
+        expr = sympy.nsimplify(expr, rational=True)
+        # simplification is slow for long expressions, which are emitted as derived
+        if sympy.count_ops(expr) <= max_simplify_ops:
+            simplified = sympy.simplify(expr)
+            if not simplified.has(sympy.Piecewise):
+                expr = simplified
+        return expr
+
+    def to_decimal(expr):
+        # write coefficients with a finite decimal expansion, such as 1/2, as in the
+        # right hand side, but keep exponents exact so that square roots stay roots
+        if expr.is_Rational and not expr.is_Integer:
+            q = int(expr.q)
+            for factor in (2, 5):
+                while q % factor == 0:
+                    q //= factor
+            return sympy.Float(repr(float(expr))) if q == 1 else expr
+        if expr.is_Pow:
+            return expr.func(to_decimal(expr.base), expr.exp)
+        if expr.args:
+            return expr.func(*(to_decimal(arg) for arg in expr.args))
+        return expr
+
+    def to_code(expr):
+        return printer.doprint(to_decimal(expr)).replace("numpy.", "np.")
+
+    jac = jac.applyfunc(simplify)
+    names = sympy.numbered_symbols(
+        "x", real=True, exclude=sympy.symbols(arg_names, real=True)
+    )
+    substitutions, (jac,) = sympy.cse(jac, symbols=names)
+    lines = [f"    {name} = {to_code(expr)}" for name, expr in substitutions]
+    lines += [
+        f"    row{i + 1} = [{', '.join(to_code(item) for item in jac.row(i))}]"
+        for i in range(dim)
+    ]
+    returns = ", ".join(f"row{i + 1}" for i in range(dim))
+    src = "\n".join(
+        [
+            "@staticjit",
+            f"def _jac({', '.join(arg_names)}):",
+            *lines,
+            f"    return {returns}",
+        ]
+    )
+    return textwrap.indent(src, " " * indent) + "\n"
+
+
+def compile_jacobian(rhs: Callable, dim: int) -> LazyJit:
+    """
+    Derive the Jacobian of a right hand side and compile it with numba on first use
+
+    Args:
+        rhs (callable): The right hand side, with signature rhs(*X, t, *params)
+        dim (int): The dimension of the state vector
+
+    Returns:
+        jac (LazyJit): The compiled Jacobian, with the same signature as rhs,
+            returning D rows. It can be assigned as the `_jac` of a system class.
+    """
+    namespace = {"np": np, "staticjit": lambda func: func}
+    exec(textwrap.dedent(jacobian_source(rhs, dim)), namespace)
+    return LazyJit(namespace["_jac"])
+
+
+def check_jacobian(
+    rhs: Callable,
+    jac: Callable,
+    points: np.ndarray,
+    params: tuple = (),
+    t: float = 0.0,
+    eps: float = 1e-6,
+    rtol: float = 1e-4,
+    atol: float = 1e-6,
+) -> bool:
+    """
+    Check a Jacobian against central finite differences of a right hand side
+
+    Args:
+        rhs (callable): The right hand side, with signature rhs(*X, t, *params)
+        jac (callable): The Jacobian, with the same signature as rhs
+        points (ndarray): A B x D array of states at which to compare them
+        params (tuple): The parameters passed after the time
+        t (float): The time at which to compare them
+        eps (float): The relative step of the finite differences
+        rtol (float): The relative tolerance of the comparison
+        atol (float): The absolute tolerance of the comparison
+
+    Returns:
+        valid (bool): Whether the Jacobians agree at every point
+    """
+    for x in np.atleast_2d(points):
+        dim = len(x)
+        jac_fd = np.zeros((dim, dim))
+        for i in range(dim):
+            h = eps * max(abs(x[i]), 1.0)
+            step = np.zeros(dim)
+            step[i] = h
+            jac_fd[:, i] = (
+                np.array(rhs(*(x + step), t, *params), dtype=float)
+                - np.array(rhs(*(x - step), t, *params), dtype=float)
+            ) / (2 * h)
+
+        jac_analytic = np.array(jac(*x, t, *params), dtype=float).reshape(dim, dim)
+        if not np.allclose(jac_analytic, jac_fd, rtol=rtol, atol=atol):
+            return False
+    return True
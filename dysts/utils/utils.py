@@ -6,11 +6,8 @@ dependencies on the rest of the package.
 import warnings
 
 import numpy as np
+import scipy  # submodules are imported by scipy on first access
 from numpy.fft import rfft
-from scipy.ndimage import gaussian_filter1d
-from scipy.optimize import approx_fprime
-from scipy.signal import periodogram
-from scipy.signal.windows import blackmanharris
 
 from .native_utils import group_consecutives
 
@@ -164,14 +161,49 @@ def pad_to_shape(arr, target_shape):
     return arr
 
 
+def interp_delay_embedding(sol, tpts, sample_ts, lags):
+    """
+    Linearly interpolate a trajectory sampled on a uniform time grid at several
+    delays, writing the flattened delay embedding into a single array
+
+    Args:
+        sol (ndarray): A trajectory with shape (T, D), or a batch of trajectories
+            with shape (B, T, D), sampled at tpts
+        tpts (ndarray): The T uniformly spaced timepoints of the trajectory
+        sample_ts (ndarray): The n timepoints at which to sample the embedding. Each
+            delayed timepoint sample_ts - lag must lie within tpts.
+        lags (ndarray): The L delays
+
+    Returns:
+        emb (ndarray): The delay embedding, with shape (n, D * L) or (B, n, D * L), in
+            which column d * L + l holds dimension d delayed by lags[l]. It is a
+            transposed view of a single array with time along the last axis.
+    """
+    # time along the last axis, so that every gather and write below is contiguous
+    rows = np.ascontiguousarray(np.moveaxis(sol, -1, -2))
+    slopes = np.diff(rows, axis=-1)
+    emb = np.empty((*rows.shape[:-1], len(lags), len(sample_ts)))
+
+    # the grid is uniform, so each delayed timepoint is located without a search, and
+    # one set of indices and weights per delay is shared by every dimension and batch
+    for i, lag in enumerate(lags):
+        pos = (sample_ts - lag - tpts[0]) / (tpts[1] - tpts[0])
+        idx = np.clip(pos.astype(np.int64), 0, len(tpts) - 2)
+        np.multiply(pos - idx, slopes[..., idx], out=emb[..., i, :])
+        emb[..., i, :] += rows[..., idx]
+
+    emb = emb.reshape(*emb.shape[:-3], -1, len(sample_ts))
+    return np.moveaxis(emb, -1, -2)
+
+
 def find_psd(y, window=True):
     """
     Find the power spectrum of a signal
     """
     if window:
-        y = y * blackmanharris(len(y))
+        y = y * scipy.signal.windows.blackmanharris(len(y))
     halflen = int(len(y) / 2)
-    fvals, psd = periodogram(y, fs=1)
+    fvals, psd = scipy.signal.periodogram(y, fs=1)
     return fvals[:halflen], psd[:halflen]
 
 
@@ -180,7 +212,7 @@ def find_characteristic_timescale(y, k=1, window=True):
     Find the k leading characteristic timescales in a time series
     using the power spectrum..
     """
-    y = gaussian_filter1d(y, 3)
+    y = scipy.ndimage.gaussian_filter1d(y, 3)
 
     fvals, psd = find_psd(y, window=window)
     max_indices = np.argsort(psd)[::-1]
@@ -278,7 +310,7 @@ def freq_from_fft(sig, fs=1):
         https://gist.github.com/endolith/255291
     """
     # Compute Fourier transform of windowed signal
-    windowed = sig * blackmanharris(len(sig))
+    windowed = sig * scipy.signal.windows.blackmanharris(len(sig))
     f = rfft(windowed)
 
     # Find the peak and interpolate to get a more accurate peak
@@ -349,7 +381,7 @@ def find_significant_frequencies(
     halflen = n // 2
 
     if window:
-        sig = sig * blackmanharris(n)
+        sig = sig * scipy.signal.windows.blackmanharris(n)
 
     psd_sig = np.abs(rfft(sig)) ** 2
 
@@ -359,7 +391,7 @@ def find_significant_frequencies(
         surr = make_surrogate(sig, method=surrogate_method)
         # np.random.shuffle(surr)
         if window:
-            surr = surr * blackmanharris(len(surr))
+            surr = surr * scipy.signal.windows.blackmanharris(len(surr))
             psd_surr = np.abs(rfft(surr)) ** 2
         all_surr_psd.append(psd_surr)
     all_surr_psd = np.array(all_surr_psd)
@@ -406,7 +438,7 @@ def jac_fd(func0, y0, eps=1e-3, m=1, method="central", verbose=False):
     all_rows = list()
     for i in range(d):
         row_func = lambda yy: func(yy)[i]
-        row = approx_fprime(y0, row_func, epsilon=eps)
+        row = scipy.optimize.approx_fprime(y0, row_func, epsilon=eps)
         all_rows.append(row)
     jac = np.array(all_rows)
 
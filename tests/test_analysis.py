@@ -1,5 +1,329 @@
+import unittest
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist, pdist
+
 import dysts.flows as dfl
-from dysts.analysis import compute_timestep
+from dysts.analysis import (
+    _lyapunov_qr_kernel,
+    _pairwise_distance_blocks,
+    _temporally_separated_neighbors,
+    compute_timestep,
+    corr_gpdim,
+    dfa,
+    find_lyapunov_exponents,
+    gp_dim,
+    max_lyapunov_exponent,
+    max_lyapunov_exponent_rosenstein,
+)
+from dysts.utils import has_module
+
+
+class TestLyapunovSpectrum(unittest.TestCase):
+    """
+    Test the QR estimate of the Lyapunov spectrum. The backward Euler recursion is
+    first order in the timestep, so the trajectories are sampled finely.
+    """
+
+    def test_lorenz_spectrum(self):
+        spectrum = find_lyapunov_exponents(
+            dfl.Lorenz(), 50000, pts_per_period=2000, method="DOP853"
+        )
+        np.testing.assert_allclose(spectrum, [0.9, 0.0, -14.5], atol=0.2)
+
+    def test_sum_equals_mean_trace(self):
+        # the trace of the Lorenz Jacobian is constant
+        model = dfl.Lorenz()
+        spectrum = find_lyapunov_exponents(
+            model, 20000, pts_per_period=2000, method="DOP853"
+        )
+        trace = -(model.sigma + 1 + model.beta)
+        self.assertAlmostEqual(np.sum(spectrum), trace, delta=0.01 * abs(trace))
+
+        # the trace of the Rossler Jacobian varies along the trajectory
+        model = dfl.Rossler()
+        tpts, traj = model.make_trajectory(
+            20000,
+            pts_per_period=2000,
+            return_times=True,
+            postprocess=False,
+            method="DOP853",
+        )
+        dt = np.median(np.diff(tpts))
+        jacs = model.jac_batch(traj, tpts)
+        total, n_steps = _lyapunov_qr_kernel(jacs, dt, 1e-8, 10)
+        trace = np.trace(jacs[1 : n_steps + 1], axis1=1, axis2=2).mean()
+        self.assertAlmostEqual(
+            np.sum(total) / (dt * n_steps), trace, delta=0.02 * abs(trace)
+        )
+
+    def test_finite_difference_jacobian(self):
+        model = dfl.Rossler()
+        spectrum = find_lyapunov_exponents(
+            model, 20000, pts_per_period=1000, method="DOP853"
+        )
+        # without an analytic Jacobian, central differences are used
+        model.has_jacobian = lambda: False
+        spectrum_fd = find_lyapunov_exponents(
+            model, 20000, pts_per_period=1000, method="DOP853"
+        )
+        np.testing.assert_allclose(spectrum_fd, spectrum, rtol=1e-5, atol=1e-6)
+
+    def test_early_stopping(self):
+        model = dfl.Lorenz()
+        tpts, traj = model.make_trajectory(
+            100, return_times=True, postprocess=False, method="DOP853"
+        )
+        dt = np.median(np.diff(tpts))
+        jacs = model.jac_batch(traj, tpts)
+
+        # every step satisfies an infinite tolerance, so the recursion stops as soon
+        # as min_tpts steps have passed
+        total, n_steps = _lyapunov_qr_kernel(jacs, dt, np.inf, 10)
+        self.assertEqual(n_steps, 11)
+        total_full, n_steps_full = _lyapunov_qr_kernel(jacs[: n_steps + 1], dt, 0.0, 10)
+        self.assertEqual(n_steps_full, n_steps)
+        np.testing.assert_allclose(total, total_full)
+
+        spectrum = find_lyapunov_exponents(
+            model, 100, pts_per_period=100, tol=np.inf, method="DOP853"
+        )
+        np.testing.assert_allclose(spectrum, np.sort(total / (dt * n_steps))[::-1])
+
+
+def _dense_neighbors(orbit, ntraj, min_tsep):
+    """The neighbor search of the original Rosenstein implementation"""
+    dists = np.linalg.norm(orbit[:, None] - orbit[None], axis=-1)
+    for i in range(len(orbit)):
+        dists[i, max(0, i - min_tsep) : i + min_tsep + 1] = np.inf
+    return np.argmin(dists[:ntraj, :ntraj], axis=1), dists
+
+
+def _dense_rosenstein(data, min_tsep, trajectory_len=20, tau=1):
+    """The original Rosenstein implementation, without delay embedding"""
+    orbit = np.asarray(data, dtype=np.float64).reshape(len(data), -1)
+    ntraj = len(orbit) - trajectory_len + 1
+    nb_idx, dists = _dense_neighbors(orbit, ntraj, min_tsep)
+    div_traj = np.array(
+        [
+            np.mean(np.log(dists[np.arange(ntraj) + k, nb_idx + k]))
+            for k in range(trajectory_len)
+        ]
+    )
+    return np.polyfit(np.arange(trajectory_len), div_traj, 1)[0] / tau
+
+
+class TestRosenstein(unittest.TestCase):
+    def setUp(self):
+        self.traj = dfl.Lorenz().make_trajectory(
+            1000, pts_per_period=50, method="DOP853"
+        )
+
+    def test_temporally_separated_neighbors(self):
+        rng = np.random.default_rng(0)
+        for name, orbit in [
+            ("noise", rng.standard_normal((300, 2))),
+            # on a finely sampled flow, the nearest points are mostly the adjacent
+            # ones in time, so the search is repeated with more neighbors
+            ("flow", self.traj[:300]),
+        ]:
+            for min_tsep, k_init in [(5, 16), (10, 2), (40, 1)]:
+                with self.subTest(orbit=name, min_tsep=min_tsep, k_init=k_init):
+                    ntraj = len(orbit) - 19
+                    nb_idx = _temporally_separated_neighbors(
+                        cKDTree(orbit), ntraj, min_tsep, k_init=k_init
+                    )
+                    expected, _ = _dense_neighbors(orbit, ntraj, min_tsep)
+                    np.testing.assert_array_equal(nb_idx, expected)
+
+    def test_matches_dense_implementation(self):
+        for data, min_tsep in [(self.traj[:, 0], 10), (self.traj, 25)]:
+            with self.subTest(dim=data.ndim, min_tsep=min_tsep):
+                le = max_lyapunov_exponent_rosenstein(
+                    data, min_tsep=min_tsep, fit="poly", tau=0.02
+                )
+                expected = _dense_rosenstein(
+                    data.astype(np.float32), min_tsep, tau=0.02
+                )
+                self.assertAlmostEqual(le, expected, delta=1e-4 * abs(expected))
+                self.assertGreater(le, 0)
+
+    def test_delay_embedding(self):
+        emb_dim, lag = 3, 2
+        for data in [self.traj[:, 0], self.traj[:, :2]]:
+            # each dimension of the data is embedded separately
+            columns = data.reshape(len(data), -1).T
+            m = len(data) - (emb_dim - 1) * lag
+            embedded = np.stack(
+                [
+                    col[i : i + m]
+                    for col in columns
+                    for i in range(0, emb_dim * lag, lag)
+                ],
+                axis=1,
+            )
+            with self.subTest(dim=columns.shape[0]):
+                le = max_lyapunov_exponent_rosenstein(
+                    data, emb_dim=emb_dim, lag=lag, min_tsep=10
+                )
+                expected = max_lyapunov_exponent_rosenstein(embedded, min_tsep=10)
+                self.assertAlmostEqual(le, expected, places=10)
+
+        with self.assertRaises(ValueError):
+            max_lyapunov_exponent_rosenstein(
+                self.traj[:10, 0], emb_dim=6, lag=2, min_tsep=1
+            )
+
+    def test_automatic_lag(self):
+        x = self.traj[:, 0]
+        acorr = np.array([np.dot(x[: len(x) - k], x[k:]) for k in range(len(x))])
+        expected_lag = np.argmax(acorr[1:] < (1 - 1 / np.e) * acorr[0]) + 1
+        self.assertGreater(expected_lag, 1)
+        le = max_lyapunov_exponent_rosenstein(x, emb_dim=3, min_tsep=10)
+        expected = max_lyapunov_exponent_rosenstein(
+            x, emb_dim=3, lag=expected_lag, min_tsep=10
+        )
+        self.assertEqual(le, expected)
+
+    def test_fit(self):
+        x = self.traj[:, 0]
+        le = max_lyapunov_exponent_rosenstein(x, min_tsep=10)
+        self.assertEqual(
+            le, max_lyapunov_exponent_rosenstein(x, min_tsep=10, fit="poly")
+        )
+        with self.assertRaises(ValueError):
+            max_lyapunov_exponent_rosenstein(x, min_tsep=10, fit="lstsq")
+
+        if has_module("sklearn"):
+            le_ransac = max_lyapunov_exponent_rosenstein(x, min_tsep=10, fit="RANSAC")
+            self.assertTrue(np.isfinite(le_ransac))
+            self.assertGreater(le_ransac, 0)
+        else:
+            with self.assertWarns(UserWarning):
+                le_ransac = max_lyapunov_exponent_rosenstein(
+                    x, min_tsep=10, fit="RANSAC"
+                )
+            self.assertEqual(le_ransac, le)
+
+
+def _polyfit_dfa(data, nvals, overlap, order):
+    """Fluctuation exponent fitting a polynomial to each window separately"""
+    walk = np.cumsum(data - np.mean(data))
+    total_n = len(walk)
+    fluctuations = []
+    for n in nvals:
+        if overlap:
+            d = np.array([walk[i : i + n] for i in range(0, total_n - n, n // 2)])
+        else:
+            d = walk[: total_n - (total_n % n)].reshape((total_n // n, n))
+        x = np.arange(n)
+        trend = np.array([np.polyval(np.polyfit(x, row, order), x) for row in d])
+        fluctuations.append(np.mean(np.sqrt(np.sum((d - trend) ** 2, axis=1) / n)))
+    return np.polyfit(np.log(nvals), np.log(fluctuations), 1)[0]
+
+
+class TestDFA(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.nvals = [4, 6, 9, 13, 20, 30, 45, 68, 102, 153]
+
+    def test_matches_windowed_polyfit(self):
+        data = self.rng.standard_normal(2000)
+        for overlap in (True, False):
+            for order in (1, 2):
+                with self.subTest(overlap=overlap, order=order):
+                    self.assertAlmostEqual(
+                        dfa(data, self.nvals, overlap=overlap, order=order),
+                        _polyfit_dfa(data, self.nvals, overlap, order),
+                        places=8,
+                    )
+
+    def test_batched_input(self):
+        batch = self.rng.standard_normal((3, 2000))
+        batch[1] = np.cumsum(batch[1])
+        alphas = dfa(batch, self.nvals)
+        self.assertEqual(alphas.shape, (3,))
+        np.testing.assert_allclose(alphas, [dfa(x, self.nvals) for x in batch])
+
+    def test_reference_values(self):
+        # uncorrelated noise has alpha = 0.5, and its random walk alpha = 1.5
+        noise = self.rng.standard_normal(20000)
+        self.assertAlmostEqual(dfa(noise), 0.5, delta=0.05)
+        self.assertAlmostEqual(dfa(np.cumsum(noise)), 1.5, delta=0.05)
+
+
+class TestGPDim(unittest.TestCase):
+    def setUp(self):
+        model = dfl.Lorenz()
+        self.traj = model.make_trajectory(2000, pts_per_period=100, method="DOP853")
+        self.traj2 = model.make_trajectory(1500, pts_per_period=100, method="DOP853")
+
+    def test_pairwise_distance_blocks(self):
+        data, y_data = self.traj[:100], self.traj2[:70]
+        dists = np.concatenate(list(_pairwise_distance_blocks(data, None, 1000)))
+        np.testing.assert_allclose(np.sort(dists), np.sort(pdist(data)))
+        dists = np.concatenate(list(_pairwise_distance_blocks(data, y_data, 1000)))
+        np.testing.assert_allclose(dists, cdist(data, y_data).ravel())
+
+    def test_methods_agree(self):
+        for y_data in (None, self.traj2):
+            exact = gp_dim(self.traj, y_data)
+            self.assertAlmostEqual(exact, 2.05, delta=0.1)
+            with self.subTest(cross=y_data is not None):
+                streamed = gp_dim(self.traj, y_data, block_size=10000)
+                self.assertAlmostEqual(streamed, exact, delta=0.01)
+                kdtree = gp_dim(self.traj, y_data, method="kdtree")
+                self.assertAlmostEqual(kdtree, exact, delta=0.01)
+                sampled = gp_dim(self.traj, y_data, n_pairs=200000, random_state=0)
+                self.assertAlmostEqual(sampled, exact, delta=0.02)
+                self.assertEqual(
+                    sampled, gp_dim(self.traj, y_data, n_pairs=200000, random_state=0)
+                )
+
+        self.assertAlmostEqual(corr_gpdim(self.traj, self.traj2), 1.0, delta=0.01)
+        with self.assertRaises(ValueError):
+            gp_dim(self.traj, method="exact")
+
+    def test_identical_points(self):
+        data = np.ones((50, 3))
+        for kwargs in [{}, {"block_size": 100}, {"method": "kdtree"}, {"n_pairs": 100}]:
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                gp_dim(data, **kwargs)
+
+
+class TestMaxLyapunov(unittest.TestCase):
+    def setUp(self):
+        self.eq = dfl.Lorenz()
+        self.kwargs = {
+            "max_walltime": 60,
+            "n_samples": 4,
+            "traj_length": 1000,
+            "random_state": 0,
+            "method": "DOP853",
+        }
+
+    def test_serial_matches_parallel(self):
+        ic = self.eq.ic.copy()
+        serial = max_lyapunov_exponent(self.eq, **self.kwargs)
+        parallel = max_lyapunov_exponent(
+            self.eq, use_multiprocessing=True, max_workers=2, **self.kwargs
+        )
+        self.assertEqual(serial, parallel)
+        self.assertGreater(serial, 0)
+        np.testing.assert_array_equal(self.eq.ic, ic)
+
+    def test_trajectory_options(self):
+        # options that the initial condition sampler sets itself are not passed twice
+        le = max_lyapunov_exponent(self.eq, postprocess=False, **self.kwargs)
+        self.assertGreater(le, 0)
+
+    def test_no_separation_below_tolerance(self):
+        # every sample starts further apart than the relative tolerance
+        self.assertIsNone(
+            max_lyapunov_exponent(self.eq, rtol=1e-12, atol=1e-10, **self.kwargs)
+        )
+
 
 if __name__ == "__main__":
     dyst_name = "Lorenz"
@@ -20,6 +344,8 @@ if __name__ == "__main__":
     print("all dt: ", dt)
     print("all periods: ", period)
 
+    unittest.main()
+
 # TODO: Use scipy optimize for black box optimization of dt from initial guess
 # until it meets characteristic timescale criteria
 # only do if it is clear how to make a cost function
@@ -1,11 +1,35 @@
+import copy
+import json
+import os
 import random
+import tempfile
+import time
 import unittest
 
 import numpy as np
 
 import dysts.flows as dfl
+from dysts.base import DATAPATH_CONTINUOUS, get_metadata
 from dysts.sampling import GaussianInitialConditionSampler, GaussianParamSampler
-from dysts.systems import get_attractor_list, make_trajectory_ensemble
+from dysts.systems import (
+    get_attractor_list,
+    iter_trajectory_ensemble,
+    make_trajectory_dataset,
+    make_trajectory_ensemble,
+)
+from dysts.utils import get_worker_pool, read_trajectory, shutdown_worker_pool
+
+
+class SleepingLorenz(dfl.Lorenz):
+    """A Lorenz system whose integration blocks in Python, so that any timeout fires"""
+
+    def __init__(self):
+        metadata = copy.deepcopy(get_metadata(DATAPATH_CONTINUOUS)["Lorenz"])
+        super().__init__(metadata_path=None, metadata=metadata)
+
+    def make_trajectory(self, *args, **kwargs):
+        time.sleep(60)
+        return super().make_trajectory(*args, **kwargs)
 
 
 class TestTrajectoryEnsemble(unittest.TestCase):
@@ -50,6 +74,117 @@ class TestTrajectoryEnsemble(unittest.TestCase):
         self.assertTrue(len(sols) > 0)
         self.assertTrue(all(arr is not None for arr in sols.values()))
 
+    def test_ensemble_generation_timeout(self):
+        subset = [SleepingLorenz()]
+        for use_multiprocessing in [False, True]:
+            with self.subTest(use_multiprocessing=use_multiprocessing):
+                sols = make_trajectory_ensemble(
+                    256,
+                    use_tqdm=False,
+                    use_multiprocessing=use_multiprocessing,
+                    subset=subset,
+                    timeout=0.1,
+                )
+                self.assertEqual(list(sols.keys()), ["SleepingLorenz"])
+                self.assertIsNone(sols["SleepingLorenz"])
+
+    def test_ensemble_generation_streaming(self):
+        subset = random.sample(get_attractor_list(sys_class="continuous_no_delay"), 4)
+        for use_multiprocessing in [False, True]:
+            with self.subTest(use_multiprocessing=use_multiprocessing):
+                sols = iter_trajectory_ensemble(
+                    256,
+                    pts_per_period=64,
+                    use_multiprocessing=use_multiprocessing,
+                    subset=subset,
+                )
+                names = []
+                for name, traj in sols:
+                    names.append(name)
+                    self.assertIsInstance(traj, np.ndarray)
+                    self.assertEqual(traj.shape[0], 256)
+                self.assertEqual(sorted(names), sorted(subset))
+
+    def test_ensemble_streaming_pool_reconfiguration(self):
+        subset = ["Lorenz", "Rossler", "Chua", "Duffing"]
+        sols = iter_trajectory_ensemble(
+            256,
+            use_tqdm=False,
+            pts_per_period=64,
+            use_multiprocessing=True,
+            subset=subset,
+            max_workers=1,
+        )
+        names = [next(sols)[0]]
+        pool = get_worker_pool(1)
+        with self.assertWarns(UserWarning):
+            self.assertIs(get_worker_pool(2), pool)
+        names += [name for name, _ in sols]
+        self.assertEqual(sorted(names), sorted(subset))
+
+        # once the generator is exhausted, the pool can be reconfigured
+        self.assertIsNot(get_worker_pool(2), pool)
+
+    def test_ensemble_streaming_pool_shutdown(self):
+        sols = iter_trajectory_ensemble(
+            256,
+            use_tqdm=False,
+            pts_per_period=64,
+            use_multiprocessing=True,
+            subset=["Lorenz", "Rossler", "Chua", "Duffing"],
+            max_workers=1,
+        )
+        next(sols)
+        shutdown_worker_pool()
+        with self.assertRaises(RuntimeError):
+            list(sols)
+
+    def test_dataset_generation_leaves_sampler_unchanged(self):
+        ic_sampler = GaussianInitialConditionSampler(random_seed=1)
+        state = copy.deepcopy(ic_sampler.rng.bit_generator.state)
+        with tempfile.TemporaryDirectory() as store_path:
+            make_trajectory_dataset(
+                store_path,
+                32,
+                n_ics=3,
+                ic_sampler=ic_sampler,
+                subset=["Lorenz"],
+                use_tqdm=False,
+                pts_per_period=16,
+            )
+        self.assertEqual(ic_sampler.rng.bit_generator.state, state)
+
+    def test_dataset_generation(self):
+        subset = random.sample(get_attractor_list(sys_class="continuous_no_delay"), 2)
+        for use_multiprocessing in [False, True]:
+            with (
+                self.subTest(use_multiprocessing=use_multiprocessing),
+                tempfile.TemporaryDirectory() as store_path,
+            ):
+                manifest = make_trajectory_dataset(
+                    store_path,
+                    128,
+                    n_ics=3,
+                    subset=subset,
+                    pts_per_period=32,
+                    use_multiprocessing=use_multiprocessing,
+                    random_seed=0,
+                )
+                with open(os.path.join(store_path, "manifest.json")) as file:
+                    self.assertEqual(json.load(file)["systems"].keys(), set(subset))
+
+                for name in subset:
+                    entry = manifest["systems"][name]
+                    tpts, values = read_trajectory(store_path, name)
+                    self.assertEqual(
+                        values.shape, (3, 128, len(entry["initial_conditions"][0]))
+                    )
+                    self.assertEqual(tpts.shape, (128,))
+                    self.assertEqual(len(entry["initial_conditions"]), 3)
+                    for i in range(3):
+                        if i not in entry["failed_ics"]:
+                            self.assertFalse(np.any(np.isnan(values[i])))
+
     def test_trajectories(self):
         num_trials = 2
         trajs = []
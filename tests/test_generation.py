@@ -4,18 +4,30 @@ Test the models and regularizer
 """
 
 #!/usr/bin/env python
+import json
 import os
 import random
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 import numpy as np
 
 import dysts.flows as dfl
 import dysts.maps as dmp
-from dysts.base import DynMap, DynSys, DynSysDelay
+from dysts.base import (
+    DATAPATH_CONTINUOUS,
+    STIFFNESS_THRESHOLD,
+    DynMap,
+    DynSys,
+    DynSysDelay,
+    get_metadata,
+    reload_metadata,
+)
 from dysts.flows import Lorenz
-from dysts.systems import get_attractor_list
+from dysts.systems import compute_integration_methods, get_attractor_list
+from dysts.utils import has_module, integrate_delay_jit, integrate_jit, time_limit
 
 WORKING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(WORKING_DIR, "tests", "test_data")
@@ -44,17 +56,144 @@ class TestModels(unittest.TestCase):
         """
         Test generating a trajectory with stochasticity
         """
-        # check if sdeint is installed
-        try:
-            import sdeint  # type: ignore
-        except ImportError:
-            self.skipTest("sdeint is not installed")
-
         model = Lorenz()
         sol = model.make_trajectory(100, noise=0.01)
         assert sol is not None, "Generated trajectory is None"
         assert sol.shape == (100, 3), "Generated time series has the wrong shape"  # type: ignore
 
+        # the noise is reproducible, and independent across initial conditions
+        self.assertTrue(np.array_equal(sol, model.make_trajectory(100, noise=0.01)))
+        ics = np.stack([model.ic, model.ic])
+        sol_batch = model.make_trajectory(100, noise=0.01, init_cond=ics)
+        self.assertEqual(sol_batch.shape, (2, 100, 3))
+        self.assertFalse(np.allclose(sol_batch[0], sol_batch[1]))
+
+        # vanishing noise recovers the deterministic trajectory
+        sol = model.make_trajectory(100, resample=False, noise=1e-9)
+        sol_ode = model.make_trajectory(100, resample=False)
+        self.assertTrue(np.allclose(sol, sol_ode, atol=1e-2))
+
+        # solve_ivp options are ignored by the compiled loop, with a warning
+        if model.has_jit_rhs():
+            with self.assertWarnsRegex(UserWarning, "Ignoring"):
+                sol = model.make_trajectory(100, noise=0.01, first_step=1e-3)
+            self.assertEqual(sol.shape, (100, 3))
+
+    def test_trajectory_batched(self):
+        """
+        Test that batched integration matches integrating each initial condition
+        """
+        model = Lorenz()
+        ics = model.ic * (1 + 1e-2 * np.random.default_rng(0).random((4, 3)))
+        sol = model.make_trajectory(100, init_cond=ics, method="RK45", rtol=1e-9)
+        sol_batched = model.make_trajectory(
+            100, init_cond=ics, method="RK45", rtol=1e-9, batched=True
+        )
+        assert sol_batched is not None, "Generated trajectory is None"
+        self.assertEqual(sol_batched.shape, (4, 100, 3))
+        self.assertTrue(np.allclose(sol, sol_batched, atol=1e-4))
+
+    @unittest.skipUnless(has_module("numba"), "numba is not installed")
+    def test_trajectory_compiled(self):
+        """
+        Test that the compiled integrators agree with scipy's Dormand-Prince method
+        """
+        model = Lorenz()
+        sol = model.make_trajectory(100, method="RK45", rtol=1e-8, atol=1e-8)
+        for method in ["RK4", "DOPRI5"]:
+            with self.subTest(method=method):
+                sol_jit = model.make_trajectory(
+                    100, method=method, rtol=1e-8, atol=1e-8
+                )
+                assert sol_jit is not None, "Generated trajectory is None"
+                self.assertEqual(sol_jit.shape, (100, 3))
+                self.assertTrue(np.allclose(sol, sol_jit, atol=1e-4))
+
+        # solve_ivp options are ignored with a warning
+        with self.assertWarnsRegex(UserWarning, "Ignoring"):
+            sol_jit = model.make_trajectory(100, method="RK4", first_step=1e-3)
+        self.assertEqual(sol_jit.shape, (100, 3))
+
+    @unittest.skipUnless(has_module("numba"), "numba is not installed")
+    def test_compiled_integration_interruptible(self):
+        """
+        Test that the compiled loops give the same trajectories when they return to
+        Python more often, and that a timeout interrupts them
+        """
+        model = Lorenz()
+        ics = np.stack([model.ic, 1.01 * model.ic])
+        tvals = np.linspace(0, 10, 500)
+        params = tuple(model.param_list)
+        for method in ["RK4", "DOPRI5"]:
+            with self.subTest(method=method):
+                sol = integrate_jit(model._rhs, ics, tvals, params, method, 1e-3)
+                with mock.patch("dysts.utils.integration_utils.STEPS_PER_CALL", 7):
+                    sol_resumed = integrate_jit(
+                        model._rhs, ics, tvals, params, method, 1e-3
+                    )
+                for traj, traj_resumed in zip(sol, sol_resumed):
+                    np.testing.assert_array_equal(traj, traj_resumed)
+
+                with self.assertRaises(TimeoutError), time_limit(0.5):
+                    integrate_jit(
+                        model._rhs,
+                        model.ic,
+                        np.linspace(0, 1e5, 10),
+                        params,
+                        method,
+                        1e-4,
+                        rtol=1e-12,
+                        atol=1e-12,
+                    )
+
+    def test_auto_method(self):
+        """
+        Test that method="auto" integrates with the method chosen by the stiffness
+        probe, or recorded in the metadata
+        """
+        model = Lorenz()
+        self.assertLess(model.estimate_stiffness(), STIFFNESS_THRESHOLD)
+        sol = model.make_trajectory(100, method="auto")
+        self.assertEqual(model.integration_method, "DOP853")
+        self.assertTrue(np.allclose(sol, model.make_trajectory(100), atol=1e-6))
+
+        data = {"Lorenz": dict(get_metadata(DATAPATH_CONTINUOUS)["Lorenz"])}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "metadata.json")
+            with open(path, "w") as file:
+                json.dump(data, file)
+            choices = compute_integration_methods(
+                ["Lorenz"], datapath=path, threshold=0.0, use_tqdm=False
+            )
+            self.assertEqual(choices["Lorenz"]["integration_method"], "Radau")
+            self.assertEqual(Lorenz(metadata_path=path).integration_method, "Radau")
+
+    def test_auto_method_stiff_system(self):
+        """
+        Test that the stiffness probe chooses an implicit method for a stiff system,
+        and that the shipped metadata records a method for every flow
+        """
+        params = {"a": 1.2, "mu": 1000.0, "w": 0.63}
+        model = dfl.ForcedVanDerPol(parameters=params)
+        self.assertGreater(model.estimate_stiffness(), STIFFNESS_THRESHOLD)
+        self.assertEqual(model.select_integration_method(), "Radau")
+        self.assertEqual(dfl.ForcedVanDerPol().integration_method, "DOP853")
+
+        # the method recorded for the default parameters is not used for others
+        model = dfl.ForcedVanDerPol(parameters=params)
+        self.assertEqual(model.integration_method, "DOP853")
+        model.make_trajectory(16, method="auto", pts_per_period=4)
+        self.assertEqual(model.integration_method, "Radau")
+
+        model = dfl.ForcedVanDerPol()
+        model.transform_params(lambda name, value, system: params[name])
+        model.make_trajectory(16, method="auto", pts_per_period=4)
+        self.assertEqual(model.integration_method, "Radau")
+
+        metadata = get_metadata(DATAPATH_CONTINUOUS)
+        for name in get_attractor_list("continuous_no_delay"):
+            self.assertIn(metadata[name]["integration_method"], ("DOP853", "Radau"))
+
     def test_random_continuous_systems(self):
         continuous_systems = get_attractor_list(sys_class="continuous_no_delay")
         random_systems = random.sample(
@@ -95,6 +234,50 @@ class TestModels(unittest.TestCase):
                 self.assertEqual(sol[0].shape[0], 256)
                 self.assertEqual(sol[1].shape[0], 256)
 
+    def test_delay_compiled(self):
+        """
+        Test that the compiled method of steps converges and agrees with ddeint
+        """
+        model = dfl.ScrollDelay()
+        sol = model.make_trajectory(300, resample=False)
+        sol_ddeint = model.make_trajectory(300, resample=False, method="ddeint")
+        self.assertEqual(sol.shape, sol_ddeint.shape)
+        self.assertTrue(np.allclose(sol, sol_ddeint, atol=1e-3 * np.std(sol_ddeint)))
+
+        model = dfl.MackeyGlass()
+        tpts = np.linspace(0, 3 * model.tau, 200)
+        sols = [
+            integrate_delay_jit(
+                model._rhs,
+                lambda t: model.ic[0],
+                tpts,
+                model.tau,
+                params=model.param_list,
+                dtval=dtval,
+            )
+            for dtval in [model.dt, model.dt / 4]
+        ]
+        self.assertEqual(sols[0].shape, (200, 1))
+        self.assertTrue(np.allclose(sols[0], sols[1], atol=1e-8))
+
+    def test_delay_batched(self):
+        """
+        Test that a batch of delay histories matches integrating each one separately
+        """
+        model = dfl.MackeyGlass()
+        ics = model.ic * np.array([[1.0], [1.01], [0.99]])
+        for method in ["RK4", "ddeint"]:
+            with self.subTest(method=method):
+                sol = model.make_trajectory(200, init_cond=ics, method=method)
+                self.assertEqual(sol.shape, (3, 200, len(model.ic)))
+                for ic, traj in zip(ics, sol):
+                    self.assertTrue(
+                        np.allclose(
+                            traj,
+                            model.make_trajectory(200, init_cond=ic, method=method),
+                        )
+                    )
+
     def test_random_discrete_maps(self):
         discrete_maps = get_attractor_list(sys_class="discrete")
         random_systems = random.sample(
@@ -111,6 +294,102 @@ class TestModels(unittest.TestCase):
                 self.assertIsInstance(sol, np.ndarray)
                 self.assertEqual(sol.shape[0], 256)
 
+    def test_discrete_maps_compiled(self):
+        """
+        Test that compiled iteration of the maps agrees with calling rhs in a loop
+        """
+        for system_name in get_attractor_list(sys_class="discrete"):
+            system = getattr(dmp, system_name)()
+            if not system.has_jit_rhs():
+                continue
+
+            with self.subTest(system=system_name):
+                ics = np.stack([system.ic, 0.99 * system.ic]).astype(float)
+                sol = system.make_trajectory(20, init_cond=ics)
+
+                for ic, traj in zip(ics, sol):
+                    curr, expected = ic[None], []
+                    for _ in range(20):
+                        curr = system.rhs(curr)
+                        expected.append(curr[0])
+                    self.assertTrue(
+                        np.allclose(
+                            traj.reshape(20, -1), np.array(expected), equal_nan=True
+                        )
+                    )
+
+    def test_blinking_vortex_root(self):
+        """
+        Test that the vectorized root solve of BlinkingVortexMap solves its equation
+        """
+        eq = dmp.BlinkingVortexMap()
+        a, b, gamma, t = eq.param_list
+        rng = np.random.default_rng(0)
+        rt, tt = rng.uniform(0.1, 0.6, 50), rng.uniform(-np.pi, np.pi, 50)
+        lam2, lam, etac, rho = eq.make_parameters(rt, tt, a, b, t)
+
+        rout, thout = eq._rhs(rt, tt, a, b, gamma, t)
+        thetat = np.arctan2(
+            rout * np.sin(thout) / rho, (rout * np.cos(thout) - etac) / rho
+        )
+        residual = eq.root(thetat, t, rt, tt, lam2, lam, etac, rho, gamma)
+        self.assertTrue(np.allclose(np.sin(residual / 2), 0, atol=1e-8))
+
+
+class TestMetadata(unittest.TestCase):
+    """Check the shared metadata registry"""
+
+    def test_metadata_cached(self):
+        self.assertIs(
+            get_metadata(DATAPATH_CONTINUOUS), get_metadata(DATAPATH_CONTINUOUS)
+        )
+
+        # systems must not modify the shared metadata
+        eq = Lorenz()
+        eq.ic[0] = 1e3
+        self.assertNotEqual(Lorenz().ic[0], 1e3)
+        self.assertIn("initial_conditions", get_metadata(DATAPATH_CONTINUOUS)["Lorenz"])
+
+    def test_metadata_reload(self):
+        data = {"Lorenz": dict(get_metadata(DATAPATH_CONTINUOUS)["Lorenz"])}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "metadata.json")
+            with open(path, "w") as file:
+                json.dump(data, file)
+            self.assertEqual(
+                Lorenz(metadata_path=path).sigma, data["Lorenz"]["parameters"]["sigma"]
+            )
+
+            data["Lorenz"]["parameters"]["sigma"] = 7.0
+            with open(path, "w") as file:
+                json.dump(data, file)
+            reload_metadata(path)
+            self.assertEqual(Lorenz(metadata_path=path).sigma, 7.0)
+
+
+class TestRhsBatch(unittest.TestCase):
+    """Check that the batched right hand side agrees with the per-point one"""
+
+    def test_all_rhs_batch(self):
+        rng = np.random.default_rng(0)
+
+        equation_names = get_attractor_list(sys_class="continuous_no_delay")
+        for name in equation_names:
+            with self.subTest(system=name):
+                eq = getattr(dfl, name)()
+                X = eq.ic * (1 + 0.1 * rng.standard_normal((5, len(eq.ic))))
+
+                rhs_batch = eq.rhs_batch(X, 0.3)
+                rhs_pointwise = np.array(
+                    [np.array(eq.rhs(x, 0.3), dtype=float) for x in X]
+                )
+
+                self.assertEqual(rhs_batch.shape, X.shape)
+                self.assertTrue(
+                    np.allclose(rhs_batch, rhs_pointwise),
+                    f"Batched right hand side for {name} is incorrect",
+                )
+
 
 class TestJacobian(unittest.TestCase):
     """Perform a grad check to ensure that the Jacobian is implemented correctly"""
@@ -143,6 +422,23 @@ class TestJacobian(unittest.TestCase):
                 f"Jacobian for {name} is incorrect",
             )
 
+    def test_jacobian_batch(self):
+        rng = np.random.default_rng(0)
+        for name in ["Lorenz", "DoublePendulum", "Torus"]:
+            eq = getattr(dfl, name)()
+            X = eq.ic * (1 + 0.1 * rng.standard_normal((5, len(eq.ic))))
+            tpts = rng.random(5)
+
+            jacs = eq.jac_batch(X, tpts)
+            self.assertEqual(jacs.shape, (5, len(eq.ic), len(eq.ic)))
+            self.assertTrue(np.allclose(eq.jac(X, 0.0), eq.jac_batch(X, 0.0)))
+            for x, t, jac in zip(X, tpts, jacs):
+                self.assertIsInstance(eq.jac(x, t), np.ndarray)
+                self.assertTrue(np.allclose(eq.jac(x, t), jac))
+                self.assertTrue(
+                    np.allclose(jac, np.array(eq._jac(*x, t, *eq.param_list)))
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,15 +4,28 @@ Test the models and regularizer
 """
 
 #!/usr/bin/env python
+import gzip
+import json
 import os
+import subprocess
 import sys
+import tempfile
 import unittest
 
 import numpy as np
 
+import dysts
+from dysts.base import BaseDyn
 from dysts.systems import get_attractor_list
 from dysts.utils import (
     cartesian_to_polar,
+    check_jacobian,
+    compile_jacobian,
+    convert_json_to_store,
+    has_module,
+    interp_delay_embedding,
+    jacobian_source,
+    list_trajectories,
     make_surrogate,
     polar_to_cartesian,
     signif,
@@ -84,12 +97,192 @@ class TestUtils(unittest.TestCase):
         surr_data = make_surrogate(data, "rp")
         self.assertAlmostEqual(len(surr_data), len(data))
 
+    def test_interp_delay_embedding(self):
+        rng = np.random.default_rng(0)
+        tpts = np.linspace(0, 10, 200)
+        sol = rng.standard_normal((3, 200, 2))
+        sample_ts, lags = np.linspace(2, 10, 150), np.linspace(0, 2, 4)
+
+        emb = interp_delay_embedding(sol, tpts, sample_ts, lags)
+        self.assertEqual(emb.shape, (3, 150, 8))
+        for b, d, i in np.ndindex(3, 2, 4):
+            expected = np.interp(sample_ts - lags[i], tpts, sol[b, :, d])
+            self.assertTrue(np.allclose(emb[b, :, d * 4 + i], expected))
+
+    @unittest.skipUnless(has_module("sympy"), "sympy is not installed")
+    def test_symbolic_jacobian(self):
+        from dysts.flows import Lorenz
+        from dysts.systems import generate_jacobians
+
+        eq = Lorenz()
+        jac = compile_jacobian(eq._rhs, 3)
+        points = eq.ic + np.random.default_rng(0).standard_normal((4, 3))
+        self.assertTrue(check_jacobian(eq._rhs, jac, points, tuple(eq.param_list)))
+        for x in points:
+            self.assertTrue(np.allclose(jac(*x, 0, *eq.param_list), eq.jac(x, 0)))
+
+        sources = generate_jacobians(["Lorenz"], use_tqdm=False)
+        self.assertIn("def _jac(x, y, z, t, beta, rho, sigma):", sources["Lorenz"])
+
+        # constants are written as decimals, and shared subexpressions computed once
+        def rhs(x, y, t, a):
+            return 0.5 * a * np.sin(x * y) / x, np.sin(x * y) ** 2
+
+        src = jacobian_source(rhs, 2)
+        self.assertIn("x0 = x*y", src)
+        self.assertIn("0.5", src)
+        self.assertNotIn("1/2", src)
+        self.assertNotIn("**(-", src)
+        jac = compile_jacobian(rhs, 2)
+        self.assertTrue(check_jacobian(rhs, jac, points[:, :2] + 1, (2.0,)))
+
+        # bare constant entries are printed as they are written in the right hand side
+        def rhs(x, y, t, a):
+            return a * x + y, x - 0.4 * y
+
+        src = jacobian_source(rhs, 2)
+        self.assertIn("row2 = [1, -0.4]", src)
+        self.assertNotIn("0.40000", src)
+
     def test_attractor_list(self):
         """
         Test fetching list of attractors
         """
         assert len(get_attractor_list()) > 130
 
+    def test_trajectory_store(self):
+        """
+        Test converting a gzipped JSON dataset to a trajectory store, and loading it
+        """
+        rng = np.random.default_rng(0)
+        dataset = {
+            name: {"time": np.arange(10.0), "values": rng.random((10, 3))}
+            for name in ["Lorenz", "Rossler"]
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = os.path.join(tmpdir, "trajectories.json.gz")
+            with gzip.open(fpath, "wt", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        name: {k: v.tolist() for k, v in data.items()}
+                        for name, data in dataset.items()
+                    },
+                    file,
+                )
+
+            store_path = convert_json_to_store(fpath)
+            self.assertEqual(store_path, os.path.join(tmpdir, "trajectories"))
+            self.assertEqual(list_trajectories(store_path), ["Lorenz", "Rossler"])
+
+            for name, data in dataset.items():
+                tpts, sol = BaseDyn.load_trajectory(store_path, name, return_times=True)
+                self.assertIsInstance(sol, np.memmap)
+                np.testing.assert_array_equal(tpts, data["time"])
+                np.testing.assert_array_equal(sol, data["values"])
+                np.testing.assert_array_equal(
+                    BaseDyn.load_trajectory(fpath, name), data["values"]
+                )
+
+    def test_get_system(self):
+        self.assertEqual(dysts.get_system("Lorenz").__name__, "Lorenz")
+        self.assertEqual(dysts.Henon.__module__, "dysts.maps")
+        self.assertRaises(AttributeError, getattr, dysts, "NotASystem")
+
+    def test_lazy_import(self):
+        """
+        Test that constructing a system does not import the heavy dependencies
+        """
+        code = (
+            "import sys, dysts; dysts.Lorenz(); "
+            "print(any(m in sys.modules for m in ['numba', 'scipy.integrate']))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=WORKING_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+    @unittest.skipUnless(has_module("numba"), "numba is not installed")
+    def test_precompile(self):
+        """
+        Test that precompiling the discrete maps populates the numba cache
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            code = (
+                "import dysts; "
+                f"print(dysts.precompile('discrete', cache_dir={cache_dir!r}, use_tqdm=False))"
+            )
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=WORKING_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(out.stdout.strip(), "[]")
+            cached = [f for _, _, files in os.walk(cache_dir) for f in files]
+            self.assertTrue(any(f.endswith(".nbi") for f in cached))
+
+    @unittest.skipUnless(has_module("numba"), "numba is not installed")
+    def test_precompile_cache_dir_from_environment(self):
+        """
+        Test that precompiling honours NUMBA_CACHE_DIR, and that a new process loads
+        the compiled functions from there
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {**os.environ, "NUMBA_CACHE_DIR": cache_dir}
+            code = "import dysts; print(dysts.precompile(subset=['Lorenz'], use_tqdm=False))"
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=WORKING_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(out.stdout.strip(), "[]")
+            cached = [f for _, _, files in os.walk(cache_dir) for f in files]
+            for func in ["Lorenz._rhs", "Lorenz._jac"]:
+                self.assertTrue(any(func in f and f.endswith(".nbi") for f in cached))
+
+            code = (
+                "import numpy as np, dysts; lorenz = dysts.Lorenz(); "
+                "lorenz.rhs(np.asarray(lorenz.ic, dtype=float), 0.0); "
+                "print(sum(lorenz._rhs.stats.cache_hits.values()))"
+            )
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=WORKING_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertGreater(int(out.stdout.strip()), 0)
+
+    def test_precompile_without_numba(self):
+        """
+        Test that precompiling does nothing when numba is not installed
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            code = (
+                "import sys; sys.modules['numba'] = None; import dysts; "
+                f"print(dysts.precompile(cache_dir={cache_dir!r}, use_tqdm=False))"
+            )
+            out = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=WORKING_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(out.stdout.strip(), "[]")
+            self.assertIn("numba is not installed", out.stderr)
+            self.assertEqual(os.listdir(cache_dir), [])
+
 
 if __name__ == "__main__":
     unittest.main()